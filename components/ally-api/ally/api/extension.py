@@ -14,6 +14,15 @@ from collections import Iterable
 
 # --------------------------------------------------------------------
 
+TOTAL_EXACT = 'exact'
+# The total count mode where the total is counted for each part.
+TOTAL_CACHED = 'cached'
+# The total count mode where the total is counted and then reused for a short time, so it might be approximate.
+TOTAL_NONE = 'none'
+# The total count mode where no total is counted, instead the part provides a flag indicating that more items follow.
+
+# --------------------------------------------------------------------
+
 @extension
 class IterPart(Iterable):
     '''
@@ -23,23 +32,45 @@ class IterPart(Iterable):
     total = int
     offset = int
     limit = int
+    after = int
+    nextAfter = int
+    totalMode = str
+    hasMore = bool
 
-    def __init__(self, wrapped, total, offset=None, limit=None):
+    def __init__(self, wrapped, total, offset=None, limit=None, after=None, totalMode=None, hasMore=None,
+                 nextAfter=None):
         '''
         Construct the partial iterable.
         
         @param wrapped: Iterable
             The iterable that provides the actual data.
+        @param after: integer|None
+            The last seen id after which the part starts, if the part is provided by keyset pagination, in this case
+            the offset is relative to the after id.
+        @param totalMode: string|None
+            The mode used in providing the total, one of the TOTAL_* constants, provided only if the total is not
+            exact, None means the total is counted exactly.
+        @param hasMore: boolean|None
+            Flag indicating that more items follow after this part, provided if the total is not available.
+        @param nextAfter: integer|None
+            The last id of this part, to be used as the after id for fetching the next part, provided only for the
+            parts fetched by keyset pagination.
         '''
         assert isinstance(wrapped, Iterable), 'Invalid iterable %s' % wrapped
+        assert totalMode in (None, TOTAL_EXACT, TOTAL_CACHED, TOTAL_NONE), 'Invalid total mode %s' % totalMode
 
         self.wrapped = wrapped
         self.total = total
         if offset is None: self.offset = 0
         else: self.offset = offset
-        if limit is None: self.limit = total
+        if total is None: self.limit = limit
+        elif limit is None: self.limit = total
         elif limit > total: self.limit = total
         else: self.limit = limit
+        self.after = after
+        self.totalMode = totalMode
+        self.hasMore = hasMore
+        self.nextAfter = nextAfter
 
     def __iter__(self): return self.wrapped.__iter__()
 
@@ -17,6 +17,7 @@ from ally.api.operator.type import TypeCriteria
 from ally.exception import DevelError
 from ally.support.util_spec import IGet, IContained, ISet, IDelete
 from ally.support.util_sys import getAttrAndClass
+from collections import OrderedDict
 import logging
 
 # --------------------------------------------------------------------
@@ -367,7 +368,7 @@ class QuerySupport(metaclass=ABCMeta):
         assert isinstance(query, Query)
 
         self = object.__new__(cls)
-        self._ally_values = {}
+        self._ally_values = OrderedDict()  # The criteria order is used for the unprioritized ordering
 
         for name, value in keyargs.items():
             if name not in query.criterias:
@@ -55,7 +55,7 @@ class IEntityFindService:
     '''
 
     @call
-    def getAll(self, offset:int=None, limit:int=LIMIT_DEFAULT, detailed:bool=True) -> Iter(Entity):
+    def getAll(self, offset:int=None, limit:int=LIMIT_DEFAULT, detailed:bool=True, after:int=None) -> Iter(Entity):
         '''
         Provides the entities.
         
@@ -65,13 +65,16 @@ class IEntityFindService:
             The limit of entities to retrieve.
         @param detailed: boolean
             If true will present the total count, limit and offset for the partially returned collection.
+        @param after: integer
+            The last seen entity id, if provided the entities ordered by id are retrieved after this id.
         '''
 
 @service
 class IEntityQueryService:
 
     @call
-    def getAll(self, offset:int=None, limit:int=LIMIT_DEFAULT, detailed:bool=True, q:QEntity=None) -> Iter(Entity):
+    def getAll(self, offset:int=None, limit:int=LIMIT_DEFAULT, detailed:bool=True, q:QEntity=None,
+               after:int=None) -> Iter(Entity):
         '''
         Provides the entities searched by the provided query.
         
@@ -83,6 +86,9 @@ class IEntityQueryService:
             If true will present the total count, limit and offset for the partially returned collection.
         @param q: QEntity
             The query to search by.
+        @param after: integer
+            The last seen entity id, if provided the entities ordered by id are retrieved after this id, the query
+            cannot provide an ordering in this case.
         '''
 
 @service
@@ -16,7 +16,8 @@ from ..ally_core.processor import argumentsBuild, argumentsPrepare, \
 from ..ally_core.resources import resourcesRoot
 from ..ally_http.processor import encoderPath, contentLengthDecode, \
     contentLengthEncode, methodOverride, allowEncode, headerDecodeRequest, \
-    contentTypeRequestDecode, headerEncodeResponse, contentTypeResponseEncode
+    contentTypeRequestDecode, headerEncodeResponse, contentTypeResponseEncode, \
+    response_compression, contentEncodingEncode, response_conditional, conditional
 from ally.container import ioc
 from ally.core.http.impl.processor.encoder import CreateEncoderWithPathHandler
 from ally.core.http.impl.processor.explain_error import ExplainErrorHandler
@@ -180,6 +181,9 @@ def updateAssemblyResources():
                             contentLanguageEncode(), contentLengthEncode(), allowEncode())
     
     if allow_method_override(): assemblyResources().add(methodOverride(), before=methodInvoker())
+    if response_compression(): assemblyResources().add(contentEncodingEncode(), before=contentLengthEncode())
+    # The conditional is placed after the compression so the entity tag is computed for the content that is delivered.
+    if response_conditional(): assemblyResources().add(conditional(), before=contentLengthEncode())
 
 @ioc.before(assemblyMultiPartPopulate)
 def updateAssemblyMultiPartPopulate():
@@ -0,0 +1,231 @@
+'''
+Created on Oct 18, 2026
+
+@package: ally core http
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides testing for the models fetching with batch getters.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from ally.api.config import model, service, call
+from ally.api.type import Iter, List, typeFor
+from ally.container import ioc
+from ally.core.http.impl.processor.fetcher import FetcherHandler, \
+    FetcherInvoker
+from ally.core.http.spec.transform.support_model import DataModel
+from ally.core.impl.invoker import InvokerCall
+from ally.design.processor.attribute import defines
+from ally.design.processor.context import Context, create
+from ally.design.processor.spec import Resolvers
+import unittest
+
+# --------------------------------------------------------------------
+
+@model(id='Id')
+class User:
+    Id = int
+    Name = str
+
+@model(id='Id')
+class Tag:
+    Id = int
+    Name = str
+
+@model(id='Id')
+class Article:
+    Id = int
+    Author = User
+    Tag = Tag
+
+@service
+class IUserService:
+
+    @call
+    def getById(self, id:User.Id) -> User:
+        '''
+        Nothing.
+        '''
+
+    @call
+    def getByIds(self, ids:List(User.Id)) -> Iter(User):
+        '''
+        Nothing.
+        '''
+
+@service
+class ITagService:
+
+    @call
+    def getById(self, id:Tag.Id) -> Tag:
+        '''
+        Nothing.
+        '''
+
+    @call
+    def getAll(self, offset:int=None, limit:int=None) -> Iter(Tag):
+        '''
+        Nothing.
+        '''
+
+@service
+class IArticleService:
+
+    @call
+    def getAll(self) -> Iter(Article):
+        '''
+        Nothing.
+        '''
+
+class UserService(IUserService):
+
+    def __init__(self, ids):
+        self.ids = ids
+        self.calls = []
+
+    def getById(self, id):
+        self.calls.append(('getById', id))
+        if id in self.ids: return self.user(id)
+
+    def getByIds(self, ids):
+        self.calls.append(('getByIds', list(ids)))
+        return [self.user(id) for id in ids if id in self.ids and id % 2]  # The even ids are not delivered in batch
+
+    def user(self, id):
+        user = User()
+        user.Id, user.Name = id, 'User %s' % id
+        return user
+
+class TagService(ITagService):
+
+    def __init__(self):
+        self.calls = []
+
+    def getById(self, id):
+        self.calls.append(('getById', id))
+        tag = Tag()
+        tag.Id, tag.Name = id, 'Tag %s' % id
+        return tag
+
+    def getAll(self, offset=None, limit=None):
+        return ()
+
+class ArticleService(IArticleService):
+
+    def __init__(self, articles):
+        self.articles = articles
+
+    def getAll(self):
+        return iter(self.articles)
+
+# --------------------------------------------------------------------
+
+class Response(Context):
+    encoderData = defines(dict)
+    encoderDataModel = defines(DataModel)
+    isSuccess = defines(bool)
+
+ctx = create(Resolvers(contexts=dict(Response=Response)))
+Response = ctx['Response']
+
+# --------------------------------------------------------------------
+
+class TestFetcher(unittest.TestCase):
+
+    def setUp(self):
+        self.handler = FetcherHandler()
+        ioc.initialize(self.handler)
+
+        self.users = UserService({1, 2, 3, 4})
+        self.tags = TagService()
+        self.invokerUser = InvokerCall(self.users, typeFor(IUserService).service.calls['getById'])
+        self.invokerTag = InvokerCall(self.tags, typeFor(ITagService).service.calls['getById'])
+
+        self.articles = []
+        for k, (author, tag) in enumerate(((1, 7), (2, 7), (3, 8), (1, 8), (5, 7), (4, None))):
+            article = Article()
+            article.Id, article.Author = k, author
+            if tag is not None: article.Tag = tag
+            self.articles.append(article)
+        self.invokerMain = InvokerCall(ArticleService(self.articles),
+                                       typeFor(IArticleService).service.calls['getAll'])
+
+    def fetcherFor(self):
+        fetcher = FetcherInvoker(self.invokerMain)
+        for reference, invoker, modelType in ((Article.Author, self.invokerUser, typeFor(User)),
+                                              (Article.Tag, self.invokerTag, typeFor(Tag))):
+            fetcher.addFetch(reference, invoker, [None])
+            batch = self.handler.batchFor(invoker, modelType)
+            if batch: fetcher.addBatch(reference, batch, modelType.container.propertyId)
+        return fetcher
+
+    def dataModel(self):
+        data = DataModel()
+        for name, reference in (('Author', Article.Author), ('Tag', Article.Tag)):
+            cdata = data.datas[name] = DataModel()
+            cdata.fetchReference, cdata.fetchEncode, cdata.fetchData = reference, lambda: None, DataModel()
+        return data
+
+    def testBatchFor(self):
+        batch = self.handler.batchFor(self.invokerUser, typeFor(User))
+        self.assertIsNotNone(batch)
+        self.assertEqual('getByIds', batch.__name__)
+        self.assertIsNone(self.handler.batchFor(self.invokerTag, typeFor(Tag)))
+        self.assertIsNone(self.handler.batchFor(self.invokerMain, typeFor(Article)))
+
+    def testPrefetch(self):
+        fetcher = self.fetcherFor()
+        self.assertIn(Article.Author, fetcher.batches)
+        self.assertNotIn(Article.Tag, fetcher.batches)
+
+        response = Response()
+        response.encoderData, response.encoderDataModel = {}, self.dataModel()
+        value = fetcher.invoke(response)
+        self.assertEqual(self.articles, list(value))
+
+        # All the distinct authors are fetched with a single batch call, the references without a batch getter are
+        # not prefetched.
+        self.assertEqual([('getByIds', [1, 2, 3, 5, 4])], self.users.calls)
+        self.assertEqual([], self.tags.calls)
+
+        fetch = response.encoderData['fetcher']
+        self.assertEqual('User 1', fetch.fetch(Article.Author, 1).Name)
+        self.assertEqual('User 3', fetch.fetch(Article.Author, 3).Name)
+        self.assertEqual(1, len(self.users.calls))
+
+        # The ids that the batch getter does not deliver fall back to the per id get call.
+        self.assertEqual('User 2', fetch.fetch(Article.Author, 2).Name)
+        self.assertIsNone(fetch.fetch(Article.Author, 5))
+        self.assertEqual([('getById', 2), ('getById', 5)], self.users.calls[1:])
+        self.assertEqual('User 2', fetch.fetch(Article.Author, 2).Name)
+        self.assertEqual(3, len(self.users.calls))
+
+        self.assertEqual('Tag 7', fetch.fetch(Article.Tag, 7).Name)
+        self.assertEqual('Tag 7', fetch.fetch(Article.Tag, 7).Name)
+        self.assertEqual([('getById', 7)], self.tags.calls)
+
+    def testNoBatch(self):
+        fetcher = FetcherInvoker(self.invokerMain)
+        fetcher.addFetch(Article.Author, self.invokerUser, [None])
+
+        response = Response()
+        response.encoderData, response.encoderDataModel = {}, self.dataModel()
+        fetcher.invoke(response)
+        self.assertEqual([], self.users.calls)
+
+        fetch = response.encoderData['fetcher']
+        self.assertEqual('User 1', fetch.fetch(Article.Author, 1).Name)
+        self.assertEqual('User 1', fetch.fetch(Article.Author, 1).Name)
+        self.assertEqual([('getById', 1)], self.users.calls)
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__': unittest.main()
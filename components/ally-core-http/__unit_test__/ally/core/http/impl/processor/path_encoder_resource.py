@@ -0,0 +1,151 @@
+'''
+Created on Oct 18, 2026
+
+@package: ally core http
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides testing for the resource path encoder templates.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from ally.api.config import model
+from ally.api.type import Input, typeFor
+from ally.container import ioc
+from ally.core.http.impl.processor.path_encoder_resource import \
+    ResourcePathEncoderHandler, EncoderPathResource
+from ally.core.impl.node import NodeRoot, NodePath, NodeProperty, MatchRoot, \
+    MatchString, MatchProperty
+from ally.core.spec.resources import ConverterPath, Path, Match
+from urllib.parse import quote
+import unittest
+
+# --------------------------------------------------------------------
+
+@model(id='Id')
+class User:
+    Id = int
+
+@model(id='Key')
+class Tag:
+    Key = str
+
+class ConverterSpaced(ConverterPath):
+    '''
+    Converter that provides path names that need quoting.
+    '''
+    __slots__ = ()
+
+    def normalize(self, name):
+        return name.replace('_', ' ')
+
+class MatchCustom(Match):
+    '''
+    Match that is not known by the path templates.
+    '''
+
+    def __init__(self, node, value):
+        super().__init__(node)
+        self.value = value
+
+    def asArgument(self, invoker, args): pass
+    def update(self, obj, objType): return False
+    def isValid(self): return True
+    def toPath(self, converterPath, isFirst, isLast): return self.value
+    def clone(self): return self
+
+# --------------------------------------------------------------------
+
+class TestPathTemplate(unittest.TestCase):
+
+    def setUp(self):
+        self.root = NodeRoot()
+        self.users = NodePath(self.root, True, 'My_Users')
+        self.user = NodeProperty(self.users, Input('userId', typeFor(User.Id)))
+        self.tags = NodePath(self.user, True, 'Tag')
+        self.tag = NodeProperty(self.tags, Input('tagKey', typeFor(Tag.Key)))
+
+    def handlerFor(self, converterPath):
+        handler = ResourcePathEncoderHandler()
+        handler.converterPath = converterPath
+        ioc.initialize(handler)
+        return handler
+
+    def pathFor(self, userId, tagKey=None):
+        matches = [MatchRoot(self.root), MatchString(self.users, 'My_Users'), MatchProperty(self.user, userId)]
+        if tagKey is None: return Path(matches, self.user)
+        matches.extend((MatchString(self.tags, 'Tag'), MatchProperty(self.tag, tagKey)))
+        return Path(matches, self.tag)
+
+    def expected(self, handler, path, quoted):
+        paths = path.toPaths(handler.converterPath)
+        if quoted: return [quote(item) for item in paths]
+        return paths
+
+    def assertSamePaths(self, handler, path):
+        for quoted in (True, False):
+            self.assertEqual(self.expected(handler, path, quoted), handler.toPaths(path, quoted),
+                             'For path %s quoted %s' % (path, quoted))
+
+            encoder = EncoderPathResource(handler)
+            uri = '/'.join(path.toPaths(handler.converterPath))
+            if uri.split('/')[-1].count('.') > 0: uri += '/'
+            if quoted: uri = quote(uri)
+            self.assertEqual(uri, encoder.encode(path, quoted=quoted))
+
+    def testPaths(self):
+        for converterPath in (ConverterPath(), ConverterSpaced()):
+            handler = self.handlerFor(converterPath)
+            for userId in (1, 12, 0):
+                self.assertSamePaths(handler, self.pathFor(userId))
+                for tagKey in ('simple', 'with space', 'a/b?c=d&e#f', 'ăîș 日本', '100%', 'dot.ted'):
+                    self.assertSamePaths(handler, self.pathFor(userId, tagKey))
+
+        handler = self.handlerFor(ConverterSpaced())
+        self.assertEqual(['My Users', '12', 'Tag', 'with space'], handler.toPaths(self.pathFor(12, 'with space'), False))
+        self.assertEqual(['My%20Users', '12', 'Tag', 'with%20space'],
+                         handler.toPaths(self.pathFor(12, 'with space'), True))
+        self.assertEqual('My%20Users/12/Tag/a/b%3Fc%3Dd%26e%23f',
+                         EncoderPathResource(handler).encode(self.pathFor(12, 'a/b?c=d&e#f')))
+
+    def testTemplate(self):
+        handler = self.handlerFor(ConverterSpaced())
+        self.assertEqual(['My%20Users', 2], handler.compileTemplate(self.pathFor(1), True))
+        self.assertEqual(['My Users', 2, 'Tag', 4], handler.compileTemplate(self.pathFor(1, 'x'), False))
+
+        # The template is compiled once for the path nodes and quoting.
+        handler.toPaths(self.pathFor(1, 'x'), True)
+        handler.toPaths(self.pathFor(2, 'y'), True)
+        handler.toPaths(self.pathFor(2, 'y'), False)
+        self.assertEqual(2, len(handler._templates))
+
+    def testInvalid(self):
+        handler = self.handlerFor(ConverterPath())
+        path = self.pathFor(None, 'x')
+        self.assertIsNone(handler.toPaths(path, True))
+
+        invalid = lambda match, converterPath: '*'
+        self.assertEqual('My_Users/%2A/Tag/x', EncoderPathResource(handler).encode(path, invalid))
+        self.assertEqual('My_Users/*/Tag/x', EncoderPathResource(handler).encode(path, invalid, quoted=False))
+
+    def testUnknownMatch(self):
+        handler = self.handlerFor(ConverterSpaced())
+        path = Path([MatchRoot(self.root), MatchString(self.users, 'My_Users'), MatchCustom(self.user, 'custom value')],
+                    self.user)
+        self.assertIs(False, handler.compileTemplate(path, True))
+        self.assertIsNone(handler.toPaths(path, True))
+
+        # The paths that are not handled by a template are encoded with the path matches.
+        self.assertEqual('My%20Users/custom%20value', EncoderPathResource(handler).encode(path))
+        self.assertEqual('My Users/custom value', EncoderPathResource(handler).encode(path, quoted=False))
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__': unittest.main()
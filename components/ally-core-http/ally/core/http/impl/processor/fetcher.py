@@ -6,12 +6,16 @@ Created on Jul 31, 2012
 @license: http://www.gnu.org/licenses/gpl-3.0.txt
 @author: Gabriel Nistor
 
-Provides the standard headers handling.
+Provides the models fetching for the encoded references.
 '''
 
-from ally.api.operator.type import TypeModelProperty, TypeModel
-from ally.api.type import Input, typeFor, TypeClass, Type
+from ally.api.config import GET
+from ally.api.extension import IterPart
+from ally.api.operator.container import Call
+from ally.api.operator.type import TypeModelProperty, TypeModel, TypeService
+from ally.api.type import Input, typeFor, TypeClass, Type, Iter
 from ally.container.ioc import injected
+from ally.core.impl.invoker import InvokerCall
 from ally.core.http.spec.transform.support_model import DataModel, IFetcher
 from ally.core.spec.resources import Path, Node, Invoker, INodeInvokerListener
 from ally.design.processor.attribute import requires
@@ -49,7 +53,9 @@ class Response(Context):
 @injected
 class FetcherHandler(HandlerProcessorProceed, INodeInvokerListener):
     '''
-    Implementation for a handler that provides the fetcher used in getting the filtered models.
+    Implementation for a handler that provides the fetcher used in getting the filtered models. If the service of a
+    model get invoker also provides a batch getter (a GET call that takes a list of the model ids and returns the
+    models) the models of a collection response are fetched with a single batch call for each reference.
     '''
     typeResponse = TypeClass(Response)
 
@@ -123,7 +129,11 @@ class FetcherHandler(HandlerProcessorProceed, INodeInvokerListener):
                                 log.warning('Cannot locate any input main invoker %s input for invoker %s and input %s',
                                             invokerMain, invoker, inp)
                                 break
-                    else: fetcher.addFetch(reference, invoker, indexes)
+                    else:
+                        fetcher.addFetch(reference, invoker, indexes)
+                        if indexes == [None]:
+                            batch = self.batchFor(invoker, modelType)
+                            if batch: fetcher.addBatch(reference, batch, modelType.container.propertyId)
 
                 fetcher.inputs.append(Input('$response', self.typeResponse, True, None))
 
@@ -156,6 +166,39 @@ class FetcherHandler(HandlerProcessorProceed, INodeInvokerListener):
 
         return fetch
 
+    def batchFor(self, invoker, modelType):
+        '''
+        Provides the batch getter for the models of the provided get invoker, the batch getter is a GET call of the same
+        service as the invoker that has as the only mandatory input a list of the model ids and returns the models.
+        
+        @param invoker: Invoker
+            The get invoker of the model.
+        @param modelType: TypeModel
+            The model type to provide the batch getter for.
+        @return: Callable|None
+            The batch getter that takes as an argument the list of ids and returns the iterable of models, None if
+            there is no batch getter available.
+        '''
+        assert isinstance(modelType, TypeModel), 'Invalid model type %s' % modelType
+        if not isinstance(invoker, InvokerCall) or not modelType.container.propertyId: return
+        assert isinstance(invoker, InvokerCall)
+
+        typeService = typeFor(invoker.implementation)
+        if not isinstance(typeService, TypeService): return
+        assert isinstance(typeService, TypeService)
+
+        for call in typeService.service.calls.values():
+            assert isinstance(call, Call), 'Invalid call %s' % call
+            if call.method != GET or call is invoker.call: continue
+            if not isinstance(call.output, Iter) or call.output.itemType != modelType: continue
+
+            inputs = [inp for inp in call.inputs if not inp.hasDefault]
+            if len(inputs) != 1 or not isinstance(inputs[0].type, Iter): continue
+            idType = inputs[0].type.itemType
+            if isinstance(idType, TypeModelProperty) and idType.parent == modelType and \
+            idType.property == modelType.container.propertyId:
+                return getattr(invoker.implementation, call.name)
+
     # ----------------------------------------------------------------
 
     def onInvokerChange(self, node, old, new):
@@ -170,7 +213,7 @@ class FetcherInvoker(Invoker):
     '''
     Invoker that provides the model fetching.
     '''
-    __slots__ = ('invoker', 'references', 'invokers')
+    __slots__ = ('invoker', 'references', 'invokers', 'batches')
 
     def __init__(self, invoker):
         '''
@@ -183,6 +226,7 @@ class FetcherInvoker(Invoker):
         self.invoker = invoker
         self.references = {}
         self.invokers = []
+        self.batches = {}
 
     def addInput(self, inp):
         '''
@@ -218,14 +262,45 @@ class FetcherInvoker(Invoker):
         self.references[reference] = len(self.invokers)
         self.invokers.append((invoker, indexes))
 
+    def addBatch(self, reference, batch, propertyId):
+        '''
+        Add a batch getter for a reference entry in the fetcher.
+        
+        @param reference: Reference
+            The reference for fetching.
+        @param batch: Callable
+            The batch getter that takes as an argument the list of ids and returns the iterable of models.
+        @param propertyId: string
+            The name of the model id property, used in associating the batch models with the ids.
+        '''
+        assert reference in self.references, 'Unknown reference %s' % reference
+        assert callable(batch), 'Invalid batch getter %s' % batch
+        assert isinstance(propertyId, str), 'Invalid property id %s' % propertyId
+
+        self.batches[reference] = (batch, propertyId)
+
     def invoke(self, *args):
         '''
         @see: Invoker.invoke
         '''
         response = args[-1]
         assert isinstance(response, Response), 'Invalid response %s' % response
-        response.encoderData.update(fetcher=Fetcher(self, args))
-        return self.invoker.invoke(*args[:len(self.invoker.inputs)])
+        fetcher = Fetcher(self, args)
+        response.encoderData.update(fetcher=fetcher)
+        value = self.invoker.invoke(*args[:len(self.invoker.inputs)])
+
+        if self.batches and isinstance(self.output, Iter) and value is not None:
+            # The encoders fetch the models one by one, so the models of the collection are fetched in batches now.
+            if isinstance(value, IterPart):
+                assert isinstance(value, IterPart)
+                if not isinstance(value.wrapped, (list, tuple)): value.wrapped = list(value.wrapped)
+                values = value.wrapped
+            else:
+                if not isinstance(value, (list, tuple)): value = list(value)
+                values = value
+            fetcher.prefetchFor(response.encoderDataModel, values)
+
+        return value
 
 class Fetcher(IFetcher):
     '''
@@ -267,3 +342,50 @@ class Fetcher(IFetcher):
 
         return value
 
+    def prefetch(self, reference, valueIds):
+        '''
+        @see: IFetcher.prefetch
+        '''
+        batch = self.fetcher.batches.get(reference)
+        if batch is None: return
+        batch, propertyId = batch
+
+        values = self._cache.get(reference)
+        if values is None: values = self._cache[reference] = {}
+
+        ids, unique = [], set()
+        for valueId in valueIds:
+            if valueId is None or valueId in values or valueId in unique: continue
+            unique.add(valueId)
+            ids.append(valueId)
+        if not ids: return
+
+        # The ids that are not delivered by the batch getter are left to be fetched one by one.
+        for value in batch(ids): values[getattr(value, propertyId)] = value
+
+    def prefetchFor(self, data, values):
+        '''
+        Prefetches the models for the provided data model and the values encoded with the data model, also the models
+        for the data model properties are prefetched.
+        
+        @param data: DataModel
+            The data model to prefetch for.
+        @param values: list[object]
+            The values that are encoded with the data model.
+        '''
+        assert isinstance(data, DataModel), 'Invalid data model %s' % data
+        assert isinstance(values, (list, tuple)), 'Invalid values %s' % values
+
+        if data.fetchEncode and data.fetchReference:
+            self.prefetch(data.fetchReference, values)
+            cache = self._cache.get(data.fetchReference)
+            if not cache or not isinstance(data.fetchData, DataModel): return
+            data, values = data.fetchData, [cache[valueId] for valueId in values if cache.get(valueId) is not None]
+
+        if not values or DataModel.datas not in data: return
+        for nameProp, cdata in data.datas.items():
+            if not isinstance(cdata, DataModel): continue
+            if DataModel.filter in data and nameProp not in data.filter: continue
+            ids = [getattr(value, nameProp, None) for value in values]
+            self.prefetchFor(cdata, [valueId for valueId in ids if valueId is not None])
+
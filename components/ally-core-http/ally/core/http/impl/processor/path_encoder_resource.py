@@ -10,6 +10,7 @@ Provides the path encoder that can handle the resources path.
 '''
 
 from ally.container.ioc import injected
+from ally.core.impl.node import MatchRoot, MatchString, MatchProperty
 from ally.core.spec.resources import ConverterPath, Path
 from ally.design.processor.attribute import defines, optional
 from ally.design.processor.context import Context
@@ -68,6 +69,8 @@ class ResourcePathEncoderHandler(HandlerProcessorProceed):
         else:
             self.resourcesRootPattern = None
 
+        self._templates = {}
+
     def process(self, request:Request, response:Response, **keyargs):
         '''
         @see: HandlerProcessorProceed.process
@@ -83,6 +86,61 @@ class ResourcePathEncoderHandler(HandlerProcessorProceed):
         if response.encoderPath is None: response.encoderPath = EncoderPathResource(self, extension)
         else: response.encoderPath = EncoderPathResource(self, extension, response.encoderPath)
 
+    # ----------------------------------------------------------------
+
+    def toPaths(self, path, quoted):
+        '''
+        Provides the path elements for the provided path based on the path template, the template is compiled once for
+        the path nodes and contains the static path elements already converted (and quoted) and the indexes of the
+        property matches that need to be converted for each path.
+        
+        @param path: Path
+            The path to provide the elements for.
+        @param quoted: boolean
+            Flag indicating that the path elements should be quoted.
+        @return: list[string]|None
+            The path elements, None if the path cannot be handled by a template (for instance has invalid matches).
+        '''
+        assert isinstance(path, Path), 'Invalid path %s' % path
+        key = (quoted, tuple(match.node for match in path.matches))
+        template = self._templates.get(key)
+        if template is None: template = self._templates[key] = self.compileTemplate(path, quoted)
+        if template is False: return
+
+        paths = []
+        for item in template:
+            if item.__class__ is int:
+                match = path.matches[item]
+                if not match.isValid(): return
+                item = match.toPath(self.converterPath, False, False)
+                if quoted: item = quote(item)
+            paths.append(item)
+        return paths
+
+    def compileTemplate(self, path, quoted):
+        '''
+        Compiles the template for the provided path.
+        
+        @param path: Path
+            The path to compile the template for.
+        @param quoted: boolean
+            Flag indicating that the static path elements should be quoted.
+        @return: list[string|integer]|boolean
+            The template containing the static path elements and the indexes of the property matches, False if the path
+            contains matches that are not known by the template.
+        '''
+        assert isinstance(path, Path), 'Invalid path %s' % path
+        template = []
+        for index, match in enumerate(path.matches):
+            if isinstance(match, MatchProperty): template.append(index)
+            elif isinstance(match, (MatchRoot, MatchString)):
+                item = match.toPath(self.converterPath, index == 0, index == len(path.matches) - 1)
+                if item is None: continue
+                if quoted: item = quote(item)
+                template.append(item)
+            else: return False
+        return template
+
 # --------------------------------------------------------------------
 
 class EncoderPathResource(IEncoderPath):
@@ -125,7 +183,10 @@ class EncoderPathResource(IEncoderPath):
             assert isinstance(quoted, bool), 'Invalid as quoted flag %s' % quoted
             assert isinstance(path, Path)
             
-            uri, paths = [], path.toPaths(self.handler.converterPath, invalid=invalid)
+            uri, paths = [], self.handler.toPaths(path, quoted)
+            if paths is None:
+                paths, isQuoted = path.toPaths(self.handler.converterPath, invalid=invalid), False
+            else: isQuoted = quoted
             
             uri.append('/'.join(paths))
             if self.extension:
@@ -136,7 +197,7 @@ class EncoderPathResource(IEncoderPath):
             # Added just in case the last entry has a dot in it and not to be confused as a extension
             
             uri = ''.join(uri)
-            if quoted: uri = quote(uri)
+            if quoted and not isQuoted: uri = quote(uri)
             if self.handler.resourcesRootURI: uri = self.handler.resourcesRootURI % uri
             
             if self.wrapped: return self.wrapped.encode(uri, **keyargs)
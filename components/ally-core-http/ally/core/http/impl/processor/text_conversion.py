@@ -121,6 +121,8 @@ class BabelConversionDecodeHandler(HandlerProcessorProceed):
                DateTime:'short'
                }
     # The default formats.
+    cacheSize = 100
+    # The maximum number of locales and converters cached, the converters are cached for the locale and formats.
 
     def __init__(self):
         assert isinstance(self.normalizer, Normalizer), 'Invalid normalizer %s' % self.normalizer
@@ -129,8 +131,12 @@ class BabelConversionDecodeHandler(HandlerProcessorProceed):
         assert isinstance(self.formatContentNameX, str), 'Invalid name content format %s' % self.formatContentNameX
         assert isinstance(self.formats, dict), 'Invalid formats %s' % self.formats
         assert isinstance(self.defaults, dict), 'Invalid defaults %s' % self.defaults
+        assert isinstance(self.cacheSize, int), 'Invalid cache size %s' % self.cacheSize
         super().__init__()
 
+        self._locales = {}
+        self._converters = {}
+
     def process(self, request:RequestDecode, response:ResponseDecode, **keyargs):
         '''
         @see: HandlerProcessorProceed.process
@@ -149,14 +155,14 @@ class BabelConversionDecodeHandler(HandlerProcessorProceed):
 
         locale = None
         if RequestDecode.language in request and request.language is not None:
-            try: locale = Locale.parse(request.language, sep='-')
+            try: locale = self.localeFor(request.language)
             except: assert log.debug('Invalid request content language %s', request.language) or True
 
         if locale is None:
             if RequestDecode.language in request: request.language = self.languageDefault
-            locale = Locale.parse(self.languageDefault)
+            locale = self.localeFor(self.languageDefault, '_')
 
-        try: formats = self.processFormats(locale, formats)
+        try: converter = self.converterFor(locale, formats)
         except FormatError as e:
             assert isinstance(e, FormatError)
             if response.isSuccess is False: return  # Skip in case the response is in error
@@ -165,7 +171,7 @@ class BabelConversionDecodeHandler(HandlerProcessorProceed):
             response.errorMessage = 'Bad request content formatting, %s' % e.message
             return
 
-        request.converter = ConverterBabel(locale, formats)
+        request.converter = converter
         request.normalizer = self.normalizer
 
         formats = {}
@@ -175,13 +181,13 @@ class BabelConversionDecodeHandler(HandlerProcessorProceed):
 
         locale = None
         if response.language:
-            try: locale = Locale.parse(response.language, sep='-')
+            try: locale = self.localeFor(response.language)
             except: assert log.debug('Invalid response content language %s', response.language) or True
 
         if locale is None:
             if RequestDecode.accLanguages in request and request.accLanguages is not None:
                 for lang in request.accLanguages:
-                    try: locale = Locale.parse(lang, sep='-')
+                    try: locale = self.localeFor(lang)
                     except:
                         assert log.debug('Invalid accepted content language %s', lang) or True
                         continue
@@ -189,7 +195,7 @@ class BabelConversionDecodeHandler(HandlerProcessorProceed):
                     break
 
             if locale is None:
-                locale = Locale.parse(self.languageDefault)
+                locale = self.localeFor(self.languageDefault, '_')
                 if RequestDecode.accLanguages in request:
                     if request.accLanguages is not None:
                         request.accLanguages.insert(0, self.languageDefault)
@@ -205,7 +211,7 @@ class BabelConversionDecodeHandler(HandlerProcessorProceed):
             if RequestDecode.argumentsOfType in request and request.argumentsOfType is not None:
                 request.argumentsOfType[TypeLocale] = response.language
 
-        try: formats = self.processFormats(locale, formats)
+        try: converter = self.converterFor(locale, formats)
         except FormatError as e:
             assert isinstance(e, FormatError)
             if response.isSuccess is False: return  # Skip in case the response is in error
@@ -214,11 +220,57 @@ class BabelConversionDecodeHandler(HandlerProcessorProceed):
             response.errorMessage = 'Bad content formatting for response, %s' % e.message
             return
 
-        response.converter = ConverterBabel(locale, formats)
+        response.converter = converter
         response.normalizer = self.normalizer
 
     # ----------------------------------------------------------------
 
+    def localeFor(self, language, sep='-'):
+        '''
+        Provides the cached locale for the language.
+        
+        @param language: string
+            The language to provide the locale for.
+        @param sep: string
+            The separator used in the language.
+        @return: Locale
+            The locale for the language.
+        @raise ValueError: If the language is not a valid locale.
+        '''
+        key = (language, sep)
+        locale = self._locales.get(key)
+        if locale is None:
+            try: locale = Locale.parse(language, sep=sep)
+            except: locale = False  # We cache also the invalid languages
+            if len(self._locales) >= self.cacheSize: self._locales.clear()
+            self._locales[key] = locale
+
+        if locale is False: raise ValueError('Invalid language %s' % language)
+        return locale
+
+    def converterFor(self, locale, formats):
+        '''
+        Provides the cached converter for the locale and formats.
+        
+        @param locale: Locale
+            The locale to provide the converter for.
+        @param formats: dictionary{class: string}
+            The formats provided for the converter, @see: processFormats.
+        @return: ConverterBabel
+            The converter for the locale and formats.
+        @raise FormatError: If the formats are not valid.
+        '''
+        assert isinstance(locale, Locale), 'Invalid locale %s' % locale
+        assert isinstance(formats, dict), 'Invalid formats %s' % formats
+
+        key = (str(locale), frozenset(formats.items()))
+        converter = self._converters.get(key)
+        if converter is None:
+            converter = ConverterBabel(locale, self.processFormats(locale, formats))
+            if len(self._converters) >= self.cacheSize: self._converters.clear()
+            self._converters[key] = converter
+        return converter
+
     def processFormats(self, locale, formats):
         '''
         Process the formats to a complete list of formats that will be used by conversion.
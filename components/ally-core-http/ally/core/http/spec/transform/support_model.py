@@ -91,3 +91,14 @@ class IFetcher(metaclass=abc.ABCMeta):
         @return: object|None
             The model object corresponding to the reference and value id, None if the object cannot be provided.
         '''
+
+    def prefetch(self, reference, valueIds):
+        '''
+        Prefetch the model objects that are specific for the provided reference, the prefetched objects are then
+        provided by fetch without additional calls. By default nothing is prefetched.
+        
+        @param reference: Reference
+            The reference of the model objects to prefetch.
+        @param valueIds: Iterable(object)
+            The value ids for the model objects to prefetch.
+        '''
@@ -0,0 +1,221 @@
+'''
+Created on Oct 18, 2026
+
+@package: ally core sql alchemy
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides unit testing for the sql alchemy service utilities.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from ally.api.config import model, query
+from ally.api.criteria import AsLikeOrdered, AsRangeOrdered, AsEqual
+from ally.support.sqlalchemy.mapper import mapperModel
+from ally.support.sqlalchemy.util_service import buildLimits, buildQuery, \
+    isOrdered
+from sqlalchemy.engine import create_engine
+from sqlalchemy.orm.session import sessionmaker
+from sqlalchemy.schema import Table, Column, MetaData
+from sqlalchemy.types import String, Integer
+import unittest
+
+# --------------------------------------------------------------------
+
+meta = MetaData()
+
+@model(id='Id')
+class Item:
+    '''
+    Provides the item model.
+    '''
+    Id = int
+    Name = str
+    Rank = int
+
+@query(Item)
+class QItem:
+    '''
+    Provides the item query.
+    '''
+    name = AsLikeOrdered
+    rank = AsRangeOrdered
+    id = AsEqual
+
+table = Table('util_item', meta,
+              Column('id', Integer, primary_key=True, key='Id'),
+              Column('name', String(255), nullable=False, key='Name'),
+              Column('rank', Integer, nullable=False, key='Rank'))
+
+Item = mapperModel(Item, table)
+
+# --------------------------------------------------------------------
+
+class TestBuildLimits(unittest.TestCase):
+
+    def setUp(self):
+        engine = create_engine('sqlite:///:memory:')
+        meta.create_all(engine)
+        self.session = sessionmaker(bind=engine)()
+        for k in range(1, 11):
+            item = Item()
+            item.Name, item.Rank = 'Item %02d' % (11 - k), k % 3
+            self.session.add(item)
+        self.session.flush()
+
+    def tearDown(self):
+        self.session.close()
+
+    def ids(self, sql):
+        return [item.Id for item in sql.all()]
+
+    def testOffset(self):
+        sql = self.session.query(Item).order_by(Item.Id)
+        self.assertEqual([3, 4, 5], self.ids(buildLimits(sql, 2, 3)))
+        self.assertEqual([9, 10], self.ids(buildLimits(sql, 8, 5)))
+        self.assertEqual(list(range(1, 11)), self.ids(buildLimits(sql)))
+
+    def testAfter(self):
+        sql = self.session.query(Item)
+        self.assertEqual([4, 5, 6], self.ids(buildLimits(sql, None, 3, 3, Item.Id)))
+        self.assertEqual([9, 10], self.ids(buildLimits(sql, None, 3, 8, Item.Id)))
+        self.assertEqual([], self.ids(buildLimits(sql, None, 3, 10, Item.Id)))
+        self.assertEqual(list(range(1, 11)), self.ids(buildLimits(sql, None, None, 0, Item.Id)))
+
+        # Walking the pages with the last seen id provides all the items.
+        ids, after = [], 0
+        while True:
+            page = self.ids(buildLimits(sql, None, 4, after, Item.Id))
+            if not page: break
+            ids.extend(page)
+            after = page[-1]
+        self.assertEqual(list(range(1, 11)), ids)
+
+    def testAfterWithOffset(self):
+        sql = self.session.query(Item)
+        # The offset is relative to the after id.
+        self.assertEqual([6, 7, 8], self.ids(buildLimits(sql, 2, 3, 3, Item.Id)))
+        self.assertEqual([10], self.ids(buildLimits(sql, 1, 3, 8, Item.Id)))
+        self.assertEqual([], self.ids(buildLimits(sql, 5, 3, 8, Item.Id)))
+
+    def testAfterFiltered(self):
+        sql = self.session.query(Item).filter(Item.Rank == 1)
+        self.assertEqual([1, 4, 7, 10], self.ids(sql.order_by(Item.Id)))
+        self.assertEqual([7, 10], self.ids(buildLimits(sql, None, 3, 4, Item.Id)))
+        self.assertEqual([10], self.ids(buildLimits(sql, 1, 3, 4, Item.Id)))
+
+    def testIsOrdered(self):
+        q = QItem()
+        self.assertFalse(isOrdered(q))
+        q = QItem(name='Item%')
+        self.assertFalse(isOrdered(q))
+        q.id.equal = 3
+        self.assertFalse(isOrdered(q))
+        q.rank.orderDesc()
+        self.assertTrue(isOrdered(q))
+
+        q = QItem()
+        q.name.orderAsc()
+        self.assertTrue(isOrdered(q))
+        self.assertEqual(list(range(10, 0, -1)), self.ids(buildQuery(self.session.query(Item), q, Item)))
+
+class TestBuildQuery(unittest.TestCase):
+
+    setUp, tearDown, ids = TestBuildLimits.setUp, TestBuildLimits.tearDown, TestBuildLimits.ids
+
+    def orderBy(self, sql):
+        # Provides the order by clause of the SQL statement.
+        clause = str(sql.statement).split('ORDER BY')
+        if len(clause) < 2: return None
+        return ' '.join(clause[1].split())
+
+    def testUnprioritized(self):
+        q = QItem()
+        q.rank.orderAsc()
+        q.name.orderDesc()
+        sql = buildQuery(self.session.query(Item), q, Item)
+        self.assertEqual('util_item.rank, util_item.name DESC', self.orderBy(sql))
+        self.assertEqual([3, 6, 9, 1, 4, 7, 10, 2, 5, 8], self.ids(sql))
+
+        # The unprioritized criteria are ordered in the order they are set in the query.
+        q = QItem()
+        q.name.orderDesc()
+        q.rank.orderAsc()
+        sql = buildQuery(self.session.query(Item), q, Item)
+        self.assertEqual('util_item.name DESC, util_item.rank', self.orderBy(sql))
+        self.assertEqual(list(range(1, 11)), self.ids(sql))
+
+        q = QItem(name='Item 0%')
+        sql = buildQuery(self.session.query(Item), q, Item)
+        self.assertIsNone(self.orderBy(sql))
+
+    def testPrioritized(self):
+        q = QItem()
+        q.name.orderDesc()
+        q.rank.orderAsc()
+        q.rank.priority = 1
+        sql = buildQuery(self.session.query(Item), q, Item)
+        self.assertEqual('util_item.rank, util_item.name DESC', self.orderBy(sql))
+        self.assertEqual([3, 6, 9, 1, 4, 7, 10, 2, 5, 8], self.ids(sql))
+
+        # The prioritized criteria are ordered by priority before the unprioritized criteria.
+        q = QItem()
+        q.id.equal = 3
+        q.rank.orderDesc()
+        q.rank.priority = 2
+        q.name.orderAsc()
+        q.name.priority = 1
+        sql = buildQuery(self.session.query(Item), q, Item)
+        self.assertEqual('util_item.name, util_item.rank DESC', self.orderBy(sql))
+
+        q = QItem()
+        q.rank.orderDesc()
+        q.name.orderAsc()
+        q.name.priority = 0  # No priority
+        sql = buildQuery(self.session.query(Item), q, Item)
+        self.assertEqual('util_item.rank DESC, util_item.name', self.orderBy(sql))
+        self.assertEqual([8, 5, 2, 10, 7, 4, 1, 9, 6, 3], self.ids(sql))
+
+    def testOnly(self):
+        q = QItem(name='Item 0%')
+        q.rank.orderDesc()
+        q.id.equal = 3
+
+        sql = buildQuery(self.session.query(Item), q, Item, only='name')
+        self.assertIsNone(self.orderBy(sql))
+        self.assertEqual(list(range(2, 11)), sorted(self.ids(sql)))
+
+        sql = buildQuery(self.session.query(Item), q, Item, only=(QItem.rank, 'name'))
+        self.assertEqual('util_item.rank DESC', self.orderBy(sql))
+        self.assertEqual([8, 5, 2, 10, 7, 4, 9, 6, 3], self.ids(sql))
+
+        sql = buildQuery(self.session.query(Item), q, Item)
+        self.assertEqual([3], self.ids(sql))
+
+    def testExclude(self):
+        q = QItem(name='Item 0%')
+        q.rank.orderDesc()
+        q.id.equal = 3
+
+        sql = buildQuery(self.session.query(Item), q, Item, exclude='id')
+        self.assertEqual('util_item.rank DESC', self.orderBy(sql))
+        self.assertEqual([8, 5, 2, 10, 7, 4, 9, 6, 3], self.ids(sql))
+
+        sql = buildQuery(self.session.query(Item), q, Item, exclude=(QItem.rank, QItem.id))
+        self.assertIsNone(self.orderBy(sql))
+        self.assertEqual(list(range(2, 11)), sorted(self.ids(sql)))
+
+        # The plans are cached for the only and exclude criteria.
+        sql = buildQuery(self.session.query(Item), q, Item, exclude='id')
+        self.assertEqual([8, 5, 2, 10, 7, 4, 9, 6, 3], self.ids(sql))
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__': unittest.main()
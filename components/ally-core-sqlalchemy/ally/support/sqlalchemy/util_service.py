@@ -11,6 +11,7 @@ Provides utility methods for SQL alchemy service implementations.
 
 from ally.api.criteria import AsLike, AsOrdered, AsBoolean, AsEqual, AsDate, \
     AsTime, AsDateTime, AsRange
+from ally.api.operator.descriptor import QuerySupport
 from ally.api.operator.type import TypeCriteriaEntry
 from ally.api.type import typeFor
 from ally.exception import InputError, Ref
@@ -23,6 +24,12 @@ from sqlalchemy.sql.expression import _Case
 
 # --------------------------------------------------------------------
 
+_plans = {}
+# The cached query plans, as a key the mapped class, query class, only and exclude criteria and as a value the columns
+# indexed by the criteria names.
+
+# --------------------------------------------------------------------
+
 def handle(e, entity):
     '''
     Handles the SQL alchemy exception while inserting or updating.
@@ -35,19 +42,43 @@ def handle(e, entity):
 
 # --------------------------------------------------------------------
 
-def buildLimits(sqlQuery, offset=None, limit=None):
+def buildLimits(sqlQuery, offset=None, limit=None, after=None, key=None):
     '''
     Builds limiting on the SQL alchemy query.
 
     @param offset: integer|None
-        The offset to fetch elements from.
+        The offset to fetch elements from, if an after key is provided the offset is relative to the after key.
     @param limit: integer|None
         The limit of elements to get.
+    @param after: object|None
+        The last seen key to fetch the elements after (keyset pagination), if provided the elements are ordered only by
+        the key column and the query is filtered by the key so the database seeks directly to the page instead of
+        skipping all the previous elements like the offset does. The after key cannot be combined with a query
+        ordering, @see: isOrdered.
+    @param key: SQL alchemy column|None
+        The unique key column to use for the after key, required only if an after key is provided.
     '''
+    if after is not None:
+        assert key is not None, 'A key column is required for the after key %s' % after
+        sqlQuery = sqlQuery.filter(key > after).order_by(None).order_by(key)
     if offset is not None: sqlQuery = sqlQuery.offset(offset)
     if limit is not None: sqlQuery = sqlQuery.limit(limit)
     return sqlQuery
 
+def isOrdered(query):
+    '''
+    Checks if the REST query object provides ordering.
+
+    @param query: query
+        The REST query object to check.
+    @return: boolean
+        True if at least one of the query criteria is ordered.
+    '''
+    assert isinstance(query, QuerySupport), 'Invalid query %s' % query
+    for crt in query._ally_values.values():
+        if isinstance(crt, AsOrdered) and AsOrdered.ascending in crt: return True
+    return False
+
 def buildQuery(sqlQuery, query, mapped, only=None, exclude=None):
     '''
     Builds the query on the SQL alchemy query.
@@ -66,46 +97,20 @@ def buildQuery(sqlQuery, query, mapped, only=None, exclude=None):
         provide an exclude.
     '''
     assert query is not None, 'A query object is required'
-    clazz = query.__class__
+    assert isinstance(query, QuerySupport), 'Invalid query %s' % query
 
-    columns, ordered, unordered = {}, [], []
-    for name in namesForModel(mapped):
-        cp, name = getattr(mapped, name), name.lower()
-        if name not in columns and isinstance(cp, (PropertyAttribute, _Case)): columns[name] = cp
-    columns = {criteria:columns.get(criteria.lower()) for criteria in namesForQuery(clazz)}
+    key = (mapped, query.__class__, only, exclude)
+    try: columns = _plans.get(key)
+    except TypeError: columns = planQuery(query.__class__, mapped, only, exclude)  # The key is not hashable
+    else:
+        if columns is None: columns = _plans[key] = planQuery(query.__class__, mapped, only, exclude)
 
-    if only:
-        if not isinstance(only, tuple): only = (only,)
-        assert not exclude, 'Cannot have only \'%s\' and exclude \'%s\' criteria at the same time' % (only, exclude)
-        onlyColumns = {}
-        for criteria in only:
-            if isinstance(criteria, str):
-                column = columns.get(criteria)
-                assert column is not None, 'Invalid only criteria name \'%s\' for query class %s' % (criteria, clazz)
-                onlyColumns[criteria] = column
-            else:
-                typ = typeFor(criteria)
-                assert isinstance(typ, TypeCriteriaEntry), 'Invalid only criteria %s' % criteria
-                column = columns.get(criteria)
-                assert column is not None, 'Invalid only criteria \'%s\' for query class %s' % (criteria, clazz)
-                onlyColumns[criteria] = column
-        columns = onlyColumns
-    elif exclude:
-        if not isinstance(exclude, tuple): exclude = (exclude,)
-        for criteria in exclude:
-            if isinstance(criteria, str):
-                column = columns.pop(criteria, None)
-                assert column is not None, 'Invalid exclude criteria name \'%s\' for query class %s' % (criteria, clazz)
-            else:
-                typ = typeFor(criteria)
-                assert isinstance(typ, TypeCriteriaEntry), 'Invalid exclude criteria %s' % criteria
-                column = columns.pop(typ.name, None)
-                assert column is not None, 'Invalid exclude criteria \'%s\' for query class %s' % (criteria, clazz)
+    ordered, unordered = [], []
+    # Only the criteria that are set in the query object are processed.
+    for criteria, crt in query._ally_values.items():
+        column = columns.get(criteria)
+        if column is None: continue
 
-    for criteria, column in columns.items():
-        if column is None or getattr(clazz, criteria) not in query: continue
-
-        crt = getattr(query, criteria)
         if isinstance(crt, AsBoolean):
             assert isinstance(crt, AsBoolean)
             if AsBoolean.value in crt:
@@ -132,11 +137,61 @@ def buildQuery(sqlQuery, query, mapped, only=None, exclude=None):
                 else:
                     unordered.append((column, crt.ascending, None))
 
-        ordered.sort(key=lambda pack: pack[2])
-        for column, asc, __ in chain(ordered, unordered):
-            if asc: sqlQuery = sqlQuery.order_by(column)
-            else: sqlQuery = sqlQuery.order_by(column.desc())
+    ordered.sort(key=lambda pack: pack[2])
+    for column, asc, __ in chain(ordered, unordered):
+        if asc: sqlQuery = sqlQuery.order_by(column)
+        else: sqlQuery = sqlQuery.order_by(column.desc())
 
     return sqlQuery
 
+def planQuery(clazz, mapped, only=None, exclude=None):
+    '''
+    Provides the columns to be used for the query criteria, the plan is cached by @see: buildQuery for the mapped class
+    and query class.
+
+    @param clazz: class
+        The query class to provide the plan for.
+    @param mapped: class
+        The mapped model class to use the query on.
+    @param only: tuple(string|TypeCriteriaEntry)|string|TypeCriteriaEntry|None
+        @see: buildQuery
+    @param exclude: tuple(string|TypeCriteriaEntry)|string|TypeCriteriaEntry|None
+        @see: buildQuery
+    @return: dictionary{string: column}
+        The columns indexed by the criteria names, only the criteria that have a column are provided.
+    '''
+    columns = {}
+    for name in namesForModel(mapped):
+        cp, name = getattr(mapped, name), name.lower()
+        if name not in columns and isinstance(cp, (PropertyAttribute, _Case)): columns[name] = cp
+    columns = {criteria:columns.get(criteria.lower()) for criteria in namesForQuery(clazz)}
+
+    if only:
+        if not isinstance(only, tuple): only = (only,)
+        assert not exclude, 'Cannot have only \'%s\' and exclude \'%s\' criteria at the same time' % (only, exclude)
+        onlyColumns = {}
+        for criteria in only:
+            if isinstance(criteria, str):
+                column = columns.get(criteria)
+                assert column is not None, 'Invalid only criteria name \'%s\' for query class %s' % (criteria, clazz)
+                onlyColumns[criteria] = column
+            else:
+                typ = typeFor(criteria)
+                assert isinstance(typ, TypeCriteriaEntry), 'Invalid only criteria %s' % criteria
+                column = columns.get(typ.name)
+                assert column is not None, 'Invalid only criteria \'%s\' for query class %s' % (criteria, clazz)
+                onlyColumns[typ.name] = column
+        columns = onlyColumns
+    elif exclude:
+        if not isinstance(exclude, tuple): exclude = (exclude,)
+        for criteria in exclude:
+            if isinstance(criteria, str):
+                column = columns.pop(criteria, None)
+                assert column is not None, 'Invalid exclude criteria name \'%s\' for query class %s' % (criteria, clazz)
+            else:
+                typ = typeFor(criteria)
+                assert isinstance(typ, TypeCriteriaEntry), 'Invalid exclude criteria %s' % criteria
+                column = columns.pop(typ.name, None)
+                assert column is not None, 'Invalid exclude criteria \'%s\' for query class %s' % (criteria, clazz)
 
+    return {criteria:column for criteria, column in columns.items() if column is not None}
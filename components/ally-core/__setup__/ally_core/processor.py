@@ -9,7 +9,7 @@ Created on Nov 24, 2011
 Provides the configurations for the processors used in handling the request.
 '''
 
-from .encoder_decoder import renderingAssembly, assemblyParsing
+from .encoder_decoder import renderingAssembly, assemblyParsing, renderJSON
 from ally.container import ioc
 from ally.core.impl.processor.arguments import ArgumentsPrepareHandler, \
     ArgumentsBuildHandler
@@ -44,12 +44,16 @@ def explain_detailed_error():
 
 @ioc.config
 def allow_chuncked_response():
-    '''Flag indicating that a chuncked transfer is allowed, more or less if this is false a length is a must'''
+    '''
+    Flag indicating that a chuncked transfer is allowed, more or less if this is false a length is a must. If true the
+    rendered content is streamed to the client as it is rendered, only the responses that fit in a chunck will have a
+    content length
+    '''
     return False
 
 @ioc.config
 def chunck_size():
-    '''The buffer size used in the generator returned chuncks'''
+    '''The buffer size used in the generator returned chuncks, this is also the threshold for flushing the rendered content'''
     return 4096
 
 # --------------------------------------------------------------------
@@ -108,3 +112,8 @@ def renderEncoder() -> Handler:
     b.bufferSize = chunck_size()
     return b
 
+@ioc.after(renderJSON)
+def updateRenderJSON():
+    # The rendered JSON is flushed at the chunck size so the render encoder can decide if the content fits in a chunck.
+    renderJSON().bufferSize = chunck_size()
+
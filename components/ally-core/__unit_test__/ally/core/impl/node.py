@@ -0,0 +1,138 @@
+'''
+Created on Oct 18, 2026
+
+@package: ally core
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides testing for the nodes children index.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from ally.api.config import model
+from ally.api.type import Input, typeFor
+from ally.core.impl.node import NodeRoot, NodePath, NodeProperty
+from ally.core.spec.resources import ConverterPath
+from collections import deque
+import unittest
+
+# --------------------------------------------------------------------
+
+@model(id='Id')
+class ModelId:
+    Id = int
+
+@model(id='Key')
+class ModelKey:
+    Key = str
+
+class ConverterLower(ConverterPath):
+    '''
+    Converter that normalizes to lower case and parses the integers as hexadecimal.
+    '''
+    __slots__ = ()
+
+    def normalize(self, name):
+        return name.lower()
+
+    def asValue(self, strValue, objType):
+        if objType.isOf(int): return int(strValue, 16)
+        return super().asValue(strValue, objType)
+
+# --------------------------------------------------------------------
+
+def linearMatch(node, converterPath, paths):
+    '''
+    The linear children lookup, as it was done before the children index.
+    '''
+    for child in node.children:
+        match = child.tryMatch(converterPath, paths)
+        if match is not None and match is not False: return child, match
+
+def describe(found, paths):
+    if found is None: return None, list(paths)
+    child, match = found
+    return child, match.__class__, getattr(match, 'value', None), list(paths)
+
+# --------------------------------------------------------------------
+
+class TestNodeIndex(unittest.TestCase):
+
+    elements = ('Users', 'users', 'USERS', 'Items', 'items', 'Extra', '12', '0012', 'ff', 'abc', '١٢', ' 12',
+                '-1', '')
+
+    def setUp(self):
+        self.root = NodeRoot()
+        NodePath(self.root, True, 'Users')
+        NodePath(self.root, True, 'users')
+        NodeProperty(self.root, Input('id', typeFor(ModelId.Id)))
+        NodeProperty(self.root, Input('key', typeFor(ModelKey.Key)))
+        NodePath(self.root, True, 'Items')
+
+    def assertSameLookup(self, converterPath):
+        for element in self.elements:
+            indexedPaths, linearPaths = deque((element, 'rest')), deque((element, 'rest'))
+            indexed = describe(self.root.tryMatchChild(converterPath, indexedPaths), indexedPaths)
+            linear = describe(linearMatch(self.root, converterPath, linearPaths), linearPaths)
+            self.assertEqual(linear, indexed, 'For path element %r' % element)
+
+    def testOrdering(self):
+        converterPath = ConverterPath()
+        self.assertSameLookup(converterPath)
+
+        # The path nodes have priority over the property nodes and the integer property over the string property.
+        paths = deque(('Items',))
+        self.assertIsInstance(self.root.tryMatchChild(converterPath, paths)[0], NodePath)
+        paths = deque(('12',))
+        child, match = self.root.tryMatchChild(converterPath, paths)
+        self.assertTrue(child.type.isOf(int))
+        self.assertEqual(12, match.value)
+        paths = deque(('abc',))
+        child, match = self.root.tryMatchChild(converterPath, paths)
+        self.assertTrue(child.type.isOf(str))
+        self.assertEqual('abc', match.value)
+
+    def testConverter(self):
+        self.assertSameLookup(ConverterPath())
+        converterPath = ConverterLower()
+        self.assertSameLookup(converterPath)
+
+        # The 'Users' and 'users' nodes have the same key for this converter, the first one is used.
+        paths = deque(('users',))
+        self.assertEqual('Users', self.root.tryMatchChild(converterPath, paths)[0].name)
+        paths = deque(('ff',))
+        child, match = self.root.tryMatchChild(converterPath, paths)
+        self.assertTrue(child.type.isOf(int))
+        self.assertEqual(255, match.value)
+
+        # Switching back to the default converter needs to rebuild the index.
+        self.assertSameLookup(ConverterPath())
+
+    def testChildAdded(self):
+        converterPath = ConverterPath()
+        self.assertSameLookup(converterPath)
+        paths = deque(('Extra',))
+        self.assertIsInstance(self.root.tryMatchChild(converterPath, paths)[0], NodeProperty)
+
+        extra = NodePath(self.root, True, 'Extra')
+        self.assertSameLookup(converterPath)
+        paths = deque(('Extra',))
+        self.assertIs(extra, self.root.tryMatchChild(converterPath, paths)[0])
+
+        root = NodeRoot()
+        NodePath(root, True, 'Users')
+        paths = deque(('12',))
+        self.assertIsNone(root.tryMatchChild(converterPath, paths))
+        NodeProperty(root, Input('id', typeFor(ModelId.Id)))
+        self.assertEqual(12, root.tryMatchChild(converterPath, paths)[1].value)
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__': unittest.main()
@@ -0,0 +1,121 @@
+'''
+Created on Oct 18, 2026
+
+@package: ally core
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides testing for the encoder rendering buffered and streamed content.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from ally.container import ioc
+from ally.core.impl.processor.render_encoder import RenderEncoderHandler
+from ally.core.spec.transform.render import IRender
+from ally.design.processor.attribute import defines
+from ally.design.processor.context import Context, create
+from ally.design.processor.spec import Resolvers
+from collections import Callable, Iterable
+import unittest
+
+# --------------------------------------------------------------------
+
+class Response(Context):
+    renderFactory = defines(Callable)
+    encoder = defines(Callable)
+    encoderData = defines(dict)
+    obj = defines(object)
+    isSuccess = defines(bool)
+
+class ResponseContent(Context):
+    source = defines(Iterable)
+    length = defines(int)
+
+ctx = create(Resolvers(contexts=dict(Response=Response, ResponseContent=ResponseContent)))
+Response, ResponseContent = ctx['Response'], ctx['ResponseContent']
+
+class RenderItems(IRender):
+    '''
+    Render that writes only the values, one per line.
+    '''
+
+    def __init__(self, output): self.output = output
+    def value(self, name, value): self.output.write(('%s\n' % value).encode())
+    def objectStart(self, name, attributes=None): pass
+    def objectEnd(self): pass
+    def collectionStart(self, name, attributes=None): pass
+    def collectionEnd(self): pass
+
+def encodeItems(value, render, resolve, **data):
+    resolve.queueBatch(encodeItem, (dict(item=item, render=render) for item in value))
+
+def encodeItem(item, render, **data):
+    render.value('Item', item)
+
+# --------------------------------------------------------------------
+
+class TestRenderEncoder(unittest.TestCase):
+
+    def process(self, items, allowChunked, length=None):
+        handler = RenderEncoderHandler()
+        handler.allowChunked = allowChunked
+        handler.bufferSize = 16
+        ioc.initialize(handler)
+
+        response, responseCnt = Response(), ResponseContent()
+        response.renderFactory, response.encoder, response.obj = RenderItems, encodeItems, items
+        responseCnt.length = length
+        handler.process(response, responseCnt)
+        return responseCnt
+
+    def content(self, items):
+        return ''.join('%s\n' % item for item in items).encode()
+
+    def testBuffered(self):
+        items = ['item %s' % k for k in range(20)]
+        responseCnt = self.process(items, False)
+        self.assertIsInstance(responseCnt.source, tuple)
+        self.assertEqual(self.content(items), b''.join(responseCnt.source))
+        self.assertEqual(len(self.content(items)), responseCnt.length)
+
+        # The content that fits the first buffer is provided with a length even if the chunked transfer is allowed.
+        responseCnt = self.process(['small'], True)
+        self.assertEqual((b'small\n',), responseCnt.source)
+        self.assertEqual(6, responseCnt.length)
+
+    def testStreamed(self):
+        items = ['item %s' % k for k in range(20)]
+        responseCnt = self.process(items, True)
+        self.assertNotIsInstance(responseCnt.source, (tuple, list))
+        self.assertIsNone(responseCnt.length)
+        chunks = list(responseCnt.source)
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(self.content(items), b''.join(chunks))
+
+        # The provided length is kept and the content is not buffered.
+        responseCnt = self.process(items, False, 100)
+        self.assertNotIsInstance(responseCnt.source, (tuple, list))
+        self.assertEqual(100, responseCnt.length)
+        self.assertEqual(self.content(items), b''.join(responseCnt.source))
+
+    def testSkipped(self):
+        handler = RenderEncoderHandler()
+        ioc.initialize(handler)
+        response, responseCnt = Response(), ResponseContent()
+        response.renderFactory, response.encoder, response.obj = RenderItems, encodeItems, ['item']
+
+        response.isSuccess = False
+        handler.process(response, responseCnt)
+        self.assertIsNone(responseCnt.source)
+        self.assertIsNone(responseCnt.length)
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__': unittest.main()
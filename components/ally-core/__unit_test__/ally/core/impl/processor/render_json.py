@@ -0,0 +1,139 @@
+'''
+Created on Oct 18, 2026
+
+@package: ally core
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides testing for the buffered JSON renderer against the unbuffered renderer.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from ally.core.impl.processor.render.json import RenderJSON
+from codecs import getwriter
+from collections import deque
+from io import BytesIO
+from json.encoder import encode_basestring
+import random
+import unittest
+
+# --------------------------------------------------------------------
+
+class RenderJSONUnbuffered:
+    '''
+    The JSON renderer as it was before buffering, every piece is written directly to the output.
+    '''
+
+    def __init__(self, out):
+        self.out = out
+        self.isObject = deque()
+        self.isFirst = True
+
+    def value(self, name, value):
+        if self.isFirst: self.isFirst = False
+        else: self.out.write(',')
+        if self.isObject[0]:
+            self.out.write(encode_basestring(name))
+            self.out.write(':')
+        self.out.write(encode_basestring(value))
+
+    def objectStart(self, name, attributes=None):
+        self.openObject(name, attributes)
+        self.isObject.appendleft(True)
+
+    def objectEnd(self):
+        self.isObject.popleft()
+        self.out.write('}')
+
+    def collectionStart(self, name, attributes=None):
+        self.openObject(name, attributes)
+        if not self.isFirst: self.out.write(',')
+        self.out.write(encode_basestring(name))
+        self.out.write(':[')
+        self.isFirst = True
+        self.isObject.appendleft(False)
+
+    def collectionEnd(self):
+        self.isObject.popleft()
+        self.out.write(']}')
+
+    def openObject(self, name, attributes=None):
+        if not self.isFirst: self.out.write(',')
+        if self.isObject and self.isObject[0]:
+            self.out.write(encode_basestring(name))
+            self.out.write(':')
+        self.out.write('{')
+        self.isFirst = True
+        if attributes:
+            for attrName, attrValue in attributes.items():
+                if self.isFirst: self.isFirst = False
+                else: self.out.write(',')
+                self.out.write(encode_basestring(attrName))
+                self.out.write(':')
+                self.out.write(encode_basestring(attrValue))
+
+# --------------------------------------------------------------------
+
+WORDS = ('id', 'Name', 'x y', 'ăîș', 'a"b', 'c\\d', '12', '', 'tab\there', 'é1', '\x01', 'true', '日本', 'line\nend',
+         'A' * 40)
+# The names and values used in rendering, containing escaped and non ASCII characters.
+
+def renderRandom(render, rnd, depth=0):
+    '''
+    Renders a random document with nested objects and collections.
+    '''
+    render.objectStart(rnd.choice(WORDS), {rnd.choice(WORDS): rnd.choice(WORDS)} if rnd.random() < 0.3 else None)
+    for _k in range(rnd.randint(0, 6)):
+        kind = rnd.random()
+        if kind < 0.6 or depth > 3: render.value(rnd.choice(WORDS), rnd.choice(WORDS))
+        elif kind < 0.8: renderRandom(render, rnd, depth + 1)
+        else:
+            render.collectionStart(rnd.choice(WORDS), {'href': rnd.choice(WORDS)} if rnd.random() < 0.5 else None)
+            for _k in range(rnd.randint(0, 4)):
+                if rnd.random() < 0.5: render.value(rnd.choice(WORDS), rnd.choice(WORDS))
+                else: renderRandom(render, rnd, depth + 1)
+            render.collectionEnd()
+    render.objectEnd()
+
+# --------------------------------------------------------------------
+
+class TestRenderJSON(unittest.TestCase):
+
+    def render(self, charSet, seed, bufferSize=None):
+        output = BytesIO()
+        out = getwriter(charSet)(output, 'backslashreplace')
+        if bufferSize is None: render = RenderJSONUnbuffered(out)
+        else: render = RenderJSON(out, bufferSize)
+        renderRandom(render, random.Random(seed))
+        return output.getvalue()
+
+    def testSameOutput(self):
+        for charSet in ('utf-8', 'ascii', 'iso-8859-1'):
+            for seed in range(100):
+                expected = self.render(charSet, seed)
+                # The small buffer sizes flush the content in the middle of the rendering.
+                for bufferSize in (1, 7, 64, 1024):
+                    self.assertEqual(expected, self.render(charSet, seed, bufferSize),
+                                     'For %s seed %s and buffer size %s' % (charSet, seed, bufferSize))
+
+    def testFlush(self):
+        output = BytesIO()
+        render = RenderJSON(getwriter('utf-8')(output), 16)
+        render.objectStart('Root')
+        render.value('Name', 'short')
+        self.assertEqual(b'', output.getvalue())  # Not yet flushed
+        render.value('Name', 'a value longer than the buffer')
+        self.assertEqual(b'{"Name":"short","Name":"a value longer than the buffer"', output.getvalue())
+        render.objectEnd()
+        self.assertEqual(b'{"Name":"short","Name":"a value longer than the buffer"}', output.getvalue())
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__': unittest.main()
@@ -11,7 +11,7 @@ Provides the nodes used in constructing the resources node tree.
 
 from ally.api.operator.type import TypeModelProperty
 from ally.api.type import Input, typeFor
-from ally.core.spec.resources import ConverterPath, Match, Node, Invoker
+from ally.core.spec.resources import ConverterPath, Match, Node, Invoker, Converter
 from collections import deque
 import logging
 
@@ -251,23 +251,35 @@ class NodePath(Node):
             The plain name to be used for the path node.
         @ivar _match: MatchString
             The match corresponding to this node.
+        @ivar _normalized: tuple(ConverterPath, string)|None
+            The converter path and the name normalized with it.
         '''
         assert isinstance(name, str) and name != '', 'Invalid node name %s' % name
         self.name = name
         self._match = MatchString(self, name)
+        self._normalized = None
         super().__init__(parent, isGroup, ORDER_PATH)
 
     def tryMatch(self, converterPath, paths):
         '''
         @see: Node.tryMatch
         '''
-        assert isinstance(converterPath, ConverterPath), 'Invalid converter path %s' % converterPath
         assert isinstance(paths, deque), 'Invalid paths %s' % paths
         assert len(paths) > 0, 'No path element in paths %s' % paths
-        if converterPath.normalize(self._match.value) == paths[0]:
+        if self.pathKey(converterPath) == paths[0]:
             del paths[0]
             return self._match
         return None
+    
+    def pathKey(self, converterPath):
+        '''
+        @see: Node.pathKey
+        '''
+        assert isinstance(converterPath, ConverterPath), 'Invalid converter path %s' % converterPath
+        normalized = self._normalized
+        if normalized is None or normalized[0] is not converterPath:
+            self._normalized = normalized = (converterPath, converterPath.normalize(self._match.value))
+        return normalized[1]
 
     def newMatch(self):
         '''
@@ -318,6 +330,10 @@ class NodeProperty(Node):
         assert isinstance(paths, deque), 'Invalid paths %s' % paths
         assert len(paths) > 0, 'No path element in paths %s' % paths
         assert isinstance(converterPath, ConverterPath), 'Invalid converter path %s' % converterPath
+        if converterPath.__class__.asValue is Converter.asValue:
+            # Fast path for the default conversion, no need to dispatch on the type for every path element.
+            if self.order == ORDER_STRING: return MatchProperty(self, paths.popleft())
+            if paths[0].isdecimal(): return MatchProperty(self, int(paths.popleft()))
         try:
             value = converterPath.asValue(paths[0], self.type)
             del paths[0]
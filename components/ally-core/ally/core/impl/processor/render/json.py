@@ -19,6 +19,11 @@ from json.encoder import encode_basestring
 
 # --------------------------------------------------------------------
 
+NAMES_CACHE_SIZE = 10000
+# The maximum number of encoded names to cache.
+
+# --------------------------------------------------------------------
+
 @injected
 class RenderJSONHandler(RenderBaseHandler):
     '''
@@ -28,9 +33,14 @@ class RenderJSONHandler(RenderBaseHandler):
 
     encodingError = 'backslashreplace'
     # The encoding error resolving.
+    bufferSize = 1024
+    # The number of rendered characters accumulated before they are encoded and written to the output, this should not
+    # exceed the buffer size used by the render encoder in order to decide if the content is streamed, by default the
+    # setup uses the same size as the render encoder chuncks.
 
     def __init__(self):
         assert isinstance(self.encodingError, str), 'Invalid string %s' % self.encodingError
+        assert isinstance(self.bufferSize, int) and self.bufferSize > 0, 'Invalid buffer size %s' % self.bufferSize
         super().__init__()
 
     def renderFactory(self, charSet, output):
@@ -40,28 +50,35 @@ class RenderJSONHandler(RenderBaseHandler):
         assert isinstance(charSet, str), 'Invalid char set %s' % charSet
         assert isinstance(output, IOutputStream), 'Invalid content output stream %s' % output
 
-        return RenderJSON(getwriter(charSet)(output, self.encodingError))
+        return RenderJSON(getwriter(charSet)(output, self.encodingError), self.bufferSize)
 
 # --------------------------------------------------------------------
 
 class RenderJSON(IRender):
     '''
-    Renderer for JSON.
+    Renderer for JSON, the rendered pieces are accumulated and written to the output at once whenever the buffer size is
+    reached or the root JSON object is closed.
     '''
-    __slots__ = ('out', 'isObject', 'isFirst')
+    __slots__ = ('out', 'isObject', 'isFirst', 'bufferSize', '_pieces', '_size')
 
-    def __init__(self, out):
+    def __init__(self, out, bufferSize=1024):
         '''
         Construct the text object renderer.
         
         @param out: file writer
             The writer to place the JSON.
+        @param bufferSize: integer
+            The number of rendered characters to accumulate before writing them to the output.
         '''
         assert out, 'Invalid JSON output stream %s' % out
+        assert isinstance(bufferSize, int), 'Invalid buffer size %s' % bufferSize
 
         self.out = out
         self.isObject = deque()
         self.isFirst = True
+        self.bufferSize = bufferSize
+        self._pieces = []
+        self._size = 0
 
     def value(self, name, value):
         '''
@@ -70,15 +87,16 @@ class RenderJSON(IRender):
         assert self.isObject, 'No container for value'
         assert isinstance(name, str), 'Invalid name %s' % name
         assert isinstance(value, str), 'Invalid value %s' % value
-        out = self.out
-
+        # The alphanumeric values don't need escaping
+        if value.isalnum(): value = '"%s"' % value
+        else: value = encode_basestring(value)
+        if self.isObject[0]: value = encodeName(name) + value
         if self.isFirst: self.isFirst = False
-        else: out.write(',')
-        if self.isObject[0]:
-            out.write(encode_basestring(name))
-            out.write(':')
-            out.write(encode_basestring(value))
-        else: out.write(encode_basestring(value))
+        else: value = ',' + value
+        
+        self._pieces.append(value)
+        self._size += len(value)
+        if self._size >= self.bufferSize: self.flush()
 
     def objectStart(self, name, attributes=None):
         '''
@@ -95,19 +113,21 @@ class RenderJSON(IRender):
         isObject = self.isObject.popleft()
         assert isObject, 'No object to end'
 
-        self.out.write('}')
+        self._pieces.append('}')
+        self._size += 1
+        if not self.isObject or self._size >= self.bufferSize: self.flush()
 
     def collectionStart(self, name, attributes=None):
         '''
         @see: IRender.collectionStart
         '''
         assert isinstance(name, str), 'Invalid name %s' % name
-        out = self.out
 
         self.openObject(name, attributes)
-        if not self.isFirst: out.write(',')
-        out.write(encode_basestring(name))
-        out.write(':[')
+        if self.isFirst: value = encodeName(name) + '['
+        else: value = ',' + encodeName(name) + '['
+        self._pieces.append(value)
+        self._size += len(value)
         self.isFirst = True
         self.isObject.appendleft(False)
 
@@ -119,7 +139,9 @@ class RenderJSON(IRender):
         isObject = self.isObject.popleft()
         assert not isObject, 'No collection to end'
 
-        self.out.write(']}')
+        self._pieces.append(']}')
+        self._size += 2
+        if not self.isObject or self._size >= self.bufferSize: self.flush()
 
     # ----------------------------------------------------------------
 
@@ -129,15 +151,13 @@ class RenderJSON(IRender):
         '''
         assert isinstance(name, str), 'Invalid name %s' % name
         assert attributes is None or isinstance(attributes, dict), 'Invalid attributes %s' % attributes
-        out = self.out
+        pieces, size = self._pieces, len(self._pieces)
 
-        if not self.isFirst: out.write(',')
+        if not self.isFirst: pieces.append(',')
 
-        if self.isObject and self.isObject[0]:
-            out.write(encode_basestring(name))
-            out.write(':')
+        if self.isObject and self.isObject[0]: pieces.append(encodeName(name))
 
-        out.write('{')
+        pieces.append('{')
         self.isFirst = True
         if attributes:
             for attrName, attrValue in attributes.items():
@@ -145,7 +165,36 @@ class RenderJSON(IRender):
                 assert isinstance(attrValue, str), 'Invalid attribute value %s' % attrValue
 
                 if self.isFirst: self.isFirst = False
-                else: out.write(',')
-                out.write(encode_basestring(attrName))
-                out.write(':')
-                out.write(encode_basestring(attrValue))
+                else: pieces.append(',')
+                pieces.append(encodeName(attrName))
+                pieces.append(encode_basestring(attrValue))
+        self._size += sum(len(piece) for piece in pieces[size:])
+
+    def flush(self):
+        '''
+        Writes the accumulated pieces to the output.
+        '''
+        if self._pieces:
+            self.out.write(''.join(self._pieces))
+            del self._pieces[:]
+            self._size = 0
+
+# --------------------------------------------------------------------
+
+_names = {}
+# The cache of the encoded names.
+
+def encodeName(name):
+    '''
+    Provides the JSON encoded name followed by the name separator, the encoded names are cached.
+    
+    @param name: string
+        The name to encode.
+    @return: string
+        The encoded name.
+    '''
+    encoded = _names.get(name)
+    if encoded is None:
+        encoded = encode_basestring(name) + ':'
+        if len(_names) < NAMES_CACHE_SIZE: _names[name] = encoded
+    return encoded
@@ -56,9 +56,11 @@ class RenderEncoderHandler(HandlerProcessorProceed):
     '''
     
     allowChunked = False
-    # Flag indicating that a chuncked transfer is allowed, more or less if this is false a length is a must.
+    # Flag indicating that a chuncked transfer is allowed, more or less if this is false a length is a must. If true the
+    # content is streamed, only the content that is rendered in a single buffer will still be provided with a length.
     bufferSize = 1024
-    # The buffer size used in the generator returned chuncks.
+    # The buffer size used in the generator returned chuncks, when the rendered content exceeds this size the content is
+    # flushed.
     
     def __init__(self):
         assert isinstance(self.allowChunked, bool), 'Invalid allow chuncked flag %s' % self.allowChunked
@@ -84,15 +86,23 @@ class RenderEncoderHandler(HandlerProcessorProceed):
 
         resolve = Resolve(response.encoder).request(value=response.obj, render=render, **response.encoderData or {})
 
-        if not self.allowChunked and responseCnt.length is None:
-    
+        if responseCnt.length is not None:
+            # The length is already provided so there is no need to buffer the content.
+            responseCnt.source = self.renderAsGenerator(resolve, output, self.bufferSize)
+            return
+        
+        if self.allowChunked:
+            # We render the first buffer, if the content fits in it there is no need for streaming.
+            while resolve.has() and output.tell() < self.bufferSize: resolve.do()
+        else:
             while resolve.has(): resolve.do()
+        
+        if resolve.has(): responseCnt.source = self.renderAsGenerator(resolve, output, self.bufferSize)
+        else:
             content = output.getvalue()
             responseCnt.length = len(content)
             responseCnt.source = (content,)
             output.close()
-        else:
-            responseCnt.source = self.renderAsGenerator(resolve, output, self.bufferSize)
 
     def renderAsGenerator(self, resolve, output, bufferSize):
         '''
@@ -12,6 +12,7 @@ Module containing specifications for the resources tree.
 from ally.api.type import Type, Input
 from ally.exception import DevelError
 from ally.support.util import firstLastCheck
+from collections import deque
 from datetime import date, datetime, time
 from re import match
 from weakref import WeakSet
@@ -534,6 +535,7 @@ class Node(metaclass=abc.ABCMeta):
         self.delete = None
 
         self._children = []
+        self._childrenIndex = None
         if parent is not None:
             assert isinstance(parent, Node), 'Invalid parent node %s' % parent
             assert not self.correspondentIn(parent._children), 'Already contains child node %s' % self
@@ -611,6 +613,46 @@ class Node(metaclass=abc.ABCMeta):
     The list of node children's.
 ''')
 
+    def tryMatchChild(self, converterPath, paths):
+        '''
+        Finds the child node that matches the path(s) element, the children that have a path key are found based on the
+        children index and only the rest of the children are checked one by one.
+        
+        @param converterPath: ConverterPath
+            The converter path to be used in matching the provided path(s).
+        @param paths: deque[string]
+            The path elements deque containing strings, this list will get consumed whenever a matching occurs.
+        @return: tuple(Node, Match|list[Match]|boolean)|None
+            The child node and the match provided by the child, None if no child matches the path(s) element.
+        '''
+        assert isinstance(paths, deque), 'Invalid paths %s' % paths
+        assert len(paths) > 0, 'No path element in paths %s' % paths
+        
+        index = self._childrenIndex
+        if index is None or index[0] is not converterPath: index = self._indexChildren(converterPath)
+        _converterPath, keyed, others = index
+        
+        child = keyed.get(paths[0])
+        if child is not None:
+            match = child.tryMatch(converterPath, paths)
+            if match is not None and match is not False: return child, match
+        
+        for child in others:
+            match = child.tryMatch(converterPath, paths)
+            if match is not None and match is not False: return child, match
+    
+    def pathKey(self, converterPath):
+        '''
+        Provides the path element that uniquely identifies this node, by default the nodes have no path key.
+        
+        @param converterPath: ConverterPath
+            The converter path to be used in providing the path key.
+        @return: string|None
+            The normalized path element that is matched by this node, None if the node is not matched by a fixed path
+            element.
+        '''
+        return None
+
     # ----------------------------------------------------------------
 
     @abc.abstractmethod
@@ -676,10 +718,25 @@ class Node(metaclass=abc.ABCMeta):
 
         if self.parent is not None: self.parent._onInvokerChangeStructure(node, old, new)
 
+    def _indexChildren(self, converterPath):
+        '''
+        Indexes the children for the provided converter path.
+        '''
+        keyed, others = {}, []
+        for child in self._children:
+            assert isinstance(child, Node), 'Invalid child %s' % child
+            key = child.pathKey(converterPath)
+            if key is None or key in keyed: others.append(child)
+            else: keyed[key] = child
+        
+        self._childrenIndex = index = (converterPath, keyed, others)
+        return index
+
     def _onChildAdded(self, child):
         '''
         Dispatches the invoker change event.
         '''
+        self._childrenIndex = None  # The children index needs to be rebuilt
         for listener in self._listeners:
             if isinstance(listener, INodeChildListener):
                 assert isinstance(listener, INodeChildListener)
@@ -122,14 +122,10 @@ def findPath(node, paths, converterPath):
     matches = []
     found = pushMatch(matches, node.tryMatch(converterPath, paths))
     while found and len(paths) > 0:
-        found = False
-        for child in node.children:
-            assert isinstance(child, Node)
-            match = child.tryMatch(converterPath, paths)
-            if pushMatch(matches, match):
-                node = child
-                found = True
-                break
+        found = node.tryMatchChild(converterPath, paths)
+        if found:
+            node, match = found
+            pushMatch(matches, match)
 
     if len(paths) == 0: return Path(matches, node)
 
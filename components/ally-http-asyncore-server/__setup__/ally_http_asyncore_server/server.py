@@ -10,7 +10,7 @@ Runs the asyncore py web server.
 '''
 
 from ..ally_http import server_type, server_version, server_host, server_port
-from ..ally_http.server import assemblyServer
+from ..ally_http.server import assemblyServer, server_thread_pool_size, server_thread_pool_queue_size
 from ally.container import ioc
 from ally.http.server import server_asyncore
 from threading import Thread
@@ -29,6 +29,29 @@ def server_type_asyncore():
     ''' % SERVER_ASYNCORE
     return SERVER_ASYNCORE
 
+@ioc.config
+def server_keep_alive() -> bool:
+    '''Flag indicating that the HTTP connections should be kept alive (persistent) if the client allows it'''
+    return True
+
+@ioc.config
+def server_keep_alive_timeout() -> int:
+    '''The number of seconds an idle persistent connection is kept open waiting for the next request'''
+    return 15
+
+@ioc.config
+def server_keep_alive_max_requests() -> int:
+    '''The maximum number of requests served on a persistent connection, after that the connection is closed'''
+    return 100
+
+@ioc.config
+def server_chunked_transfer() -> bool:
+    '''
+    Flag indicating that the response content without a known length is sent with the chunked transfer encoding to HTTP/1.1
+    clients, this way the connection can be kept alive while the content is streamed
+    '''
+    return True
+
 # --------------------------------------------------------------------
 
 @ioc.entity
@@ -42,6 +65,12 @@ def serverAsyncore():
     b.serverPort = server_port()
     b.requestHandlerFactory = serverAsyncoreRequestHandler()
     b.assembly = assemblyServer()
+    b.keepAlive = server_keep_alive()
+    b.keepAliveTimeout = server_keep_alive_timeout()
+    b.keepAliveMaximumRequests = server_keep_alive_max_requests()
+    b.chunkedTransfer = server_chunked_transfer()
+    b.threadPoolSize = server_thread_pool_size()
+    b.threadPoolQueueSize = server_thread_pool_queue_size()
     return b
 
 # --------------------------------------------------------------------
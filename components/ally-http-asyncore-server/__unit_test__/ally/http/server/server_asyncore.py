@@ -0,0 +1,274 @@
+'''
+Created on Oct 18, 2026
+
+@package: ally http
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides testing for the asyncore server persistent connections and worker threads.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from ally.container import ioc
+from ally.design.processor.assembly import Assembly
+from ally.design.processor.attribute import requires, defines
+from ally.design.processor.context import Context
+from ally.design.processor.handler import HandlerProcessorProceed
+from ally.http.server import server_asyncore
+from collections import Iterable
+from threading import Thread, Event
+import socket
+import time
+import unittest
+
+# --------------------------------------------------------------------
+
+class Request(Context):
+    uri = requires(str)
+
+class Response(Context):
+    status = defines(int)
+    headers = defines(dict)
+
+class ResponseContent(Context):
+    source = defines(Iterable)
+
+class EchoHandler(HandlerProcessorProceed):
+
+    def process(self, request:Request, response:Response, responseCnt:ResponseContent, **keyargs):
+        content = request.uri.encode()
+        response.status = 200
+        response.headers = {'Content-Length': str(len(content))}
+        responseCnt.source = (content,)
+
+class SlowHandler(HandlerProcessorProceed):
+
+    def __init__(self):
+        super().__init__()
+        self.started, self.release = Event(), Event()
+
+    def process(self, request:Request, **keyargs):
+        if request.uri.startswith('slow'):
+            self.started.set()
+            self.release.wait(10)
+
+# --------------------------------------------------------------------
+
+class Client:
+    '''
+    Simple client that reads the responses from a connection, the status line and headers order is not relevant.
+    '''
+
+    def __init__(self, port):
+        self.connection = socket.create_connection(('127.0.0.1', port), 5)
+        self.buffer = b''
+
+    def send(self, *requests):
+        self.connection.sendall(b''.join(requests))
+
+    def receive(self):
+        '''
+        @return: tuple(integer, dictionary{string: string}, bytes)
+            The status, headers and content of the next response.
+        '''
+        while b'\r\n\r\n' not in self.buffer: self._read()
+        head, self.buffer = self.buffer.split(b'\r\n\r\n', 1)
+        status, headers = None, {}
+        for line in head.decode('latin-1').split('\r\n'):
+            if line.startswith('HTTP/'): status = int(line.split()[1])
+            else:
+                name, value = line.split(':', 1)
+                headers[name.strip()] = value.strip()
+        length = int(headers.get('Content-Length', 0))
+        while len(self.buffer) < length: self._read()
+        content, self.buffer = self.buffer[:length], self.buffer[length:]
+        return status, headers, content
+
+    def isClosed(self):
+        '''
+        @return: boolean
+            True if the server closed the connection.
+        '''
+        try: return self.connection.recv(1) == b''
+        except socket.error: return True
+
+    def close(self):
+        self.connection.close()
+
+    def _read(self):
+        data = self.connection.recv(1024)
+        if not data: raise AssertionError('The connection was closed')
+        self.buffer += data
+
+def request(uri, version='HTTP/1.1', *headers):
+    return ('GET /%s %s\r\n%s\r\n' % (uri, version, ''.join('%s\r\n' % header for header in headers))).encode()
+
+# --------------------------------------------------------------------
+
+class TestAsyncoreServer(unittest.TestCase):
+
+    def setUp(self):
+        assembly = Assembly('Test asyncore')
+        assembly.add(EchoHandler())
+        self.server = server_asyncore.AsyncServer()
+        self.server.serverVersion = 'Test'
+        self.server.serverHost = '127.0.0.1'
+        self.server.serverPort = 0
+        self.server.assembly = assembly
+        self.server.timeout = 0.1
+        self.server.keepAliveTimeout = 1
+        self.server.keepAliveMaximumRequests = 3
+        self.clients = []
+
+    def tearDown(self):
+        for client in self.clients: client.close()
+        if hasattr(self, 'loop'):
+            self.running = False
+            self.loop.join(5)
+        for dispatcher in list(self.server.map.values()): dispatcher.close()
+
+    def start(self):
+        ioc.initialize(self.server)
+        self.running = True
+        def serve():
+            while self.running: self.server.serve_limited(1)
+        self.loop = Thread(target=serve)
+        self.loop.start()
+
+    def connect(self):
+        client = Client(self.server.socket.getsockname()[1])
+        self.clients.append(client)
+        return client
+
+    def testKeepAlive(self):
+        self.start()
+        client = self.connect()
+
+        client.send(request('first'))
+        status, headers, content = client.receive()
+        self.assertEqual(200, status)
+        self.assertEqual(b'first', content)
+        self.assertEqual('keep-alive', headers.get('Connection'))
+        self.assertEqual('timeout=1, max=2', headers.get('Keep-Alive'))
+
+        client.send(request('second', 'HTTP/1.1', 'Connection: close'))
+        status, headers, content = client.receive()
+        self.assertEqual(b'second', content)
+        self.assertEqual('close', headers.get('Connection'))
+        self.assertNotIn('Keep-Alive', headers)
+        self.assertTrue(client.isClosed())
+
+    def testHTTP10(self):
+        self.start()
+        client = self.connect()
+
+        client.send(request('old', 'HTTP/1.0'))
+        status, headers, content = client.receive()
+        self.assertEqual(200, status)
+        self.assertEqual(b'old', content)
+        self.assertEqual('close', headers.get('Connection'))
+        self.assertTrue(client.isClosed())
+
+    def testIdleTimeout(self):
+        self.server.keepAliveTimeout = 0.3
+        self.start()
+        client = self.connect()
+
+        client.send(request('idle'))
+        self.assertEqual(b'idle', client.receive()[2])
+        start = time.time()
+        self.assertTrue(client.isClosed())
+        self.assertLess(time.time() - start, 3)
+
+    def testMaximumRequests(self):
+        self.start()
+        client = self.connect()
+
+        for k, uri in enumerate(('one', 'two', 'three'), 1):
+            client.send(request(uri))
+            _status, headers, content = client.receive()
+            self.assertEqual(uri.encode(), content)
+            if k < 3: self.assertEqual('timeout=1, max=%s' % (3 - k), headers.get('Keep-Alive'))
+        self.assertEqual('close', headers.get('Connection'))
+        self.assertTrue(client.isClosed())
+
+    def testPipelined(self):
+        self.start()
+        client = self.connect()
+
+        client.send(request('first'), request('second'))
+        self.assertEqual(b'first', client.receive()[2])
+        self.assertEqual(b'second', client.receive()[2])
+
+        client.send(request('third', 'HTTP/1.1', 'Connection: close'))
+        self.assertEqual(b'third', client.receive()[2])
+        self.assertTrue(client.isClosed())
+
+class TestAsyncoreWorkers(unittest.TestCase):
+
+    def setUp(self):
+        self.slow = SlowHandler()
+        assembly = Assembly('Test asyncore workers')
+        assembly.add(self.slow, EchoHandler())
+        self.server = server_asyncore.AsyncServer()
+        self.server.serverVersion = 'Test'
+        self.server.serverHost = '127.0.0.1'
+        self.server.serverPort = 0
+        self.server.assembly = assembly
+        self.server.timeout = 0.1
+        self.clients = []
+
+    def tearDown(self):
+        self.slow.release.set()
+        for client in self.clients: client.close()
+        if hasattr(self, 'loop'):
+            self.running = False
+            self.loop.join(5)
+        for dispatcher in list(self.server.map.values()): dispatcher.close()
+
+    start, connect = TestAsyncoreServer.start, TestAsyncoreServer.connect
+
+    def testSlowNotStalling(self):
+        self.server.threadPoolSize = 2
+        self.start()
+        slow, fast = self.connect(), self.connect()
+
+        slow.send(request('slow'))
+        self.assertTrue(self.slow.started.wait(5))
+        fast.send(request('fast'))
+        self.assertEqual(b'fast', fast.receive()[2])
+
+        self.slow.release.set()
+        self.assertEqual(b'slow', slow.receive()[2])
+        self.assertEqual(0, self.server._scheduled)
+
+    def testFullQueue(self):
+        self.server.threadPoolSize = 1
+        self.server.threadPoolQueueSize = 1
+        self.start()
+        slow, fast = self.connect(), self.connect()
+
+        slow.send(request('slow'))
+        self.assertTrue(self.slow.started.wait(5))
+        self.assertTrue(self.server.isBusy())
+        fast.send(request('fast'))
+        fast.connection.settimeout(0.5)
+        self.assertRaises(socket.timeout, fast.receive)
+        self.assertEqual(1, self.server._scheduled)  # The second request is not read while the queue is full
+
+        fast.connection.settimeout(5)
+        self.slow.release.set()
+        self.assertEqual(b'slow', slow.receive()[2])
+        self.assertEqual(b'fast', fast.receive()[2])
+        self.assertFalse(self.server.isBusy())
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__': unittest.main()
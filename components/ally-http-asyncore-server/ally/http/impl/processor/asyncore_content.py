@@ -20,6 +20,7 @@ from ally.zip.util_zip import normOSPath
 from collections import Callable
 from genericpath import isdir
 from io import BytesIO
+from itertools import count
 import os
 import time
 
@@ -74,7 +75,7 @@ class AsyncoreContentHandler(HandlerProcessor):
         'Unable to access the dump directory %s' % self.dumpRequestsPath
         super().__init__()
         
-        self._count = 0
+        self._count = count()
 
     def process(self, chain, request:Request, requestCnt:RequestContent, response:Response, **keyargs):
         '''
@@ -108,9 +109,8 @@ class AsyncoreContentHandler(HandlerProcessor):
         Provide the path for the request file.
         '''
         tm_year, tm_mon, tm_mday, tm_hour, tm_min, tm_sec, *_rest = time.localtime()
-        path = 'request_%s_%s-%s-%s_%s-%s-%s' % (self._count, tm_year, tm_mon, tm_mday, tm_hour, tm_min, tm_sec)
-        self._count += 1
-        return path
+        # The count is used as an iterator since the handler can be used by multiple worker threads.
+        return 'request_%s_%s-%s-%s_%s-%s-%s' % (next(self._count), tm_year, tm_mon, tm_mday, tm_hour, tm_min, tm_sec)
 
 # --------------------------------------------------------------------
 
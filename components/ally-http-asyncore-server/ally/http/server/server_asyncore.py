@@ -15,14 +15,19 @@ from ally.design.processor.attribute import optional
 from ally.design.processor.execution import Chain, Processing
 from ally.http.spec.server import RequestHTTP, ResponseHTTP, RequestContentHTTP, \
     ResponseContentHTTP, HTTP
-from ally.support.util_io import IInputStream, readGenerator
+from ally.support.util_io import IInputStream, readGenerator, FileRegion, \
+    sendFileRegion
 from asyncore import dispatcher, loop
-from collections import Callable, deque
+from collections import Callable, Iterable, deque
+from functools import partial
 from http.server import BaseHTTPRequestHandler
 from io import BytesIO
+from queue import Queue
+from threading import Thread
 from urllib.parse import urlparse, parse_qsl
 import logging
 import socket
+import time
 
 # --------------------------------------------------------------------
 
@@ -32,6 +37,12 @@ log = logging.getLogger(__name__)
 WRITE_BYTES = 1
 WRITE_ITER = 2
 WRITE_CLOSE = 3
+WRITE_NEXT = 4
+WRITE_FILE = 5
+WRITE_PULL = 6
+
+# The status codes for which the response has no content.
+NO_CONTENT_STATUSES = {204, 304}
 
 # --------------------------------------------------------------------
 
@@ -45,6 +56,10 @@ class RequestContentHTTPAsyncore(RequestContentHTTP):
     The content reader callable used for pushing data from the asyncore read. Once the reader is finalized it will
     return a chain that is used for further request processing.
     ''')
+    length = optional(int, doc='''
+    @rtype: integer
+    The content length in bytes, used in order to know where the next pipelined request starts.
+    ''')
 
 # --------------------------------------------------------------------
 
@@ -61,6 +76,8 @@ class RequestHandler(dispatcher, BaseHTTPRequestHandler):
     # The maximum request size, 100 kilobytes
     requestTerminator = b'\r\n\r\n'
     # Terminator that signals the http request is complete 
+    protocol_version = 'HTTP/1.1'
+    # The protocol version used for responses, required in order to support persistent connections.
 
     def __init__(self, request, address, server):
         '''
@@ -85,15 +102,12 @@ class RequestHandler(dispatcher, BaseHTTPRequestHandler):
         self.request_version = 'HTTP/1.1'
         self.requestline = 0
         
-        self._stage = 1
-        self.rfile = BytesIO()
-        self._readCarry = None
-        self._reader = None
-
-        self.wfile = BytesIO()
         self._writeq = deque()
+        self._requestsCount = 0
+        self._pending = None
+        self._pulling = False
         
-        self._next(1)
+        self._reset()
         
     def handle_read(self):
         '''
@@ -128,6 +142,21 @@ class RequestHandler(dispatcher, BaseHTTPRequestHandler):
         
     # ----------------------------------------------------------------
     
+    def _reset(self):
+        '''
+        Resets the handler in order to receive a new request on the same connection.
+        '''
+        self.rfile = BytesIO()
+        self._readCarry = None
+        self._reader = None
+        self._contentRemaining = None
+        self._contentUnread = False
+        self._idleSince = time.time()
+        self._worker = None
+
+        self.wfile = BytesIO()
+        self._next(1)
+        
     def _next(self, stage):
         '''
         Proceed to next stage.
@@ -144,12 +173,19 @@ class RequestHandler(dispatcher, BaseHTTPRequestHandler):
         '''
         @see: dispatcher.readable
         '''
-        return True
+        if self._requestsCount and self._idleSince is not None and \
+        time.time() - self._idleSince > self.server.keepAliveTimeout:
+            assert log.debug('Closing idle persistent connection \'%s\'', self.connection) or True
+            self.close()
+            return False
+        return not self.server.isBusy()
     
     def _1_handle_data(self, data):
         '''
         Handle the data as being part of the request.
         '''
+        if not data: return
+        self._idleSince = None
         if self._readCarry is not None: data = self._readCarry + data
         index = data.find(self.requestTerminator)
         requestTerminatorLen = len(self.requestTerminator)
@@ -159,12 +195,15 @@ class RequestHandler(dispatcher, BaseHTTPRequestHandler):
             self.rfile.write(data[:index])
             self.rfile.seek(0)
             self.raw_requestline = self.rfile.readline()
-            self.parse_request()
+            if not self.parse_request(): self.close_connection = 1
             self.rfile = None
+            self._requestsCount += 1
             
             self._process(self.command or '')
             
-            if index < len(data) and self.handle_data: self.handle_data(data[index:])
+            if index < len(data):
+                if self.handle_data: self.handle_data(data[index:])
+                else: self._pending = data[index:]
         else:
             self._readCarry = data[-requestTerminatorLen:]
             self.rfile.write(data[:-requestTerminatorLen])
@@ -193,12 +232,17 @@ class RequestHandler(dispatcher, BaseHTTPRequestHandler):
         Handle the data as being part of the request.
         '''
         assert self._reader is not None, 'No reader available'
+        if self._contentRemaining is not None and data:
+            if len(data) > self._contentRemaining:
+                self._pending = data[self._contentRemaining:]
+                data = data[:self._contentRemaining]
+            self._contentRemaining -= len(data)
+            
         chain = self._reader(data)
         if chain is not None:
             assert isinstance(chain, Chain), 'Invalid chain %s' % chain
             self._reader = None
-            self._next(3)  # Now we proceed to write stage
-            chain.doAll()
+            self._proceed(chain)
             
     def _2_writable(self):
         '''
@@ -218,7 +262,7 @@ class RequestHandler(dispatcher, BaseHTTPRequestHandler):
         '''
         @see: dispatcher.writable
         '''
-        return bool(self._writeq)
+        return bool(self._writeq) and not self._pulling
     
     def _3_handle_write(self):
         '''
@@ -227,8 +271,26 @@ class RequestHandler(dispatcher, BaseHTTPRequestHandler):
         assert self._writeq, 'Nothing to write'
         
         what, content = self._writeq[0]
-        assert what in (WRITE_ITER, WRITE_BYTES, WRITE_CLOSE), 'Invalid what %s' % what
-        if what == WRITE_ITER:
+        assert what in (WRITE_ITER, WRITE_BYTES, WRITE_CLOSE, WRITE_NEXT, WRITE_FILE, WRITE_PULL), \
+        'Invalid what %s' % what
+        if what == WRITE_PULL:
+            # The content is generated on the worker that executed the chain.
+            self._pulling = True
+            self.server.execute(self._worker, self._pull, self._pulled, content)
+            return
+        elif what == WRITE_FILE:
+            try: sent = sendFileRegion(self.socket, content)
+            except (IOError, OSError):
+                log.exception('Exception occurred while sending the file to the connection \'%s\'' % self.connection)
+                content.close()
+                self.close()
+                return
+            if sent is None: self._writeq[0] = (WRITE_ITER, readGenerator(content, self.bufferSize))
+            elif content.length <= 0:
+                content.close()
+                del self._writeq[0]
+            return
+        elif what == WRITE_ITER:
             try: data = memoryview(next(content))
             except StopIteration:
                 del self._writeq[0]
@@ -237,6 +299,13 @@ class RequestHandler(dispatcher, BaseHTTPRequestHandler):
         elif what == WRITE_CLOSE:
             self.close()
             return
+        elif what == WRITE_NEXT:
+            del self._writeq[0]
+            self._reset()
+            if self._pending:
+                data, self._pending = self._pending, None
+                self.handle_data(data)
+            return
         
         dataLen = len(data)
         try:
@@ -251,6 +320,20 @@ class RequestHandler(dispatcher, BaseHTTPRequestHandler):
             elif what == WRITE_BYTES: self._writeq[0] = (WRITE_BYTES, data[sent:])
         else:
             if what == WRITE_BYTES: del self._writeq[0]
+            
+    # ----------------------------------------------------------------
+
+    def _4_readable(self):
+        '''
+        @see: dispatcher.readable
+        '''
+        return False
+            
+    def _4_writable(self):
+        '''
+        @see: dispatcher.writable
+        '''
+        return False
         
     # ----------------------------------------------------------------
     
@@ -271,7 +354,11 @@ class RequestHandler(dispatcher, BaseHTTPRequestHandler):
         request.parameters = parse_qsl(url.query, True, False)
         
         requestCnt.source = self.rfile
+        for name, value in request.headers.items():
+            if name.lower() == 'content-length': self._contentUnread = value.strip() not in ('', '0')
+            elif name.lower() == 'transfer-encoding': self._contentUnread = True
         
+        self._worker = self.server.workerFor()
         chain = Chain(proc)
         chain.process(**proc.fillIn(request=request, requestCnt=requestCnt,
                                     response=proc.ctx.response(), responseCnt=proc.ctx.responseCnt()))
@@ -281,8 +368,15 @@ class RequestHandler(dispatcher, BaseHTTPRequestHandler):
             assert isinstance(response, ResponseHTTP), 'Invalid response %s' % response
             assert isinstance(responseCnt, ResponseContentHTTP), 'Invalid response content %s' % responseCnt
     
-            if ResponseHTTP.headers in response and response.headers is not None:
-                for name, value in response.headers.items(): self.send_header(name, value)
+            if ResponseContentHTTP.source in responseCnt and responseCnt.source is not None \
+            and response.status not in NO_CONTENT_STATUSES: hasContent = True
+            else: hasContent = False
+            
+            headers = {}
+            if ResponseHTTP.headers in response and response.headers is not None: headers.update(response.headers)
+            chunked = hasContent and self._chunked(headers)
+            self._keepAlive(headers, hasContent)
+            for name, value in headers.items(): self.send_header(name, value)
     
             assert isinstance(response.status, int), 'Invalid response status code %s' % response.status
             if ResponseHTTP.text in response and response.text: text = response.text
@@ -291,23 +385,147 @@ class RequestHandler(dispatcher, BaseHTTPRequestHandler):
             self.send_response(response.status, text)
             self.end_headers()
     
-            if ResponseContentHTTP.source in responseCnt and responseCnt.source is not None:
+            if hasContent and not chunked and isinstance(responseCnt.source, FileRegion):
+                self._writeq.append((WRITE_FILE, responseCnt.source))
+            elif hasContent:
                 if isinstance(responseCnt.source, IInputStream): source = readGenerator(responseCnt.source, self.bufferSize)
                 else: source = responseCnt.source
-                self._writeq.append((WRITE_ITER, iter(source)))
-                
-            self._writeq.append((WRITE_CLOSE, None))
+                # Only the content that is already available is iterated on the asyncore loop thread.
+                if self._worker is None or isinstance(source, (tuple, list)): what = WRITE_ITER
+                else: what = WRITE_PULL
+                if chunked: source = chunkedGenerator(source)
+                self._writeq.append((what, iter(source)))
+            
+            if self.close_connection: self._writeq.append((WRITE_CLOSE, None))
+            else: self._writeq.append((WRITE_NEXT, None))
             
         chain.callBack(respond)
+        self._proceed(chain, requestCnt)
         
-        while True:
-            if not chain.do():
-                self._next(3)  # Now we proceed to write stage
-                break
-            if RequestContentHTTPAsyncore.contentReader in requestCnt and requestCnt.contentReader is not None:
-                self._next(2)  # Now we proceed to read stage
-                self._reader = requestCnt.contentReader
-                break
+    def _proceed(self, chain, requestCnt=None):
+        '''
+        Proceeds with the chain execution using the server executor, until the execution is finalized or content needs
+        to be read.
+        
+        @param chain: Chain
+            The chain to proceed with.
+        @param requestCnt: RequestContentHTTPAsyncore|None
+            The request content to check for content readers, if None the chain is executed until finalized.
+        '''
+        self._next(4)  # Now we wait for the processing to finalize
+        self.server.execute(self._worker, self._execute, self._executed, chain, requestCnt)
+        
+    def _execute(self, chain, requestCnt):
+        '''
+        Executes the chain, this might not be called on the asyncore loop thread.
+        
+        @return: boolean|None
+            True if the chain execution is paused in order to read the content, False if the chain is finalized and
+            None if the chain execution failed.
+        '''
+        assert isinstance(chain, Chain), 'Invalid chain %s' % chain
+        try:
+            while True:
+                if not chain.do(): return False
+                if requestCnt is not None and RequestContentHTTPAsyncore.contentReader in requestCnt \
+                and requestCnt.contentReader is not None: return True
+        except:
+            log.exception('Exception occurred while processing the chain for \'%s\'' % self.connection)
+        
+    def _executed(self, reading, chain, requestCnt):
+        '''
+        Called on the asyncore loop thread after the chain has been executed.
+        '''
+        if reading is None: self.close()
+        elif reading:
+            self._next(2)  # Now we proceed to read stage
+            self._reader = requestCnt.contentReader
+            if RequestContentHTTPAsyncore.length in requestCnt and requestCnt.length is not None:
+                self._contentRemaining = requestCnt.length
+                self._contentUnread = False
+            if self._pending:
+                data, self._pending = self._pending, None
+                self.handle_data(data)
+        else: self._next(3)  # Now we proceed to write stage
+
+    def _pull(self, content):
+        '''
+        Pulls the next content bytes, this might not be called on the asyncore loop thread.
+        
+        @param content: Iterator(bytes)
+            The content to pull from.
+        @return: tuple(bytes, boolean)|None
+            The pulled bytes and a flag indicating that the content is finalized, None if the content generation failed.
+        '''
+        chunks, size = [], 0
+        try:
+            while size < self.bufferSize:
+                bytes = next(content)
+                chunks.append(bytes)
+                size += len(bytes)
+        except StopIteration: return b''.join(chunks), True
+        except:
+            log.exception('Exception occurred while generating the content for \'%s\'' % self.connection)
+            return
+        return b''.join(chunks), False
+
+    def _pulled(self, pulled, content):
+        '''
+        Called on the asyncore loop thread after the content bytes have been pulled.
+        '''
+        self._pulling = False
+        if pulled is None:
+            self.close()
+            return
+        data, finalized = pulled
+        if finalized: del self._writeq[0]
+        if data: self._writeq.appendleft((WRITE_BYTES, memoryview(data)))
+
+    def _chunked(self, headers):
+        '''
+        Decides if the response content is sent with the chunked transfer encoding and updates the response headers
+        accordingly, this is the case for HTTP/1.1 requests whose response content has no known length.
+        
+        @param headers: dictionary{string, string}
+            The response headers to be sent.
+        @return: boolean
+            True if the response content needs to be chunked, False otherwise.
+        '''
+        assert isinstance(headers, dict), 'Invalid headers %s' % headers
+        if not self.server.chunkedTransfer or self.request_version != 'HTTP/1.1': return False
+        for name in headers:
+            if name.lower() in ('content-length', 'transfer-encoding'): return False
+        
+        headers['Transfer-Encoding'] = 'chunked'
+        return True
+
+    def _keepAlive(self, headers, hasContent):
+        '''
+        Decides if the connection is kept alive after the current response and updates the response headers accordingly.
+        
+        @param headers: dictionary{string, string}
+            The response headers to be sent.
+        @param hasContent: boolean
+            Flag indicating that the response has content.
+        '''
+        assert isinstance(headers, dict), 'Invalid headers %s' % headers
+        server = self.server
+        assert isinstance(server, AsyncServer), 'Invalid server %s' % server
+        
+        if not server.keepAlive or self._contentUnread or self._requestsCount >= server.keepAliveMaximumRequests:
+            self.close_connection = 1
+        elif hasContent:
+            # Without a known length the client can only find the end of the content by the connection close.
+            names = {name.lower() for name in headers}
+            if 'content-length' not in names and 'transfer-encoding' not in names: self.close_connection = 1
+        
+        for name in list(headers):
+            if name.lower() in ('connection', 'keep-alive'): del headers[name]
+        if self.close_connection: headers['Connection'] = 'close'
+        else:
+            headers['Connection'] = 'keep-alive'
+            headers['Keep-Alive'] = 'timeout=%s, max=%s' % \
+            (int(server.keepAliveTimeout), server.keepAliveMaximumRequests - self._requestsCount)
 
 # --------------------------------------------------------------------
 
@@ -330,7 +548,22 @@ class AsyncServer(dispatcher):
     # The assembly used for resolving the requests
     
     timeout = 10.0
-    # The timeout for select loop.
+    # The timeout for select loop, this also represents the precision for closing the idle persistent connections.
+    keepAlive = True
+    # Flag indicating that the connections are kept alive (persistent) between requests if the client allows it.
+    keepAliveTimeout = 15
+    # The number of seconds an idle persistent connection is kept open waiting for the next request.
+    keepAliveMaximumRequests = 100
+    # The maximum number of requests served on a persistent connection, after that the connection is closed.
+    chunkedTransfer = True
+    # Flag indicating that the response content without a known length is sent with the chunked transfer encoding to
+    # HTTP/1.1 clients, this way the connection can be kept alive while the content is streamed.
+    threadPoolSize = 0
+    # The number of worker threads used for processing the requests, if 0 the requests are processed on the asyncore
+    # loop thread.
+    threadPoolQueueSize = 100
+    # The maximum number of tasks scheduled on the worker threads, once reached the server stops accepting and reading
+    # new requests until the workers catch up.
 
     def __init__(self):
         '''
@@ -342,8 +575,25 @@ class AsyncServer(dispatcher):
         assert callable(self.requestHandlerFactory), 'Invalid request handler factory %s' % self.requestHandlerFactory
         assert isinstance(self.assembly, Assembly), 'Invalid assembly %s' % self.assembly
         assert isinstance(self.timeout, float), 'Invalid timeout %s' % self.timeout
+        assert isinstance(self.keepAlive, bool), 'Invalid keep alive flag %s' % self.keepAlive
+        assert isinstance(self.keepAliveTimeout, (int, float)), 'Invalid keep alive timeout %s' % self.keepAliveTimeout
+        assert isinstance(self.keepAliveMaximumRequests, int) and self.keepAliveMaximumRequests > 0, \
+        'Invalid keep alive maximum requests %s' % self.keepAliveMaximumRequests
+        assert isinstance(self.chunkedTransfer, bool), 'Invalid chunked transfer flag %s' % self.chunkedTransfer
+        assert isinstance(self.threadPoolSize, int) and self.threadPoolSize >= 0, \
+        'Invalid thread pool size %s' % self.threadPoolSize
+        assert isinstance(self.threadPoolQueueSize, int) and self.threadPoolQueueSize > 0, \
+        'Invalid thread pool queue size %s' % self.threadPoolQueueSize
         self.map = {}
         dispatcher.__init__(self, map=self.map)
+        
+        self._workers, self._scheduled = [], 0
+        if self.threadPoolSize:
+            trigger = Trigger(self.map)
+            for k in range(self.threadPoolSize):
+                worker = Worker(trigger, 'HTTP worker thread %s' % k)
+                worker.start()
+                self._workers.append(worker)
 
         self.processing = self.assembly.create(request=RequestHTTP, requestCnt=RequestContentHTTPAsyncore,
                                                response=ResponseHTTP, responseCnt=ResponseContentHTTP)
@@ -353,6 +603,12 @@ class AsyncServer(dispatcher):
         self.bind((self.serverHost, self.serverPort))
         self.listen(1024)  # lower this to 5 if your OS complains
 
+    def readable(self):
+        '''
+        @see: dispatcher.readable
+        '''
+        return not self.isBusy()
+
     def handle_accept(self):
         '''
         @see: dispatcher.handle_accept
@@ -369,6 +625,52 @@ class AsyncServer(dispatcher):
         # on the incoming connection
         self.requestHandlerFactory(request, address, self)
     
+    def isBusy(self):
+        '''
+        Checks if the worker threads have reached the maximum scheduled tasks, in which case no new requests should be
+        accepted or read.
+        
+        @return: boolean
+            True if the server cannot take any more requests for the moment.
+        '''
+        return self._scheduled >= self.threadPoolQueueSize if self._workers else False
+    
+    def workerFor(self):
+        '''
+        Provides the worker to execute a new request on, the worker with the fewest scheduled tasks is used. All the
+        executions for a request need to be made on the same worker since the processors are allowed to bind resources
+        to the executing thread.
+        
+        @return: Worker|None
+            The worker to use, None if the requests are processed on the asyncore loop thread.
+        '''
+        if self._workers: return min(self._workers, key=lambda worker: worker.scheduled)
+        
+    def execute(self, worker, call, callBack, *args):
+        '''
+        Executes the call using the worker, and then delivers the call result to the call back on the asyncore loop
+        thread. This method never blocks, this is why the scheduled tasks are limited by not reading new requests while
+        the server is busy.
+        
+        @param worker: Worker|None
+            The worker to execute the call on, if None the call is executed directly.
+        @param call: callable(*args)
+            The call to execute.
+        @param callBack: callable(result, *args)
+            The call back that receives the call result.
+        @param args: arguments
+            The arguments used for both the call and the call back.
+        '''
+        assert callable(call), 'Invalid call %s' % call
+        assert callable(callBack), 'Invalid call back %s' % callBack
+        if worker is None:
+            callBack(call(*args), *args)
+            return
+        assert isinstance(worker, Worker), 'Invalid worker %s' % worker
+        self._scheduled += 1
+        worker.scheduled += 1
+        worker.tasks.put_nowait((call, partial(self._delivered, worker, callBack), args))
+        
     def serve_forever(self):
         '''
         Loops and servers the connections.
@@ -381,9 +683,130 @@ class AsyncServer(dispatcher):
         Loops the provided amount of times and servers the connections.
         '''
         loop(self.timeout, True, self.map, count)
+        
+    # ----------------------------------------------------------------
+    
+    def _delivered(self, worker, callBack, result, *args):
+        '''
+        Called on the asyncore loop thread when the worker has executed a task.
+        '''
+        self._scheduled -= 1
+        worker.scheduled -= 1
+        callBack(result, *args)
+
+class Worker(Thread):
+    '''
+    The worker thread that executes the tasks scheduled by the server, the tasks results are delivered using the trigger.
+    '''
+    
+    def __init__(self, trigger, name):
+        '''
+        Construct the worker.
+        
+        @param trigger: Trigger
+            The trigger used for delivering the tasks results on the asyncore loop thread.
+        @param name: string
+            The worker thread name.
+        '''
+        assert isinstance(trigger, Trigger), 'Invalid trigger %s' % trigger
+        super().__init__(name=name)
+        self.daemon = True
+        
+        self.tasks = Queue()
+        # The unbounded tasks queue, the server is responsible for limiting the scheduled tasks.
+        self.scheduled = 0
+        # The number of tasks scheduled and not yet delivered, used only on the asyncore loop thread.
+        self._trigger = trigger
+        
+    def run(self):
+        '''
+        @see: Thread.run
+        '''
+        while True:
+            call, callBack, args = self.tasks.get()
+            try: result = call(*args)
+            except:
+                log.exception('A problem occurred while executing %s' % call)
+                result = None
+            self._trigger.call(partial(callBack, result, *args))
+
+class Trigger(dispatcher):
+    '''
+    Dispatcher used for waking up the asyncore loop in order to execute calls received from other threads.
+    '''
+    
+    def __init__(self, map):
+        '''
+        Construct the trigger.
+        
+        @param map: dictionary{integer, dispatcher}
+            The asyncore map to register the trigger with.
+        '''
+        if hasattr(socket, 'socketpair'): reader, self._writer = socket.socketpair()
+        else:
+            # Windows platforms don't support socket pairs so we connect them manually.
+            server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            server.bind(('127.0.0.1', 0))
+            server.listen(1)
+            self._writer = socket.create_connection(server.getsockname())
+            reader, _address = server.accept()
+            server.close()
+        self._writer.setblocking(False)
+        dispatcher.__init__(self, reader, map)
+        
+        self._calls = deque()
+        
+    def call(self, call):
+        '''
+        Schedules the call for execution on the asyncore loop thread.
+        
+        @param call: callable()
+            The call to be executed.
+        '''
+        assert callable(call), 'Invalid call %s' % call
+        self._calls.append(call)
+        try: self._writer.send(b'\x00')
+        except socket.error: pass  # The trigger buffer is full so the loop is going to be woken up anyway
+    
+    def readable(self):
+        '''
+        @see: dispatcher.readable
+        '''
+        return True
+    
+    def writable(self):
+        '''
+        @see: dispatcher.writable
+        '''
+        return False
+    
+    def handle_read(self):
+        '''
+        @see: dispatcher.handle_read
+        '''
+        try: self.recv(1024)
+        except socket.error: pass
+        while self._calls: self._calls.popleft()()
+    
+    def handle_error(self):
+        log.exception('A problem occurred in the server trigger')
 
 # --------------------------------------------------------------------
 
+def chunkedGenerator(source):
+    '''
+    Provides a generator that encodes the source content with the HTTP chunked transfer encoding.
+    
+    @param source: Iterable(bytes)
+        The source content to encode.
+    @return: Iterator(bytes)
+        The chunks of the encoded content.
+    '''
+    assert isinstance(source, Iterable), 'Invalid source %s' % source
+    for bytes in source:
+        if bytes: yield ('%X\r\n' % len(bytes)).encode('ascii') + bytes + b'\r\n'
+    yield b'0\r\n\r\n'
+
 def run(server):
     '''
     Run the asyncore server.
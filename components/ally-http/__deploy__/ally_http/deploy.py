@@ -0,0 +1,21 @@
+'''
+Created on Oct 18, 2026
+
+@package: ally http
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Special module that is used in deploying the application.
+'''
+
+from ..ally.deploy import deploy
+from ally.container import ioc
+from ally.http.server import server_prefork
+
+# --------------------------------------------------------------------
+
+@ioc.after(deploy)
+def runServerPrefork():
+    # The application deploy is finalized on the main thread, so it is safe to fork the prefork servers workers.
+    server_prefork.runScheduled()
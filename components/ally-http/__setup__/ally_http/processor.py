@@ -12,6 +12,7 @@ Provides the configurations for the processors used in handling the request.
 from ally.container import ioc
 from ally.design.processor.assembly import Assembly
 from ally.design.processor.handler import Handler
+from ally.http.impl.processor.conditional import ConditionalHandler
 from ally.http.impl.processor.deliver_code import DeliverCodeHandler
 from ally.http.impl.processor.header import HeaderDecodeRequestHandler, \
     HeaderDecodeResponseHandler, HeaderEncodeResponseHandler, \
@@ -19,6 +20,8 @@ from ally.http.impl.processor.header import HeaderDecodeRequestHandler, \
 from ally.http.impl.processor.headers.accept import AcceptRequestDecodeHandler, \
     AcceptRequestEncodeHandler
 from ally.http.impl.processor.headers.allow import AllowEncodeHandler
+from ally.http.impl.processor.headers.content_encoding import \
+    ContentEncodingEncodeHandler
 from ally.http.impl.processor.headers.content_length import \
     ContentLengthDecodeHandler, ContentLengthEncodeHandler
 from ally.http.impl.processor.headers.content_type import \
@@ -37,6 +40,43 @@ def read_from_params():
     '''If true will also read header values that are provided as query parameters'''
     return True
 
+@ioc.config
+def response_conditional() -> bool:
+    '''
+    If true the responses are provided with the entity tag and last modified headers (if available) and the conditional
+    GET requests are answered with 304 Not Modified when the content has not changed
+    '''
+    return True
+
+@ioc.config
+def response_conditional_maximum_size() -> int:
+    '''
+    The maximum size in bytes of the responses content for which the entity tag is computed by hashing the content, the
+    larger responses are delivered without an entity tag unless one is provided by the service
+    '''
+    return 256 * 1024
+
+@ioc.config
+def response_compression() -> bool:
+    '''If true the responses content is compressed (gzip or deflate) for the clients that accept it'''
+    return False
+
+@ioc.config
+def response_compression_level() -> int:
+    '''The compression level for the responses content, from 1 (fastest) to 9 (best compression)'''
+    return 6
+
+@ioc.config
+def response_compression_minimum_size() -> int:
+    '''The minimum size in bytes of the responses content in order to be compressed'''
+    return 1024
+
+@ioc.config
+def response_compression_types() -> list:
+    '''The content types patterns for the responses content that is compressed'''
+    return ['text/*', 'application/json', 'application/xml', 'application/javascript', 'application/*+json',
+            'application/*+xml']
+
 # --------------------------------------------------------------------
 
 @ioc.entity
@@ -72,6 +112,20 @@ def contentTypeResponseDecode() -> Handler: return ContentTypeResponseDecodeHand
 @ioc.entity
 def contentTypeResponseEncode() -> Handler: return ContentTypeResponseEncodeHandler()
 
+@ioc.entity
+def conditional() -> Handler:
+    b = ConditionalHandler()
+    b.maximumHashSize = response_conditional_maximum_size()
+    return b
+
+@ioc.entity
+def contentEncodingEncode() -> Handler:
+    b = ContentEncodingEncodeHandler()
+    b.level = response_compression_level()
+    b.minimumSize = response_compression_minimum_size()
+    b.contentTypes = response_compression_types()
+    return b
+
 @ioc.entity
 def contentLengthDecode() -> Handler: return ContentLengthDecodeHandler()
 
@@ -15,11 +15,54 @@ from ally.container import ioc
 from ally.design.processor.assembly import Assembly
 from ally.design.processor.handler import Handler
 from ally.http.impl.processor.router_by_path import RoutingByPathHandler
-from ally.http.server import server_basic
+from ally.http.server import server_basic, server_prefork
+from multiprocessing import cpu_count
 from threading import Thread
 
 # --------------------------------------------------------------------
 
+SERVER_PREFORK = 'prefork'
+# The prefork server name
+
+# --------------------------------------------------------------------
+
+@ioc.config
+def server_prefork_workers() -> int:
+    '''The number of worker processes used by the prefork server, if 0 then a worker is used for each CPU'''
+    return 0
+
+@ioc.config
+def server_prefork_shutdown_timeout() -> int:
+    '''
+    The number of seconds the prefork workers have to finalize the requests in progress when the server is shut down,
+    after this the workers are killed
+    '''
+    return 30
+
+@ioc.config
+def server_thread_pool_size() -> int:
+    '''
+    The number of worker threads used by the event loop servers (like asyncore) for processing the requests, if 0 the
+    requests are processed on the same thread that handles the connections
+    '''
+    return 0
+
+@ioc.config
+def server_thread_pool_queue_size() -> int:
+    '''
+    The maximum number of tasks scheduled on the worker threads, once reached the server stops accepting and reading new
+    requests until the workers catch up
+    '''
+    return 100
+
+ioc.doc(server_type, '''
+    "prefork" - multiple processes each running a basic server on the same port, the processes are forked after the
+                application is deployed and are restarted if they crash, works only on platforms that support fork
+                and SO_REUSEPORT
+''')
+
+# --------------------------------------------------------------------
+
 @ioc.entity
 def assemblyServer() -> Assembly:
     '''
@@ -42,6 +85,19 @@ def serverBasic():
     b.assembly = assemblyServer()
     return b
 
+@ioc.entity
+def serverPrefork():
+    b = server_prefork.PreforkServer()
+    b.serverVersion = server_version()
+    b.serverHost = server_host()
+    b.serverPort = server_port()
+    b.requestHandlerFactory = serverBasicRequestHandler()
+    b.assembly = assemblyServer()
+    b.workers = server_prefork_workers() or cpu_count()
+    b.shutdownTimeout = server_prefork_shutdown_timeout()
+    b.forkListeners = []
+    return b
+
 # --------------------------------------------------------------------
 
 @ioc.entity
@@ -61,3 +117,8 @@ def updateAssemblyServer():
 def runServer():
     if server_type() == 'basic':
         Thread(name='HTTP server thread', target=server_basic.run, args=(serverBasic(),)).start()
+
+@ioc.start
+def runServerPrefork():
+    # The workers are forked by the deploy on the main thread, after all the start calls have been executed.
+    if server_type() == SERVER_PREFORK: server_prefork.schedule(serverPrefork())
@@ -0,0 +1,124 @@
+'''
+Created on Oct 18, 2026
+
+@package: ally http
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides testing for the conditional requests handling.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from ally.container import ioc
+from ally.design.processor.attribute import defines
+from ally.design.processor.context import Context, create
+from ally.design.processor.spec import Resolvers
+from ally.http.impl.processor.conditional import ConditionalHandler
+from ally.http.impl.processor.header import DecoderHeader, EncoderHeader, \
+    HeaderConfigurations
+from ally.http.spec.server import IDecoderHeader, IEncoderHeader, HTTP_GET, \
+    HTTP_POST
+from ally.support.util_io import IInputStream
+from collections import Iterable
+import unittest
+
+# --------------------------------------------------------------------
+
+class Request(Context):
+    method = defines(str)
+    decoderHeader = defines(IDecoderHeader)
+
+class Response(Context):
+    encoderHeader = defines(IEncoderHeader)
+    code = defines(str)
+    status = defines(int)
+    isSuccess = defines(bool)
+
+class ResponseContent(Context):
+    source = defines(IInputStream, Iterable)
+    length = defines(int)
+
+ctx = create(Resolvers(contexts=dict(Request=Request, Response=Response, ResponseContent=ResponseContent)))
+Request, Response, ResponseContent = ctx['Request'], ctx['Response'], ctx['ResponseContent']
+
+# --------------------------------------------------------------------
+
+class TestConditional(unittest.TestCase):
+
+    def setUp(self):
+        self.handler = ConditionalHandler()
+        self.handler.maximumHashSize = 1024
+        ioc.initialize(self.handler)
+        self.content = b'Some content to be validated.'
+
+    def process(self, headers, source, method=HTTP_GET):
+        configuration = HeaderConfigurations()
+        request, response, responseCnt = Request(), Response(), ResponseContent()
+        request.method = method
+        request.decoderHeader = DecoderHeader(configuration, headers)
+        response.encoderHeader = EncoderHeader(configuration)
+        responseCnt.source = source
+        if isinstance(source, (tuple, list)): responseCnt.length = sum(len(bytes) for bytes in source)
+
+        self.handler.process(request, response, responseCnt)
+        return response, responseCnt
+
+    def testETag(self):
+        response, responseCnt = self.process({}, (self.content,))
+        eTag = response.encoderHeader.headers.get('ETag')
+        self.assertIsNotNone(eTag)
+        self.assertIsNone(response.status)
+        self.assertEqual((self.content,), responseCnt.source)
+
+        response, responseCnt = self.process({'If-None-Match': eTag}, (self.content,))
+        self.assertEqual(304, response.status)
+        self.assertEqual('Not modified', response.code)
+        self.assertEqual(eTag, response.encoderHeader.headers.get('ETag'))
+        self.assertIsNone(responseCnt.source)
+        self.assertIsNone(responseCnt.length)
+
+        response, _responseCnt = self.process({'If-None-Match': '"other", W/%s' % eTag}, (self.content,))
+        self.assertEqual(304, response.status)
+
+        response, _responseCnt = self.process({'If-None-Match': '*'}, (self.content,))
+        self.assertEqual(304, response.status)
+
+        response, responseCnt = self.process({'If-None-Match': '"other"'}, (self.content,))
+        self.assertIsNone(response.status)
+        self.assertEqual((self.content,), responseCnt.source)
+
+    def testStreamed(self):
+        # The streamed content has no entity tag so it can not be validated.
+        response, responseCnt = self.process({'If-None-Match': '*'}, iter((self.content,)))
+        self.assertNotIn('ETag', response.encoderHeader.headers)
+        self.assertIsNone(response.status)
+        self.assertIsNotNone(responseCnt.source)
+
+        response, _responseCnt = self.process({'If-Modified-Since': 'Sat, 01 Jan 2000 00:00:00 GMT'}, (self.content,))
+        self.assertIn('ETag', response.encoderHeader.headers)
+        self.assertIsNone(response.status)
+
+    def testNotConditional(self):
+        response, _responseCnt = self.process({}, iter((self.content,)))
+        self.assertEqual({}, response.encoderHeader.headers)
+
+        large = (b'x' * 1025,)
+        response, responseCnt = self.process({'If-None-Match': '*'}, large)
+        self.assertEqual({}, response.encoderHeader.headers)
+        self.assertEqual(large, responseCnt.source)
+
+        response, responseCnt = self.process({'If-None-Match': '*'}, (self.content,), method=HTTP_POST)
+        self.assertEqual({}, response.encoderHeader.headers)
+        self.assertIsNone(response.status)
+        self.assertEqual((self.content,), responseCnt.source)
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__': unittest.main()
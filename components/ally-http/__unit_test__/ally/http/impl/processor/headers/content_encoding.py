@@ -0,0 +1,146 @@
+'''
+Created on Oct 18, 2026
+
+@package: ally http
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides testing for the content encoding.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from ally.container import ioc
+from ally.design.processor.attribute import defines
+from ally.design.processor.context import Context, create
+from ally.design.processor.spec import Resolvers
+from ally.http.impl.processor.header import DecoderHeader, EncoderHeader, \
+    HeaderConfigurations
+from ally.http.impl.processor.headers.content_encoding import \
+    ContentEncodingEncodeHandler
+from ally.http.spec.server import IDecoderHeader, IEncoderHeader
+from ally.support.util_io import IInputStream
+from collections import Iterable
+import unittest
+import zlib
+
+# --------------------------------------------------------------------
+
+class Request(Context):
+    decoderHeader = defines(IDecoderHeader)
+
+class Response(Context):
+    headers = defines(dict)
+    encoderHeader = defines(IEncoderHeader)
+
+class ResponseContent(Context):
+    source = defines(IInputStream, Iterable)
+    type = defines(str)
+    length = defines(int)
+
+ctx = create(Resolvers(contexts=dict(Request=Request, Response=Response, ResponseContent=ResponseContent)))
+Request, Response, ResponseContent = ctx['Request'], ctx['Response'], ctx['ResponseContent']
+
+# --------------------------------------------------------------------
+
+class TestContentEncoding(unittest.TestCase):
+
+    def setUp(self):
+        self.handler = ContentEncodingEncodeHandler()
+        ioc.initialize(self.handler)
+        self.content = b'Some content to be compressed. ' * 100
+
+    def process(self, acceptEncoding, source, type='text/plain', length=None, vary=None):
+        configuration = HeaderConfigurations()
+        request, response, responseCnt = Request(), Response(), ResponseContent()
+        headers = {'Accept-Encoding': acceptEncoding} if acceptEncoding is not None else {}
+        request.decoderHeader = DecoderHeader(configuration, headers)
+        response.encoderHeader = EncoderHeader(configuration)
+        response.headers = response.encoderHeader.headers
+        if vary is not None: response.headers['Vary'] = vary
+        responseCnt.source, responseCnt.type, responseCnt.length = source, type, length
+
+        self.handler.process(request, response, responseCnt)
+        return response.encoderHeader.headers, responseCnt
+
+    def testEncodings(self):
+        headers, responseCnt = self.process('gzip', (self.content,), length=len(self.content))
+        self.assertEqual('gzip', headers.get('Content-Encoding'))
+        self.assertEqual('Accept-Encoding', headers.get('Vary'))
+        compressed = b''.join(responseCnt.source)
+        self.assertEqual(len(compressed), responseCnt.length)
+        self.assertEqual(self.content, zlib.decompress(compressed, 16 + zlib.MAX_WBITS))
+
+        headers, responseCnt = self.process('deflate', (self.content,), length=len(self.content))
+        self.assertEqual('deflate', headers.get('Content-Encoding'))
+        self.assertEqual(self.content, zlib.decompress(b''.join(responseCnt.source)))
+
+    def testQualities(self):
+        headers, _responseCnt = self.process('gzip;q=0, deflate;q=0.5', (self.content,), length=len(self.content))
+        self.assertEqual('deflate', headers.get('Content-Encoding'))
+
+        headers, _responseCnt = self.process('gzip;q=0, *', (self.content,), length=len(self.content))
+        self.assertEqual('deflate', headers.get('Content-Encoding'))
+
+        headers, _responseCnt = self.process('*;q=0', (self.content,), length=len(self.content))
+        self.assertNotIn('Content-Encoding', headers)
+
+        headers, responseCnt = self.process('identity', (self.content,), length=len(self.content))
+        self.assertNotIn('Content-Encoding', headers)
+        self.assertEqual('Accept-Encoding', headers.get('Vary'))
+        self.assertEqual((self.content,), responseCnt.source)
+
+        headers, _responseCnt = self.process(None, (self.content,), length=len(self.content))
+        self.assertNotIn('Content-Encoding', headers)
+
+    def testNotCompressed(self):
+        headers, responseCnt = self.process('gzip', (b'small',), length=5)
+        self.assertNotIn('Content-Encoding', headers)
+        self.assertEqual('Accept-Encoding', headers.get('Vary'))
+        self.assertEqual((b'small',), responseCnt.source)
+        self.assertEqual(5, responseCnt.length)
+
+        headers, responseCnt = self.process('gzip', (self.content,), type='image/png', length=len(self.content))
+        self.assertEqual({}, headers)
+        self.assertEqual((self.content,), responseCnt.source)
+
+    def testVary(self):
+        headers, _responseCnt = self.process('gzip', (self.content,), length=len(self.content), vary='Origin')
+        self.assertEqual('gzip', headers.get('Content-Encoding'))
+        self.assertEqual('Origin,Accept-Encoding', headers.get('Vary'))
+
+        headers, _responseCnt = self.process('gzip', (self.content,), length=len(self.content),
+                                             vary='Origin, accept-encoding')
+        self.assertEqual('Origin, accept-encoding', headers.get('Vary'))
+
+        headers, _responseCnt = self.process('gzip', (self.content,), length=len(self.content), vary='')
+        self.assertEqual('Accept-Encoding', headers.get('Vary'))
+
+    def testStreamed(self):
+        chunks = []
+        def source():
+            for k in range(3):
+                chunks.append(k)
+                yield self.content
+
+        headers, responseCnt = self.process('gzip', source())
+        self.assertEqual('gzip', headers.get('Content-Encoding'))
+        self.assertIsNone(responseCnt.length)
+
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        compressed = iter(responseCnt.source)
+        for k in range(3):
+            # Each chunk is flushed so it can be decompressed before the next chunk is generated.
+            self.assertEqual(self.content, decompressor.decompress(next(compressed)))
+            self.assertEqual(list(range(k + 1)), chunks)
+        self.assertEqual(b'', decompressor.decompress(b''.join(compressed)) + decompressor.flush())
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__': unittest.main()
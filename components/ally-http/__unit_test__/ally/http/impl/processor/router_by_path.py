@@ -0,0 +1,110 @@
+'''
+Created on Oct 18, 2026
+
+@package: ally http
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides testing for the routing by path combined dispatch.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from ally.container import ioc
+from ally.design.processor.assembly import Assembly
+from ally.design.processor.attribute import requires, defines
+from ally.design.processor.context import Context
+from ally.design.processor.execution import Chain
+from ally.design.processor.handler import HandlerProcessorProceed
+from ally.http.impl.processor.router_by_path import RoutingByPathHandler, \
+    RoutingByPaths
+import unittest
+
+# --------------------------------------------------------------------
+
+class Request(Context):
+    uri = defines(str)
+
+class RequestRouted(Context):
+    uri = requires(str)
+
+class Response(Context):
+    route = defines(tuple)
+
+class RouteHandler(HandlerProcessorProceed):
+
+    def __init__(self, name):
+        self.name = name
+        super().__init__()
+
+    def process(self, request:RequestRouted, response:Response, **keyargs):
+        response.route = (self.name, request.uri)
+
+# --------------------------------------------------------------------
+
+class TestRoutingByPath(unittest.TestCase):
+
+    uris = ('resources/my/a', 'resources/my.json', 'resources/mya', 'resources/x.json', 'resources', 'error/1',
+            'content', 'content/x', 'contentcon/y', 'gateway/a/b', 'other/x', '')
+
+    def assemblyFor(self, *patterns):
+        assembly = Assembly('Test routing')
+        for name, pattern in enumerate(patterns):
+            routed = Assembly('Test route %s' % name)
+            routed.add(RouteHandler(name))
+            router = RoutingByPathHandler()
+            router.pattern = pattern
+            router.assembly = routed
+            ioc.initialize(router)
+            assembly.add(router)
+        return assembly.create(request=Request, response=Response)
+
+    def routes(self, processing, sequential):
+        dispatch, = [call for call in processing.calls if isinstance(call, RoutingByPaths)]
+        if sequential: dispatch._regex = False
+        else: dispatch._regex = None
+
+        routes = []
+        for uri in self.uris:
+            request, response = processing.ctx.request(), processing.ctx.response()
+            request.uri = uri
+            Chain(processing).process(request=request, requestCnt=None, response=response, responseCnt=None).doAll()
+            routes.append((uri, response.route))
+        return dispatch, routes
+
+    def testCombined(self):
+        processing = self.assemblyFor('(^resources)\\/my((?=/|(?=\\.)|$).*)', '^resources(?:/|(?=\\.)|$)(.*)',
+                                      '^error(?:/|(?=\\.)|$)(.*)', '^(?P<name>content)(?:/|$)(.*)',
+                                      '^gateway/(a)/((?:b|c))$', '(?:.*)')
+
+        dispatch, combined = self.routes(processing, False)
+        self.assertTrue(dispatch._regex)
+        _dispatch, sequential = self.routes(processing, True)
+        self.assertEqual(sequential, combined)
+
+        self.assertIn(('resources/my/a', (0, 'resources/a')), combined)
+        self.assertIn(('resources/mya', (1, 'mya')), combined)
+        self.assertIn(('content/x', (3, 'contentx')), combined)
+        self.assertIn(('gateway/a/b', (4, 'ab')), combined)
+        self.assertIn(('contentcon/y', (5, '')), combined)
+
+    def testNotCombined(self):
+        for pattern in ('^(con)tent\\1?(?:/|$)(.*)', '^(?P<name>con)tent(?P=name)?(?:/|$)(.*)',
+                        '^(con)(?(1)tent|other)(?:/|$)(.*)', '(?i)^content(?:/|$)(.*)'):
+            processing = self.assemblyFor('^resources(?:/|(?=\\.)|$)(.*)', pattern, '(?:.*)')
+
+            dispatch, combined = self.routes(processing, False)
+            self.assertIs(False, dispatch._regex)
+            _dispatch, sequential = self.routes(processing, True)
+            self.assertEqual(sequential, combined)
+            self.assertEqual(1, dict(combined)['content/x'][0])
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__': unittest.main()
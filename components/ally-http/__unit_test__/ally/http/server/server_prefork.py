@@ -0,0 +1,154 @@
+'''
+Created on Oct 18, 2026
+
+@package: ally http
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides testing for the prefork server.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from ally.container import ioc
+from ally.design.processor.assembly import Assembly
+from ally.design.processor.attribute import requires, defines
+from ally.design.processor.context import Context
+from ally.design.processor.handler import HandlerProcessorProceed
+from ally.http.server import server_prefork, server_basic
+from collections import Iterable
+from os.path import join
+from threading import Thread, current_thread
+import os
+import shutil
+import signal
+import socket
+import tempfile
+import time
+import unittest
+
+# --------------------------------------------------------------------
+
+class Request(Context):
+    uri = requires(str)
+
+class Response(Context):
+    status = defines(int)
+    headers = defines(dict)
+
+class ResponseContent(Context):
+    source = defines(Iterable)
+
+class PidHandler(HandlerProcessorProceed):
+
+    def process(self, request:Request, response:Response, responseCnt:ResponseContent, **keyargs):
+        content = str(os.getpid()).encode()
+        response.status = 200
+        response.headers = {'Content-Length': str(len(content))}
+        responseCnt.source = (content,)
+
+# --------------------------------------------------------------------
+
+class TestPreforkServer(unittest.TestCase):
+
+    def setUp(self):
+        if not hasattr(os, 'fork') or not hasattr(socket, 'SO_REUSEPORT'): self.skipTest('No fork support')
+        self.forked = tempfile.mkdtemp()
+        # The workers bind the port separately so the port needs to be known before forking.
+        probe = socket.socket()
+        probe.bind(('127.0.0.1', 0))
+        self.port = probe.getsockname()[1]
+        probe.close()
+
+        assembly = Assembly('Test prefork')
+        assembly.add(PidHandler())
+        self.server = server_prefork.PreforkServer()
+        self.server.serverVersion = 'Test'
+        self.server.serverHost = '127.0.0.1'
+        self.server.serverPort = self.port
+        self.server.requestHandlerFactory = server_basic.RequestHandler
+        self.server.assembly = assembly
+        self.server.workers = 2
+        self.server.shutdownTimeout = 2
+        self.server.checkInterval = 0.1
+        self.server.restartDelay = 0
+        self.server.forkListeners = [lambda: open(join(self.forked, str(os.getpid())), 'w').close()]
+        ioc.initialize(self.server)
+
+    def tearDown(self):
+        if hasattr(self, 'server'):
+            self.server.shutdown()
+            # The stopped workers are collected by the signal handler on the main thread.
+            for _k in range(50):
+                if not self.server._workers: break
+                time.sleep(0.1)
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+        if hasattr(self, 'forked'): shutil.rmtree(self.forked)
+
+    def request(self):
+        for _k in range(50):
+            try: connection = socket.create_connection(('127.0.0.1', self.port), 5)
+            except socket.error: time.sleep(0.1)  # The workers might not be listening yet
+            else: break
+        else: self.fail('The workers are not responding')
+        with connection:
+            connection.sendall(b'GET / HTTP/1.0\r\n\r\n')
+            response = b''
+            while True:
+                data = connection.recv(1024)
+                if not data: break
+                response += data
+        return int(response.split(b'\r\n\r\n')[-1])
+
+    def testServeAndRestart(self):
+        self.server.prefork()
+        workers = set(self.server._workers)
+        self.assertEqual(2, len(workers))
+
+        # The workers need to be restarted on the main thread, the thread that forked them.
+        forking, fork = [], self.server._fork
+        def forkRecorded():
+            forking.append(current_thread())
+            fork()
+        self.server._fork = forkRecorded
+
+        supervisor = Thread(target=server_prefork.run, args=(self.server,))
+        supervisor.start()
+        pid = self.request()
+        self.assertIn(pid, workers)
+        self.assertIn(str(pid), os.listdir(self.forked))  # The fork listeners are called in the workers
+
+        os.kill(min(workers), signal.SIGKILL)
+        for _k in range(50):
+            if len(self.server._workers) == 2 and min(workers) not in self.server._workers: break
+            time.sleep(0.1)
+        self.assertNotIn(min(workers), self.server._workers)
+        self.assertEqual(2, len(self.server._workers))
+        self.assertIn(self.request(), self.server._workers)
+        self.assertEqual([current_thread()], forking)
+
+        self.server.shutdown()
+        supervisor.join(10)
+        self.assertFalse(supervisor.is_alive())
+        self.assertFalse(self.server._workers)
+
+    def testSchedule(self):
+        handlers = {signum: signal.getsignal(signum) for signum in (signal.SIGTERM, signal.SIGINT)}
+        try:
+            server_prefork.schedule(self.server)
+            self.assertFalse(self.server._workers)
+            server_prefork.runScheduled()
+            self.assertEqual(2, len(self.server._workers))
+            self.assertIn(self.request(), self.server._workers)
+        finally:
+            for signum, handler in handlers.items(): signal.signal(signum, handler)
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__': unittest.main()
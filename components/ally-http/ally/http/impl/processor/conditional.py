@@ -0,0 +1,141 @@
+'''
+Created on Oct 18, 2026
+
+@package: ally http
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides the entity tag response header and the conditional GET (304 Not Modified) handling.
+'''
+
+from ally.container.ioc import injected
+from ally.design.processor.attribute import requires, defines, optional
+from ally.design.processor.context import Context
+from ally.design.processor.handler import HandlerProcessorProceed
+from ally.http.spec.codes import NOT_MODIFIED
+from ally.http.spec.server import IDecoderHeader, IEncoderHeader, HTTP_GET
+from ally.support.util_io import IInputStream
+from collections import Iterable
+import hashlib
+
+# --------------------------------------------------------------------
+
+class Request(Context):
+    '''
+    The request context.
+    '''
+    # ---------------------------------------------------------------- Required
+    method = requires(str)
+    decoderHeader = requires(IDecoderHeader)
+
+class Response(Context):
+    '''
+    The response context.
+    '''
+    # ---------------------------------------------------------------- Required
+    encoderHeader = requires(IEncoderHeader)
+    # ---------------------------------------------------------------- Defined
+    code = defines(str)
+    status = defines(int)
+    isSuccess = defines(bool)
+
+class ResponseContent(Context):
+    '''
+    The response content context.
+    '''
+    # ---------------------------------------------------------------- Optional
+    source = optional(IInputStream, Iterable)
+    length = optional(int)
+
+# --------------------------------------------------------------------
+
+@injected
+class ConditionalHandler(HandlerProcessorProceed):
+    '''
+    Implementation for a processor that provides the entity tag header computed from the rendered content for the
+    successful GET responses and responds with 304 Not Modified if the if none match request header matches.
+    '''
+
+    nameETag = 'ETag'
+    # The name for the entity tag header
+    nameIfNoneMatch = 'If-None-Match'
+    # The name for the if none match header
+    maximumHashSize = 256 * 1024
+    # The maximum size of the rendered content for which the entity tag is computed, the larger content is delivered
+    # without a computed entity tag.
+
+    def __init__(self):
+        assert isinstance(self.nameETag, str), 'Invalid entity tag name %s' % self.nameETag
+        assert isinstance(self.nameIfNoneMatch, str), 'Invalid if none match name %s' % self.nameIfNoneMatch
+        assert isinstance(self.maximumHashSize, int), 'Invalid maximum hash size %s' % self.maximumHashSize
+        super().__init__()
+
+    def process(self, request:Request, response:Response, responseCnt:ResponseContent, **keyargs):
+        '''
+        @see: HandlerProcessorProceed.process
+
+        Provides the entity tag and checks the conditional request.
+        '''
+        assert isinstance(request, Request), 'Invalid request %s' % request
+        assert isinstance(response, Response), 'Invalid response %s' % response
+        assert isinstance(responseCnt, ResponseContent), 'Invalid response content %s' % responseCnt
+        assert isinstance(request.decoderHeader, IDecoderHeader), 'Invalid header decoder %s' % request.decoderHeader
+        assert isinstance(response.encoderHeader, IEncoderHeader), \
+        'Invalid response header encoder %s' % response.encoderHeader
+
+        if request.method != HTTP_GET or response.isSuccess is False: return
+        if response.status is not None and response.status != 200: return
+
+        eTag = self.eTagFor(responseCnt)
+        if eTag is None: return
+        response.encoderHeader.encode(self.nameETag, eTag)
+
+        ifNoneMatch = request.decoderHeader.retrieve(self.nameIfNoneMatch)
+        if ifNoneMatch is None or not self.isMatch(ifNoneMatch, eTag): return
+
+        response.code, response.status, response.isSuccess = NOT_MODIFIED
+        responseCnt.source = None
+        if ResponseContent.length in responseCnt: responseCnt.length = None
+
+    # ----------------------------------------------------------------
+
+    def eTagFor(self, responseCnt):
+        '''
+        Provides the strong entity tag for the response content, only the content that is already rendered and does not
+        exceed the maximum hash size is used.
+
+        @param responseCnt: ResponseContent
+            The response content to provide the entity tag for.
+        @return: string|None
+            The entity tag, None if the content is not available.
+        '''
+        assert isinstance(responseCnt, ResponseContent), 'Invalid response content %s' % responseCnt
+        if ResponseContent.source not in responseCnt: return
+        if not isinstance(responseCnt.source, (tuple, list)): return  # Only the buffered content can be used.
+        if sum(len(bytes) for bytes in responseCnt.source) > self.maximumHashSize: return
+
+        digest = hashlib.sha1()
+        for bytes in responseCnt.source: digest.update(bytes)
+        return '"%s"' % digest.hexdigest()
+
+    def isMatch(self, ifNoneMatch, eTag):
+        '''
+        Checks if the if none match header value matches the entity tag, the weak comparison is used.
+
+        @param ifNoneMatch: string
+            The if none match header value.
+        @param eTag: string
+            The entity tag to check.
+        @return: boolean
+            True if the entity tag is matched.
+        '''
+        assert isinstance(ifNoneMatch, str), 'Invalid if none match %s' % ifNoneMatch
+        assert isinstance(eTag, str), 'Invalid entity tag %s' % eTag
+        if eTag.startswith('W/'): eTag = eTag[2:]
+        for tag in ifNoneMatch.split(','):
+            tag = tag.strip()
+            if tag == '*': return True
+            if tag.startswith('W/'): tag = tag[2:]
+            if tag == eTag: return True
+        return False
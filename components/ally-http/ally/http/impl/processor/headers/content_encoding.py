@@ -0,0 +1,179 @@
+'''
+Created on Oct 18, 2026
+
+@package: ally http
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides the content encoding (compression) of the response based on the accept encoding HTTP request header.
+'''
+
+from ally.container.ioc import injected
+from ally.design.processor.attribute import requires, optional
+from ally.design.processor.context import Context
+from ally.design.processor.handler import HandlerProcessorProceed
+from ally.http.spec.server import IDecoderHeader, IEncoderHeader
+from ally.support.util_io import IInputStream, readGenerator
+from collections import Iterable
+from fnmatch import fnmatchcase
+import zlib
+
+# --------------------------------------------------------------------
+
+ENCODING_GZIP = 'gzip'
+# The gzip content encoding.
+ENCODING_DEFLATE = 'deflate'
+# The deflate content encoding.
+
+WBITS = {ENCODING_GZIP: 16 + zlib.MAX_WBITS, ENCODING_DEFLATE: zlib.MAX_WBITS}
+# The zlib window bits for the content encodings, the window bits also dictate the compressed format.
+
+# --------------------------------------------------------------------
+
+class Request(Context):
+    '''
+    The request context.
+    '''
+    # ---------------------------------------------------------------- Required
+    decoderHeader = requires(IDecoderHeader)
+
+class Response(Context):
+    '''
+    The response context.
+    '''
+    # ---------------------------------------------------------------- Optional
+    headers = optional(dict)
+    # ---------------------------------------------------------------- Required
+    encoderHeader = requires(IEncoderHeader)
+
+class ResponseContent(Context):
+    '''
+    The response content context.
+    '''
+    # ---------------------------------------------------------------- Optional
+    source = optional(IInputStream, Iterable)
+    type = optional(str)
+    length = optional(int)
+
+# --------------------------------------------------------------------
+
+@injected
+class ContentEncodingEncodeHandler(HandlerProcessorProceed):
+    '''
+    Implementation for a processor that provides the compression of the response content based on the accept encoding
+    HTTP request header, the compression is applied for both the content with a known length and the streamed content.
+    '''
+
+    nameAcceptEncoding = 'Accept-Encoding'
+    # The name for the accept encoding header
+    nameContentEncoding = 'Content-Encoding'
+    # The name for the content encoding header
+    nameVary = 'Vary'
+    # The name for the vary header
+    attrQuality = 'q'
+    # The attribute name for the encoding quality.
+    encodings = [ENCODING_GZIP, ENCODING_DEFLATE]
+    # The content encodings supported, in the order of preference.
+    contentTypes = ['text/*', 'application/json', 'application/xml', 'application/javascript', 'application/*+json',
+                    'application/*+xml']
+    # The content types patterns for the content that is compressed.
+    minimumSize = 1024
+    # The minimum size of the content with a known length in order to be compressed.
+    level = 6
+    # The compression level, from 1 (fastest) to 9 (best compression).
+
+    def __init__(self):
+        assert isinstance(self.nameAcceptEncoding, str), 'Invalid accept encoding name %s' % self.nameAcceptEncoding
+        assert isinstance(self.nameContentEncoding, str), 'Invalid content encoding name %s' % self.nameContentEncoding
+        assert isinstance(self.nameVary, str), 'Invalid vary name %s' % self.nameVary
+        assert isinstance(self.attrQuality, str), 'Invalid quality attribute name %s' % self.attrQuality
+        assert isinstance(self.encodings, list), 'Invalid encodings %s' % self.encodings
+        if __debug__:
+            for encoding in self.encodings: assert encoding in WBITS, 'Unknown encoding %s' % encoding
+        assert isinstance(self.contentTypes, list), 'Invalid content types %s' % self.contentTypes
+        assert isinstance(self.minimumSize, int), 'Invalid minimum size %s' % self.minimumSize
+        assert isinstance(self.level, int) and 0 < self.level < 10, 'Invalid compression level %s' % self.level
+        super().__init__()
+
+    def process(self, request:Request, response:Response, responseCnt:ResponseContent, **keyargs):
+        '''
+        @see: HandlerProcessorProceed.process
+
+        Encodes the response content.
+        '''
+        assert isinstance(request, Request), 'Invalid request %s' % request
+        assert isinstance(response, Response), 'Invalid response %s' % response
+        assert isinstance(responseCnt, ResponseContent), 'Invalid response content %s' % responseCnt
+        assert isinstance(request.decoderHeader, IDecoderHeader), 'Invalid header decoder %s' % request.decoderHeader
+        assert isinstance(response.encoderHeader, IEncoderHeader), \
+        'Invalid response header encoder %s' % response.encoderHeader
+
+        if ResponseContent.source not in responseCnt or responseCnt.source is None: return
+        if ResponseContent.type not in responseCnt or not responseCnt.type: return
+        for pattern in self.contentTypes:
+            if fnmatchcase(responseCnt.type, pattern): break
+        else: return  # The content is not compressible
+
+        vary = response.headers.get(self.nameVary) if Response.headers in response and response.headers else None
+        if not vary: response.encoderHeader.encode(self.nameVary, self.nameAcceptEncoding)
+        elif self.nameAcceptEncoding.lower() not in (name.strip().lower() for name in vary.split(',')):
+            # The vary header is already set by another processor so we just add the accept encoding to it.
+            response.encoderHeader.encode(self.nameVary, vary, self.nameAcceptEncoding)
+
+        length = responseCnt.length if ResponseContent.length in responseCnt else None
+        if length is not None and length < self.minimumSize: return
+
+        encoding = self.encodingFor(request.decoderHeader.decode(self.nameAcceptEncoding))
+        if encoding is None: return
+        response.encoderHeader.encode(self.nameContentEncoding, encoding)
+
+        if isinstance(responseCnt.source, IInputStream): source = readGenerator(responseCnt.source)
+        else: source = responseCnt.source
+
+        if length is None: responseCnt.source = self.compressGenerator(source, encoding)
+        else:
+            compressor = zlib.compressobj(self.level, zlib.DEFLATED, WBITS[encoding])
+            content = b''.join(compressor.compress(bytes) for bytes in source) + compressor.flush()
+            responseCnt.source = (content,)
+            responseCnt.length = len(content)
+
+    # ----------------------------------------------------------------
+
+    def encodingFor(self, accepted):
+        '''
+        Provides the content encoding to use for the accepted encodings.
+
+        @param accepted: list[tuple(string, dictionary{string, string})]|None
+            The decoded accept encoding header.
+        @return: string|None
+            The content encoding to use, None if no compression is accepted.
+        '''
+        if not accepted: return
+        qualities = {}
+        for value, attributes in accepted:
+            try: quality = float(attributes.get(self.attrQuality) or 1)
+            except ValueError: quality = 0
+            qualities[value.lower()] = quality
+
+        default = qualities.get('*', 0)
+        for encoding in self.encodings:
+            if qualities.get(encoding, default) > 0: return encoding
+
+    def compressGenerator(self, source, encoding):
+        '''
+        Provides a generator that compresses the streamed content, each content chunk is flushed in order to keep the
+        content streaming.
+
+        @param source: Iterable(bytes)
+            The content to compress.
+        @param encoding: string
+            The content encoding to compress with.
+        @return: Iterator(bytes)
+            The compressed content chunks.
+        '''
+        assert isinstance(source, Iterable), 'Invalid source %s' % source
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, WBITS[encoding])
+        for bytes in source:
+            if bytes: yield compressor.compress(bytes) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        yield compressor.flush()
@@ -14,8 +14,8 @@ from ally.design.processor.assembly import Assembly
 from ally.design.processor.attribute import requires
 from ally.design.processor.context import Context, copy
 from ally.design.processor.execution import Chain, Processing
-from ally.design.processor.handler import HandlerBranching
-from ally.design.processor.processor import Routing
+from ally.design.processor.handler import Handler
+from ally.design.processor.processor import Routing, Brancher
 import logging
 import re
 
@@ -35,10 +35,12 @@ class Request(Context):
 # --------------------------------------------------------------------
 
 @injected
-class RoutingByPathHandler(HandlerBranching):
+class RoutingByPathHandler(Handler):
     '''
     Implementation for a handler that provides the routing of requests based on regex patterns. The regex needs to provide
-    capturing groups that joined will become the routed uri. 
+    capturing groups that joined will become the routed uri.
+    The consecutive routing handlers from an assembly are compiled into a single dispatch that finds the route in one
+    regex pass, @see: RoutingByPaths.
     '''
     
     pattern = str
@@ -53,7 +55,7 @@ class RoutingByPathHandler(HandlerBranching):
         assert isinstance(self.pattern, str), 'Invalid pattern %s' % self.pattern
         assert isinstance(self.assembly, Assembly), 'Invalid assembly %s' % self.assembly
         assert isinstance(self.useSameContexts, bool), 'Invalid use same contexts flag %s' % self.useSameContexts
-        super().__init__(Routing(self.assembly, self.useSameContexts))
+        super().__init__(BrancherRouting(self, Routing(self.assembly, self.useSameContexts)))
         
         self._regex = re.compile(self.pattern)
             
@@ -63,21 +65,155 @@ class RoutingByPathHandler(HandlerBranching):
         
         Process the routing.
         '''
+        assert isinstance(request, Request), 'Invalid request %s' % request
+        
+        match = self._regex.match(request.uri)
+        if match: self.route(chain, processing, match.groups(), request, requestCnt, response, responseCnt)
+        else: chain.proceed()
+            
+    def route(self, chain, processing, groups, request, requestCnt, response, responseCnt):
+        '''
+        Routes the request to the provided processing.
+        
+        @param processing: Processing
+            The processing to route to.
+        @param groups: tuple(string)
+            The groups captured by the pattern match, joined will become the routed uri.
+        '''
         assert isinstance(chain, Chain), 'Invalid chain %s' % chain
         assert isinstance(processing, Processing), 'Invalid processing %s' % processing
         assert isinstance(request, Request), 'Invalid request %s' % request
         
+        if not self.useSameContexts:
+            req, reqCnt = processing.ctx.request(), processing.ctx.requestCnt()
+            copy(request, req)
+            copy(requestCnt, reqCnt)
+            request, requestCnt = req, reqCnt
+            response, responseCnt = processing.ctx.response(), processing.ctx.responseCnt()
+            
+        request.uri = ''.join(groups)
+        chain.update(request=request, requestCnt=requestCnt, response=response, responseCnt=responseCnt)
+        chain.branch(processing)
+
+# --------------------------------------------------------------------
+
+class BrancherRouting(Brancher):
+    '''
+    The brancher used by the routing handler, instead of registering a call for each routing handler the consecutive
+    routing handlers are registered into the same @see: RoutingByPaths call.
+    '''
+    __slots__ = ('router',)
+    
+    def __init__(self, router, *branches):
+        '''
+        Construct the routing brancher.
+        @see: Brancher.__init__
+        
+        @param router: RoutingByPathHandler
+            The router handler of the brancher.
+        '''
+        assert isinstance(router, RoutingByPathHandler), 'Invalid router %s' % router
+        self.router = router
+        super().__init__(router.process, *branches)
+        
+    def register(self, sources, resolvers, extensions, calls, report):
+        '''
+        @see: Brancher.register
+        '''
+        super().register(sources, resolvers, extensions, calls, report)
+        calls.pop()  # We remove the brancher call since the routing call is used instead.
+        
+        processing, = self.processings
+        if calls and isinstance(calls[-1], RoutingByPaths): calls[-1].add(self.router, processing)
+        else: calls.append(RoutingByPaths(self.router, processing))
+        
+    def clone(self):
+        '''
+        @see: Brancher.clone
+        '''
+        return BrancherRouting(self.router, *self.branches)
+
+class RoutingByPaths:
+    '''
+    The call that dispatches the requests for consecutive routing handlers. The routers patterns are combined in a single
+    regex having a named group for each router, in the order of the routers, so the first router that matches is
+    found in one pass regardless of the number of routers.
+    '''
+    __slots__ = ('routes', '_regex', '_indexes')
+    
+    def __init__(self, router, processing):
+        '''
+        Construct the routing call with the first route.
+        
+        @param router: RoutingByPathHandler
+            The first router.
+        @param processing: Processing
+            The processing to route to.
+        '''
+        self.routes = []
+        self.add(router, processing)
+        
+    def add(self, router, processing):
+        '''
+        Adds a new route that has lower priority than the existing routes.
+        
+        @param router: RoutingByPathHandler
+            The router.
+        @param processing: Processing
+            The processing to route to.
+        '''
+        assert isinstance(router, RoutingByPathHandler), 'Invalid router %s' % router
+        assert isinstance(processing, Processing), 'Invalid processing %s' % processing
+        self.routes.append((router, processing))
+        self._regex = None
+        
+    def __call__(self, chain, request, requestCnt, response, responseCnt, **keyargs):
+        '''
+        Dispatch the request to the matching route.
+        '''
+        assert isinstance(chain, Chain), 'Invalid chain %s' % chain
+        assert isinstance(request, Request), 'Invalid request %s' % request
+        if self._regex is None: self._compile()
+        
+        if self._regex is False:
+            for router, processing in self.routes:
+                match = router._regex.match(request.uri)
+                if match:
+                    router.route(chain, processing, match.groups(), request, requestCnt, response, responseCnt)
+                    return
+            chain.proceed()
+            return
+        
         match = self._regex.match(request.uri)
-        if match:
-            if not self.useSameContexts:
-                req, reqCnt = processing.ctx.request(), processing.ctx.requestCnt()
-                copy(request, req)
-                copy(requestCnt, reqCnt)
-                request, requestCnt = req, reqCnt
-                response, responseCnt = processing.ctx.response(), processing.ctx.responseCnt()
-                
-            request.uri = ''.join(match.groups())
-            chain.update(request=request, requestCnt=requestCnt, response=response, responseCnt=responseCnt)
-            chain.branch(processing)
-        else:
+        if match is None:
             chain.proceed()
+            return
+        
+        index, start, end = self._indexes[match.lastgroup]
+        router, processing = self.routes[index]
+        router.route(chain, processing, match.groups()[start:end], request, requestCnt, response, responseCnt)
+
+    # ----------------------------------------------------------------
+    
+    def _compile(self):
+        '''
+        Compiles the combined regex for the routes, if the patterns cannot be combined (for instance they contain back
+        references or conditional group references) the routes will be matched one by one.
+        '''
+        patterns, self._indexes, start = [], {}, 0
+        for index, (router, _processing) in enumerate(self.routes):
+            assert isinstance(router, RoutingByPathHandler), 'Invalid router %s' % router
+            if re.search('\\\\\\d|\\(\\?P=|\\(\\?\\(|\\(\\?[aiLmsux]+\\)', router.pattern):
+                log.info('Cannot combine the routing pattern \'%s\', using sequential routing', router.pattern)
+                self._regex = False
+                return
+            name = 'route%s' % index
+            patterns.append('(?P<%s>%s)' % (name, router.pattern))
+            # The route groups start after the named group of the route.
+            self._indexes[name] = (index, start + 1, start + 1 + router._regex.groups)
+            start += 1 + router._regex.groups
+        
+        try: self._regex = re.compile('|'.join(patterns))
+        except re.error:
+            log.info('Cannot combine the routing patterns %s, using sequential routing', [router.pattern for router, _processing in self.routes])
+            self._regex = False
@@ -16,10 +16,12 @@ from ally.design.processor.execution import Processing, Chain
 from ally.http.spec.server import RequestHTTP, ResponseHTTP, RequestContentHTTP, \
     ResponseContentHTTP, HTTP_GET, HTTP_POST, HTTP_PUT, HTTP_DELETE, HTTP_OPTIONS, \
     HTTP
-from ally.support.util_io import readGenerator, IInputStream
+from ally.support.util_io import readGenerator, IInputStream, FileRegion, \
+    sendFileRegion
 from http.server import HTTPServer, BaseHTTPRequestHandler
 from urllib.parse import urlparse, parse_qsl
 import logging
+import socket
 
 # --------------------------------------------------------------------
 
@@ -102,11 +104,30 @@ class RequestHandler(BaseHTTPRequestHandler):
         self.end_headers()
 
         if ResponseContentHTTP.source in responseCnt and responseCnt.source is not None:
+            if isinstance(responseCnt.source, FileRegion):
+                self._sendFile(responseCnt.source)
+                return
+            
             if isinstance(responseCnt.source, IInputStream): source = readGenerator(responseCnt.source)
             else: source = responseCnt.source
 
             for bytes in source: self.wfile.write(bytes)
 
+    def _sendFile(self, region):
+        '''
+        Sends the file region directly from the file if the platform supports it, otherwise the region is read and
+        written.
+        
+        @param region: FileRegion
+            The file region to send.
+        '''
+        assert isinstance(region, FileRegion), 'Invalid region %s' % region
+        with region:
+            self.wfile.flush()
+            while region.length > 0:
+                if sendFileRegion(self.connection, region) is None: break
+            for bytes in readGenerator(region, self.server.bufferSize): self.wfile.write(bytes)
+
     # ----------------------------------------------------------------
 
     def log_message(self, format, *args):
@@ -134,6 +155,11 @@ class BasicServer(HTTPServer):
     # and client address.
     assembly = Assembly
     # The assembly used for resolving the requests
+    bufferSize = 64 * 1024
+    # The buffer size used for writing the file content when the file cannot be sent directly.
+    reusePort = False
+    # Flag indicating that the server socket should be bound with SO_REUSEPORT, this allows multiple processes to
+    # listen on the same port with the connections being balanced by the operating system.
     
     def __init__(self):
         '''
@@ -144,10 +170,19 @@ class BasicServer(HTTPServer):
         assert isinstance(self.serverPort, int), 'Invalid server port %s' % self.serverPort
         assert callable(self.requestHandlerFactory), 'Invalid request handler factory %s' % self.requestHandlerFactory
         assert isinstance(self.assembly, Assembly), 'Invalid assembly %s' % self.assembly
+        assert isinstance(self.bufferSize, int) and self.bufferSize > 0, 'Invalid buffer size %s' % self.bufferSize
+        assert isinstance(self.reusePort, bool), 'Invalid reuse port flag %s' % self.reusePort
         super().__init__((self.serverHost, self.serverPort), self.requestHandlerFactory)
 
         self.processing = self.assembly.create(request=RequestHTTP, requestCnt=RequestContentHTTP,
                                                response=ResponseHTTP, responseCnt=ResponseContentHTTP)
+        
+    def server_bind(self):
+        '''
+        @see: HTTPServer.server_bind
+        '''
+        if self.reusePort: self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+        super().server_bind()
 
 # --------------------------------------------------------------------
 
@@ -0,0 +1,237 @@
+'''
+Created on Oct 18, 2026
+
+@package: ally http
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides the prefork web server, a master process that forks worker processes each running a basic server that accepts
+connections on a shared SO_REUSEPORT socket, this way the requests are handled on multiple CPUs.
+The workers are forked on the main thread once the application deploy is finalized, @see: schedule.
+'''
+
+from .server_basic import BasicServer, RequestHandler
+from ally.container.ioc import injected, initialize
+from ally.design.processor.assembly import Assembly
+from collections import Callable
+from threading import Thread, Timer
+import errno
+import logging
+import os
+import signal
+import socket
+import time
+
+# --------------------------------------------------------------------
+
+log = logging.getLogger(__name__)
+
+_scheduled = []
+# The prefork servers scheduled to be run once the application deploy is finalized.
+
+# --------------------------------------------------------------------
+
+@injected
+class PreforkServer:
+    '''
+    The prefork server, manages the worker processes. The workers are forked only when the server is run, so they will
+    have the same setup as the master process has at that moment. The workers inherit all the master resources, this
+    is why the fork listeners need to release in the workers the resources that cannot be shared, like the database
+    connection pools.
+    '''
+
+    serverVersion = str
+    # The server version name
+    serverHost = str
+    # The server address host
+    serverPort = int
+    # The server port
+    requestHandlerFactory = RequestHandler
+    # The factory that provides request handlers, takes as arguments the server, request socket
+    # and client address.
+    assembly = Assembly
+    # The assembly used for resolving the requests
+    workers = int
+    # The number of worker processes.
+    shutdownTimeout = 30
+    # The number of seconds the workers have to finalize the requests in progress when the server is shut down, after
+    # this the workers are killed.
+    restartDelay = 1
+    # The number of seconds to wait before restarting a worker that has stopped right after it was started, this
+    # prevents restarting continuously a worker that fails at startup.
+    checkInterval = 1
+    # The number of seconds between the checks made by the server thread for all the worker processes being stopped.
+    forkListeners = []
+    # The callables (without arguments) that are invoked in each worker process right after it is forked.
+
+    def __init__(self):
+        '''
+        Construct the prefork server.
+        '''
+        assert isinstance(self.serverVersion, str), 'Invalid server version %s' % self.serverVersion
+        assert isinstance(self.serverHost, str), 'Invalid server host %s' % self.serverHost
+        assert isinstance(self.serverPort, int), 'Invalid server port %s' % self.serverPort
+        assert callable(self.requestHandlerFactory), 'Invalid request handler factory %s' % self.requestHandlerFactory
+        assert isinstance(self.assembly, Assembly), 'Invalid assembly %s' % self.assembly
+        assert isinstance(self.workers, int) and self.workers > 0, 'Invalid workers count %s' % self.workers
+        assert isinstance(self.shutdownTimeout, (int, float)), 'Invalid shutdown timeout %s' % self.shutdownTimeout
+        assert isinstance(self.restartDelay, (int, float)), 'Invalid restart delay %s' % self.restartDelay
+        assert isinstance(self.checkInterval, (int, float)), 'Invalid check interval %s' % self.checkInterval
+        assert isinstance(self.forkListeners, list), 'Invalid fork listeners %s' % self.forkListeners
+        if __debug__:
+            for listener in self.forkListeners: assert isinstance(listener, Callable), 'Invalid listener %s' % listener
+
+        if not hasattr(os, 'fork'): raise OSError('The prefork server requires a platform that supports fork')
+        if not hasattr(socket, 'SO_REUSEPORT'): raise OSError('The prefork server requires SO_REUSEPORT support')
+
+        self._workers = {}
+        self._running = False
+
+    def prefork(self):
+        '''
+        Forks the workers, this needs to be called on the main thread while no other thread is executing application
+        code, since the workers only inherit the forking thread and everything the other threads hold (like locks) remains
+        locked in the workers. For the same reason the stopped workers are also restarted on the main thread, by the
+        SIGCHLD signal handler that is installed here (python executes the signal handlers only on the main thread).
+        '''
+        self._running = True
+        signal.signal(signal.SIGCHLD, lambda signum, frame: self.check())
+        while len(self._workers) < self.workers: self._fork()
+
+    def serve_forever(self):
+        '''
+        Forks the workers, if not already forked, and waits for them to stop, any worker that stops is restarted on the
+        main thread until the server is shut down. Once the workers are forked this only waits, so it can be called on
+        any thread in order to keep the application running.
+        '''
+        if not self._running: self.prefork()
+
+        while self._workers: time.sleep(self.checkInterval)
+
+    def check(self):
+        '''
+        Checks the workers processes and restarts the workers that have stopped, this needs to be called on the main
+        thread, @see: prefork.
+        '''
+        for pid, started in list(self._workers.items()):
+            try: wpid, status = os.waitpid(pid, os.WNOHANG)
+            except OSError as e:
+                if e.errno != errno.ECHILD: raise
+                wpid, status = pid, None
+            if wpid == 0: continue
+
+            # The check can be interrupted by the handler of another signal that already handled the worker.
+            if self._workers.pop(pid, None) is None: continue
+            if not self._running: continue
+            log.error('The worker process %s has stopped with status %s, restarting it', pid, status)
+            if time.time() - started < self.restartDelay: time.sleep(self.restartDelay)
+            self._fork()
+
+    def shutdown(self):
+        '''
+        Shuts down the server, the workers are signaled to finalize the requests in progress and the workers that did not
+        stop in the shutdown timeout are killed.
+        '''
+        if not self._running: return
+        self._running = False
+        log.info('Shutting down %s worker processes', len(self._workers))
+        self._signal(signal.SIGTERM)
+
+        killer = Timer(self.shutdownTimeout, self._signal, (signal.SIGKILL,))
+        killer.daemon = True
+        killer.start()
+
+    # ----------------------------------------------------------------
+
+    def _fork(self):
+        '''
+        Forks a new worker process.
+        '''
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                for listener in self.forkListeners: listener()
+                self._serve()
+            except:
+                log.exception('A problem occurred in the worker process %s', os.getpid())
+                code = 1
+            finally: os._exit(code)
+
+        self._workers[pid] = time.time()
+        log.info('Started worker process %s', pid)
+
+    def _serve(self):
+        '''
+        Runs the basic server in the worker process, until the SIGTERM signal is received.
+        '''
+        signal.signal(signal.SIGINT, signal.SIG_IGN)  # The master process is the one handling the interrupt
+        signal.signal(signal.SIGCHLD, signal.SIG_DFL)  # Only the master process restarts workers
+
+        server = BasicServer()
+        server.serverVersion = self.serverVersion
+        server.serverHost = self.serverHost
+        server.serverPort = self.serverPort
+        server.requestHandlerFactory = self.requestHandlerFactory
+        server.assembly = self.assembly
+        server.reusePort = True
+        initialize(server)
+
+        # The shutdown waits for the serving loop to finalize, so it cannot be called on the serving thread.
+        signal.signal(signal.SIGTERM, lambda signum, frame: Thread(target=server.shutdown).start())
+        server.serve_forever()
+        server.server_close()
+
+    def _signal(self, signum):
+        '''
+        Sends the signal to all the workers processes.
+        '''
+        for pid in list(self._workers):
+            try: os.kill(pid, signum)
+            except OSError: pass  # The worker is already stopped
+
+# --------------------------------------------------------------------
+
+def schedule(server):
+    '''
+    Schedules the prefork server to be run once the application deploy is finalized, the deploy needs to call
+    @see: runScheduled after all the application start calls have been executed.
+
+    @param server: PreforkServer
+        The server to schedule.
+    '''
+    assert isinstance(server, PreforkServer), 'Invalid server %s' % server
+    _scheduled.append(server)
+
+def runScheduled():
+    '''
+    Runs the scheduled prefork servers, this needs to be called on the main thread after all the application start calls
+    have been executed. The workers are forked and restarted on the main thread, the separate server thread only waits
+    for the workers to stop in order to keep the application running.
+    '''
+    while _scheduled:
+        server = _scheduled.pop(0)
+        assert isinstance(server, PreforkServer), 'Invalid server %s' % server
+        # The signals can only be handled on the main thread.
+        for signum in (signal.SIGTERM, signal.SIGINT): signal.signal(signum, lambda signum, frame: server.shutdown())
+        server.prefork()
+        Thread(name='HTTP prefork server thread', target=run, args=(server,)).start()
+
+def run(server):
+    '''
+    Run the prefork server.
+
+    @param server: PreforkServer
+        The server to run.
+    '''
+    assert isinstance(server, PreforkServer), 'Invalid server %s' % server
+
+    try:
+        log.info('=' * 50 + ' Started prefork HTTP server with %s workers...' % server.workers)
+        server.serve_forever()
+        log.info('=' * 50 + ' The prefork server has stopped')
+    except:
+        log.exception('=' * 50 + ' The server has stooped')
+        try: server.shutdown()
+        except: pass
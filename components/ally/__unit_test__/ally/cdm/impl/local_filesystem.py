@@ -22,10 +22,11 @@ from ally.cdm.spec import PathNotFound
 from ally.zip.util_zip import normOSPath
 from datetime import datetime
 from io import BytesIO
-from os import makedirs, remove, sep, stat
+from os import makedirs, remove, sep, stat, listdir, utime
 from os.path import join, dirname, isfile, isdir
 from shutil import rmtree
 from tempfile import NamedTemporaryFile, TemporaryDirectory
+import gzip
 import json
 import re
 import unittest
@@ -252,6 +253,78 @@ class TestHTTPDelivery(unittest.TestCase):
             rmtree(join(d.getRepositoryPath(), 'testlink2'))
             remove(dstLinkPath)
 
+    def testListeners(self):
+        d = HTTPDelivery()
+        rootDir = TemporaryDirectory()
+        d.serverURI = 'http://localhost/content/'
+        d.repositoryPath = rootDir.name
+        changed = []
+        cdm = LocalFileSystemLinkCDM()
+        cdm.delivery = d
+        cdm.listeners = [changed.append]
+
+        cdm.publishContent('testdir9/content.txt', BytesIO(b'content'))
+        self.assertEqual(['testdir9/content.txt'], changed)
+        cdm.remove('/testdir9/content.txt')
+        self.assertEqual(['testdir9/content.txt', 'testdir9/content.txt'], changed)
+        cdm.publishFromFile('testlink3', join(dirname(__file__), 'test.zip', 'dir1') + sep)
+        self.assertEqual('testlink3', changed[-1])
+        cdm.remove('testlink3/subdir1/file1.txt')
+        self.assertEqual('testlink3/subdir1/file1.txt', changed[-1])
+
+    def testCompress(self):
+        d = HTTPDelivery()
+        rootDir = TemporaryDirectory()
+        d.serverURI = 'http://localhost/content/'
+        d.repositoryPath = rootDir.name
+        cdm = LocalFileSystemCDM()
+        cdm.delivery = d
+        cdm.compress = True
+
+        content = b'body { color: red; }\n' * 100
+        cdm.publishContent('testdir10/style.css', BytesIO(content))
+        cdm.publishContent('testdir10/small.css', BytesIO(b'body {}'))
+        cdm.publishContent('testdir10/image.png', BytesIO(content))
+        dirPath = join(d.getRepositoryPath(), 'testdir10')
+        self.assertEqual(['image.png', 'small.css', 'style.css', 'style.css.gz'], sorted(listdir(dirPath)))
+        with gzip.open(join(dirPath, 'style.css.gz')) as f: self.assertEqual(content, f.read())
+
+        cdm.republish('testdir10/style.css', 'testdir10/main.css')
+        self.assertEqual(['image.png', 'main.css', 'main.css.gz', 'small.css'], sorted(listdir(dirPath)))
+        cdm.remove('testdir10/main.css')
+        self.assertEqual(['image.png', 'small.css'], sorted(listdir(dirPath)))
+
+    def testCompressLinked(self):
+        d = HTTPDelivery()
+        rootDir = TemporaryDirectory()
+        d.serverURI = 'http://localhost/content/'
+        d.repositoryPath = rootDir.name
+        cdm = LocalFileSystemLinkCDM()
+        cdm.delivery = d
+        cdm.compress = True
+
+        newDir, oldDir = TemporaryDirectory(), TemporaryDirectory()
+        newContent, oldContent = b'body { color: red; }\n' * 100, b'body { color: blue; }\n' * 100
+        makedirs(join(newDir.name, 'css'))
+        with open(join(newDir.name, 'css', 'style.css'), 'wb') as f: f.write(newContent)
+        makedirs(join(oldDir.name, 'css'))
+        with open(join(oldDir.name, 'css', 'style.css'), 'wb') as f: f.write(oldContent)
+        utime(join(oldDir.name, 'css', 'style.css'), (0, 0))
+        utime(oldDir.name, (0, 0))
+
+        cdm.publishFromDir('testlink4', newDir.name)
+        compressedPath = join(d.getRepositoryPath(), 'testlink4', 'css', 'style.css.gz')
+        with gzip.open(compressedPath) as f: self.assertEqual(newContent, f.read())
+        self.assertAlmostEqual(stat(join(newDir.name, 'css', 'style.css')).st_mtime, stat(compressedPath).st_mtime, 3)
+
+        # The link resolves now to an older source, the compressed sibling needs to be generated again.
+        cdm.publishFromDir('testlink4', oldDir.name)
+        with gzip.open(compressedPath) as f: self.assertEqual(oldContent, f.read())
+
+        # The timestamp is provided by the linked source not by the directory holding the compressed siblings.
+        self.assertEqual(datetime.fromtimestamp(0), cdm.getTimestamp('testlink4'))
+        self.assertEqual(datetime.fromtimestamp(0), cdm.getTimestamp('testlink4/css/style.css'))
+
 if __name__ == "__main__":
     # import sys;sys.argv = ['', 'Test.testName']
     unittest.main()
@@ -0,0 +1,111 @@
+'''
+Created on Oct 18, 2026
+
+@package: ally base
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides testing for the processors chain execution.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from ally.design.processor.execution import Chain, Processing, ProceedingCall, \
+    bindingFor
+import unittest
+
+# --------------------------------------------------------------------
+
+class TestExecution(unittest.TestCase):
+
+    def testProceeding(self):
+        executed = []
+        def first(data): executed.append(('first', data))
+        def second(chain, data):
+            executed.append(('second', data))
+            chain.update(data=data + 1)
+        def third(data): executed.append(('third', data))
+
+        chain = Chain(Processing((ProceedingCall(first), second, ProceedingCall(third))))
+        chain.process(data=1).doAll()
+        self.assertEqual([('first', 1), ('second', 1), ('third', 2)], executed)
+        self.assertTrue(chain.isConsumed())
+
+    def testStop(self):
+        executed = []
+        def first(chain, data): executed.append('first')
+        def second(data): executed.append('second')
+
+        chain = Chain((first, ProceedingCall(second)))
+        chain.process(data=1).doAll()
+        self.assertEqual(['first'], executed)
+        self.assertFalse(chain.isConsumed())
+
+    def testBranchAndCallBacks(self):
+        executed = []
+        def branched(data): executed.append('branched')
+        def first(chain, data):
+            chain.callBack(lambda: executed.append('callBack'))
+            chain.branch(Processing((ProceedingCall(branched),)))
+        def skipped(data): executed.append('skipped')
+
+        chain = Chain(Processing((first, ProceedingCall(skipped))))
+        chain.process(data=1).doAll()
+        self.assertEqual(['branched', 'callBack'], executed)
+
+    def testCallBackError(self):
+        executed = []
+        def first(chain, data): chain.callBackError(lambda: executed.append('error'))
+        def failing(data): raise ValueError()
+
+        chain = Chain((first, ProceedingCall(failing)))
+        chain.process(data=1).doAll()
+        self.assertEqual(['error'], executed)
+
+        self.assertRaises(ValueError, Chain((ProceedingCall(failing),)).process(data=1).doAll)
+
+    def testBinding(self):
+        def scenario(processing):
+            executed = []
+            class Handler:
+                def __call__(self, chain, data, **keyargs):
+                    executed.append(('handler', data, sorted(keyargs)))
+                    chain.callBack(lambda: executed.append('callBack'))
+                    chain.callBackError(lambda: executed.append('error'))
+            def branched(data, flag=False, *, other=None, **keyargs): executed.append(('branched', data, flag, other))
+            def failing(data, **keyargs): raise ValueError()
+            def first(chain, data, extra, **keyargs):
+                executed.append(('first', data, extra))
+                chain.update(data=data + 1, flag=True)
+                chain.branch(processing((Handler(), ProceedingCall(branched), ProceedingCall(failing))))
+
+            chain = Chain(processing((first, ProceedingCall(branched))))
+            chain.process(data=1, extra='x', other='y').doAll()
+            return executed
+
+        def unbound(calls):
+            processing = Processing(calls)
+            processing._steps = [(call, direct, None) for call, direct, _binding in processing.steps]
+            return processing
+
+        executed = scenario(Processing)
+        self.assertEqual(executed, scenario(unbound))
+        self.assertEqual([('first', 1, 'x'), ('handler', 2, ['extra', 'flag', 'other']), ('branched', 2, True, 'y'),
+                          'error', 'callBack'], executed)
+
+    def testBindingFailures(self):
+        def call(chain, data): pass
+        self.assertIsNotNone(bindingFor(call, False))
+        self.assertRaises(TypeError, Chain((call,)).process(data=1, extra=2).doAll)
+        self.assertRaises(TypeError, Chain((call,)).process(other=1).doAll)
+        self.assertIsNone(bindingFor(lambda *args, **keyargs: None, True))
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__': unittest.main()
@@ -0,0 +1,59 @@
+'''
+Created on Oct 18, 2026
+
+@package: ally base
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Testing for the I/O utility.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from ally.support.util_io import FileRegion, sendFileRegion, readGenerator
+from tempfile import TemporaryFile
+import socket
+import unittest
+
+# --------------------------------------------------------------------
+
+class TestFileRegion(unittest.TestCase):
+
+    def setUp(self):
+        self.content = bytes(range(256)) * 10
+        self.file = TemporaryFile()
+        self.file.write(self.content)
+        self.file.flush()
+
+    def tearDown(self):
+        self.file.close()
+
+    def testRead(self):
+        region = FileRegion(self.file, 100, 1000)
+        self.assertEqual(self.content[100:1100], b''.join(readGenerator(region, 64)))
+        self.assertEqual(0, region.length)
+        self.assertEqual(1100, region.offset)
+
+    def testSend(self):
+        if not hasattr(socket, 'socketpair'): return
+        region = FileRegion(self.file, 10, 2000)
+        sender, receiver = socket.socketpair()
+        try:
+            while region.length > 0:
+                if sendFileRegion(sender, region) is None: sender.sendall(region.read())
+            received = b''
+            while len(received) < 2000: received += receiver.recv(2000)
+            self.assertEqual(self.content[10:2010], received)
+        finally:
+            sender.close()
+            receiver.close()
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__': unittest.main()
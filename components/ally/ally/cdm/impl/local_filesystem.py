@@ -14,15 +14,19 @@ from ally.container.ioc import injected
 from ally.zip.util_zip import ZIPSEP, normOSPath, normZipPath, getZipFilePath, \
     validateInZipPath
 from datetime import datetime
+from fnmatch import fnmatchcase
+from mimetypes import guess_type
 from os.path import isdir, isfile, join, dirname, normpath, relpath, abspath
 from shutil import copyfile, copyfileobj, move, rmtree
 from tempfile import TemporaryDirectory
 from urllib.parse import urljoin
 from zipfile import ZipFile
 import abc
+import gzip
 import json
 import logging
 import os
+import struct
 
 # --------------------------------------------------------------------
 
@@ -103,9 +107,30 @@ class LocalFileSystemCDM(ICDM):
 
     delivery = IDelivery
     # The delivery protocol
+    listeners = None
+    # The list of callables that take as an argument the content path, the listeners are notified whenever the content
+    # for the path or under the path is published, republished or removed.
+    compress = False
+    # Flag indicating that the compressed (gzip) siblings are generated for the published content that is compressible.
+    compressTypes = ['text/*', 'application/json', 'application/xml', 'application/javascript', 'application/*+json',
+                     'application/*+xml']
+    # The content types patterns for the content that is compressed.
+    compressMinimumSize = 1024
+    # The minimum size of the content in order to be compressed.
+    compressLevel = 9
+    # The compression level, from 1 (fastest) to 9 (best compression).
+    _compressedExt = '.gz'
+    # Extension of the compressed siblings.
 
     def __init__(self):
         assert isinstance(self.delivery, IDelivery), 'Invalid delivery protocol %s' % self.delivery
+        if self.listeners is None: self.listeners = []
+        assert isinstance(self.listeners, list), 'Invalid listeners %s' % self.listeners
+        assert isinstance(self.compress, bool), 'Invalid compress flag %s' % self.compress
+        assert isinstance(self.compressTypes, list), 'Invalid compress types %s' % self.compressTypes
+        assert isinstance(self.compressMinimumSize, int), 'Invalid compress minimum size %s' % self.compressMinimumSize
+        assert isinstance(self.compressLevel, int) and 0 < self.compressLevel < 10, \
+        'Invalid compression level %s' % self.compressLevel
 
     def publishFromFile(self, path, filePath):
         '''
@@ -127,13 +152,17 @@ class LocalFileSystemCDM(ICDM):
             if fileInfo.filename.endswith(ZIPSEP):
                 raise IOError('Trying to publish a file from a ZIP directory path: %s' % fileInfo.filename)
             if not self._isSyncFile(zipFilePath, dstFilePath):
-                copyfileobj(zipFile.open(inFilePath), open(dstFilePath, 'w+b'))
+                with open(dstFilePath, 'w+b') as dstFile: copyfileobj(zipFile.open(inFilePath), dstFile)
                 assert log.debug('Success publishing ZIP file %s (%s) to path %s', inFilePath, zipFilePath, path) or True
+                self._compress(dstFilePath)
+                self._notifyChanged(path)
             return
         assert os.access(filePath, os.R_OK), 'Unable to read the file path %s' % filePath
         if not self._isSyncFile(filePath, dstFilePath):
             copyfile(filePath, dstFilePath)
             assert log.debug('Success publishing file %s to path %s', filePath, path) or True
+            self._compress(dstFilePath)
+            self._notifyChanged(path)
 
     def publishFromDir(self, path, dirPath):
         '''
@@ -148,6 +177,7 @@ class LocalFileSystemCDM(ICDM):
             if not inDirPath.endswith(ZIPSEP): inDirPath = inDirPath + ZIPSEP
             self._copyZipDir(zipFilePath, inDirPath, fullPath)
             assert log.debug('Success publishing ZIP dir %s (%s) to path %s', inDirPath, zipFilePath, path) or True
+            self._notifyChanged(path)
             return
         dirPath = normpath(dirPath)
         assert os.access(dirPath, os.R_OK), 'Unable to read the directory path %s' % dirPath
@@ -172,6 +202,8 @@ class LocalFileSystemCDM(ICDM):
         with open(dstFilePath, 'w+b') as dstFile:
             copyfileobj(content, dstFile)
             assert log.debug('Success publishing content to path %s', path) or True
+        self._compress(dstFilePath)
+        self._notifyChanged(path)
 
 
     def republish(self, oldPath, newPath):
@@ -188,6 +220,10 @@ class LocalFileSystemCDM(ICDM):
         if not isdir(dstDir):
             os.makedirs(dstDir)
         move(oldFullPath, newFullPath)
+        if isfile(oldFullPath + self._compressedExt):
+            move(oldFullPath + self._compressedExt, newFullPath + self._compressedExt)
+        self._notifyChanged(oldPath)
+        self._notifyChanged(newPath)
 
     def remove(self, path):
         '''
@@ -198,9 +234,11 @@ class LocalFileSystemCDM(ICDM):
             rmtree(itemPath)
         elif isfile(itemPath):
             os.remove(itemPath)
+            self._removeCompressed(itemPath)
         else:
             raise PathNotFound(path)
         assert log.debug('Success removing path %s', path) or True
+        self._notifyChanged(path)
 
     def getSupportedProtocols(self):
         '''
@@ -249,6 +287,99 @@ class LocalFileSystemCDM(ICDM):
         with open(dstFilePath, 'w+b') as dstFile:
             copyfileobj(fileObj, dstFile)
             assert log.debug('Success publishing stream to path %s', path) or True
+        self._compress(dstFilePath)
+        self._notifyChanged(path)
+
+    def _notifyChanged(self, path):
+        '''
+        Notifies the listeners that the content for the path or under the path has changed.
+
+        @param path: string
+            The normalized content path that has changed.
+        '''
+        if not self.listeners: return
+        for listener in self.listeners: listener(path)
+
+    def _compress(self, dstFilePath, srcFilePath=None, zipFile=None):
+        '''
+        Generates the compressed sibling for a published file if the compression is enabled and the file is compressible,
+        otherwise any compressed sibling left from a previous publishing is removed. The sibling gets the modification
+        time of the source (the file or the ZIP archive) and is not generated again if is already generated for the same
+        source modification time and size.
+
+        @param dstFilePath: string
+            The repository file path for which to generate the compressed sibling.
+        @param srcFilePath: string|None
+            The path of the file to compress, or the path in the ZIP archive if a ZIP archive is provided, if None the
+            repository file is compressed.
+        @param zipFile: ZipFile|None
+            The ZIP archive that contains the file to compress.
+        '''
+        if not self.compress: return
+        if srcFilePath is None: srcFilePath = dstFilePath
+        if zipFile is None: stat = os.stat(srcFilePath)
+        else: stat = os.stat(zipFile.filename)
+        size = stat.st_size if zipFile is None else zipFile.getinfo(srcFilePath).file_size
+
+        compressedPath = dstFilePath + self._compressedExt
+        if size < self.compressMinimumSize or not self._isCompressible(dstFilePath):
+            self._removeCompressed(dstFilePath)
+            return
+        if self._isCompressedFor(compressedPath, stat.st_mtime, size): return
+
+        if not isdir(dirname(compressedPath)): os.makedirs(dirname(compressedPath))
+        srcFile = open(srcFilePath, 'rb') if zipFile is None else zipFile.open(srcFilePath)
+        # The sibling is compressed in a temporary file so the delivery will not use a partially compressed sibling.
+        with srcFile, open(compressedPath + '.tmp', 'wb') as dstFile:
+            with gzip.GzipFile('', 'wb', self.compressLevel, dstFile) as gzipFile: copyfileobj(srcFile, gzipFile)
+        os.utime(compressedPath + '.tmp', (stat.st_atime, stat.st_mtime))
+        if isfile(compressedPath): os.remove(compressedPath)
+        os.rename(compressedPath + '.tmp', compressedPath)
+        assert log.debug('Success compressing file %s to %s', srcFilePath, compressedPath) or True
+
+    def _isCompressedFor(self, compressedPath, modified, size):
+        '''
+        Checks if the compressed sibling is generated for the source with the provided modification time and size, the
+        size is checked against the uncompressed size stored at the end of the gzip file.
+
+        @param compressedPath: string
+            The compressed sibling path.
+        @param modified: float
+            The source modification time.
+        @param size: integer
+            The source size.
+        @return: boolean
+            True if the compressed sibling is generated for the source.
+        '''
+        if not isfile(compressedPath) or abs(os.stat(compressedPath).st_mtime - modified) > 0.001: return False
+        with open(compressedPath, 'rb') as f:
+            f.seek(-4, os.SEEK_END)
+            return struct.unpack('<I', f.read(4))[0] == size & 0xFFFFFFFF
+
+    def _isCompressible(self, filePath):
+        '''
+        Checks if the file type is compressible.
+
+        @param filePath: string
+            The file path to check.
+        @return: boolean
+            True if the file is compressible.
+        '''
+        type, encoding = guess_type(filePath)
+        if not type or encoding: return False
+        for pattern in self.compressTypes:
+            if fnmatchcase(type, pattern): return True
+        return False
+
+    def _removeCompressed(self, dstFilePath):
+        '''
+        Removes the compressed sibling of the repository file path if there is one.
+
+        @param dstFilePath: string
+            The repository file path to remove the compressed sibling for.
+        '''
+        compressedPath = dstFilePath.rstrip(os.sep) + self._compressedExt
+        if isfile(compressedPath): os.remove(compressedPath)
 
     def _getItemPath(self, path):
         return join(self.delivery.getRepositoryPath(), normOSPath(path.lstrip(os.sep), True))
@@ -295,6 +426,10 @@ class LocalFileSystemCDM(ICDM):
             if isfile(dstPath): os.remove(dstPath)
             elif isdir(dstPath): rmtree(dstPath)
             move(join(tmpDirPath, entry), path)
+        if self.compress:
+            for root, _dirs, files in os.walk(path):
+                for file in files:
+                    if not file.endswith(self._compressedExt): self._compress(join(root, file))
 
 
 @injected
@@ -341,7 +476,10 @@ class LocalFileSystemLinkCDM(LocalFileSystemCDM):
         '''
         path, entryPath = self._validatePath(path)
         if isfile(entryPath.rstrip(os.sep)):
-            return os.remove(entryPath)
+            os.remove(entryPath)
+            self._removeCompressed(entryPath)
+            self._notifyChanged(path)
+            return
 
         linkPath = entryPath
         repPathLen = len(self.delivery.getRepositoryPath())
@@ -369,6 +507,8 @@ class LocalFileSystemLinkCDM(LocalFileSystemCDM):
             raise PathNotFound(path)
         if len(subPath.strip(os.sep)) == 0 and isdir(linkPath):
             rmtree(linkPath)
+        self._removeCompressed(entryPath)
+        self._notifyChanged(path)
 
     def getURI(self, path, protocol='http'):
         '''
@@ -389,7 +529,7 @@ class LocalFileSystemLinkCDM(LocalFileSystemCDM):
         '''
         assert isinstance(path, str), 'Invalid content path %s' % path
         path, entryPath = self._validatePath(path)
-        if isdir(entryPath) or isfile(entryPath):
+        if isfile(entryPath):
             return datetime.fromtimestamp(os.stat(entryPath).st_mtime)
 
         linkPath = entryPath
@@ -406,12 +546,16 @@ class LocalFileSystemLinkCDM(LocalFileSystemCDM):
                             return datetime.fromtimestamp(os.stat(fullPath).st_mtime)
                         elif link[0] == self._zipHeader and self._isValidZIPLink(link, subPath):
                             return datetime.fromtimestamp(os.stat(link[1]).st_mtime)
-                    raise PathNotFound(path)
+                break
             nextLinkPath = dirname(linkPath)
             if nextLinkPath == linkPath: break
             linkPath = nextLinkPath
-        else:
-            raise PathNotFound(path)
+
+        # The linked directories can also exist in the repository if they contain compressed siblings, so the directories
+        # are used only if there is no link for them.
+        if isdir(entryPath):
+            return datetime.fromtimestamp(os.stat(entryPath).st_mtime)
+        raise PathNotFound(path)
 
     def _createDelMark(self, path):
         '''
@@ -538,6 +682,14 @@ class LocalFileSystemLinkCDM(LocalFileSystemCDM):
             filePath = normpath(filePath)
             assert os.access(filePath, os.R_OK), 'Unable to read file path %s' % filePath
             self._createLinkToFileOrDir(path, filePath)
+            if self.compress:
+                itemPath = self._getItemPath(path)
+                if isfile(filePath): self._compress(itemPath, filePath)
+                else:
+                    for root, _dirs, files in os.walk(filePath):
+                        for file in files:
+                            self._compress(join(itemPath, relpath(join(root, file), filePath)), join(root, file))
+            self._notifyChanged(path)
             return
 
         # not a file, see if it's a entry in a zip file
@@ -547,3 +699,11 @@ class LocalFileSystemLinkCDM(LocalFileSystemCDM):
         zipFile = ZipFile(zipFilePath)
         validateInZipPath(zipFile, inFilePath)
         self._createLinkToZipFile(path, zipFilePath, inFilePath)
+        if self.compress:
+            itemPath, inFilePath = self._getItemPath(path), normZipPath(inFilePath)
+            for name in zipFile.namelist():
+                if name.endswith(ZIPSEP): continue
+                if name == inFilePath: self._compress(itemPath, name, zipFile)
+                elif name.startswith(inFilePath.rstrip(ZIPSEP) + ZIPSEP):
+                    self._compress(join(itemPath, normOSPath(name[len(inFilePath.rstrip(ZIPSEP)) + 1:])), name, zipFile)
+        self._notifyChanged(path)
@@ -11,6 +11,8 @@ Contains the classes used in the execution of processors.
 
 from .spec import ContextMetaClass
 from collections import Iterable, deque
+from inspect import getfullargspec, isfunction, ismethod
+from keyword import iskeyword
 import logging
 
 # --------------------------------------------------------------------
@@ -18,14 +20,172 @@ import logging
 log = logging.getLogger(__name__)
 
 # --------------------------------------------------------------------
+
+class ProceedingCall:
+    '''
+    Wraps a call that does not require the chain and will always proceed the chain execution. The chain detects the
+    proceeding calls and executes them directly without the chain argument and proceeds by itself.
+    '''
+    __slots__ = ('call',)
+    
+    def __init__(self, call):
+        '''
+        Construct the proceeding call.
+        
+        @param call: callable(**keyargs)
+            The call to be invoked with the chain arguments.
+        '''
+        assert callable(call), 'Invalid call %s' % call
+        self.call = call
+        
+    def __call__(self, chain, **keyargs):
+        '''
+        Invokes the call and proceeds the chain, used whenever the call is executed outside the chain steps.
+        '''
+        assert isinstance(chain, Chain), 'Invalid processors chain %s' % chain
+        self.call(**keyargs)
+        chain.proceed()
+        
+    def __str__(self): return str(self.call)
+
+class Binding:
+    '''
+    The arguments binding plan for a step call, provides for the chain arguments names an invoker that is generated once
+    and calls the step with the chain arguments without building a key arguments dictionary for each call.
+    '''
+    __slots__ = ('direct', 'args', 'required', 'kwonly', 'varkw', '_invokers')
+    
+    def __init__(self, direct, args, required, kwonly, varkw):
+        '''
+        Construct the binding.
+        
+        @param direct: boolean
+            Flag indicating that the call is invoked without the chain.
+        @param args: tuple(string)
+            The names of the call positional arguments, without the self and chain arguments.
+        @param required: set(string)
+            The names of the arguments that have no default value.
+        @param kwonly: tuple(string)
+            The names of the call key only arguments.
+        @param varkw: boolean
+            Flag indicating that the call accepts any other key arguments.
+        '''
+        assert isinstance(direct, bool), 'Invalid direct flag %s' % direct
+        assert isinstance(args, tuple), 'Invalid arguments %s' % args
+        assert isinstance(required, set), 'Invalid required arguments %s' % required
+        assert isinstance(kwonly, tuple), 'Invalid key only arguments %s' % kwonly
+        assert isinstance(varkw, bool), 'Invalid variable key arguments flag %s' % varkw
+        self.direct = direct
+        self.args = args
+        self.required = required
+        self.kwonly = kwonly
+        self.varkw = varkw
+        
+        self._invokers = {}
+        
+    def invokerFor(self, names):
+        '''
+        Provides the invoker for the chain arguments names.
+        
+        @param names: tuple(string)
+            The names of the chain arguments.
+        @return: callable(call, chain, arg)
+            The invoker that calls the step with the chain arguments.
+        '''
+        invoker = self._invokers.get(names)
+        if invoker is None: invoker = self._invokers[names] = self._generate(names)
+        return invoker
+        
+    # ----------------------------------------------------------------
+    
+    def _generate(self, names):
+        '''
+        Generates the invoker code for the chain arguments names.
+        '''
+        assert isinstance(names, tuple), 'Invalid names %s' % names
+        if self.direct: generic, params = lambda call, chain, arg: call(**arg.__dict__), []
+        else: generic, params = lambda call, chain, arg: call(chain, **arg.__dict__), ['chain']
+        
+        present = set(names)
+        # The calls that are not satisfied by the arguments are called as before in order to fail in the same way.
+        if not self.required.issubset(present): return generic
+        if not self.varkw and not present.issubset(self.args + self.kwonly): return generic
+        for name in names:
+            if not name.isidentifier() or iskeyword(name): return generic
+        
+        keywords = False
+        for name in self.args:
+            if name not in present: keywords = True  # The arguments after a defaulted argument are provided by name
+            elif keywords: params.append('%s=arg.%s' % (name, name))
+            else: params.append('arg.%s' % name)
+        for name in names:
+            if name not in self.args: params.append('%s=arg.%s' % (name, name))
+        
+        namespace = {}
+        exec('def invoke(call, chain, arg): call(%s)' % ', '.join(params), namespace)
+        return namespace['invoke']
+
+def bindingFor(call, direct):
+    '''
+    Provides the arguments binding plan for the call.
+    
+    @param call: callable
+        The call to provide the binding for.
+    @param direct: boolean
+        Flag indicating that the call is invoked without the chain.
+    @return: Binding|None
+        The binding for the call, None if the call arguments cannot be inspected and the call needs to be invoked with
+        the chain arguments as key arguments.
+    '''
+    assert callable(call), 'Invalid call %s' % call
+    function = call
+    if not isfunction(function) and not ismethod(function): function = getattr(type(call), '__call__', None)
+    if not isfunction(function) and not ismethod(function): return
+    
+    try: fnArgs = getfullargspec(function)
+    except TypeError: return
+    if fnArgs.varargs: return
+    
+    args = fnArgs.args
+    if function is not call or ismethod(function): args = args[1:]  # Removing the self argument
+    if not direct:
+        if not args: return
+        args = args[1:]  # Removing the chain argument
+    
+    required = set(args[:len(args) - len(fnArgs.defaults or ())])
+    if fnArgs.kwonlyargs:
+        required.update(name for name in fnArgs.kwonlyargs if name not in (fnArgs.kwonlydefaults or {}))
+    return Binding(direct, tuple(args), required, tuple(fnArgs.kwonlyargs or ()), bool(fnArgs.varkw))
+
+def stepsFor(calls):
+    '''
+    Compiles the provided calls into the steps executed by the chain. A step is a tuple containing the callable to be invoked,
+    a flag indicating that the callable is invoked directly with the arguments (without the chain) and the chain
+    proceeds automatically after it, and the arguments binding plan of the callable.
+    
+    @param calls: Iterable(callable)
+        The calls to compile.
+    @return: list[tuple(callable, boolean, Binding|None)]
+        The steps for the calls.
+    '''
+    assert isinstance(calls, Iterable), 'Invalid calls %s' % calls
+    steps = []
+    for call in calls:
+        assert callable(call), 'Invalid processor call %s' % call
+        if isinstance(call, ProceedingCall): steps.append((call.call, True, bindingFor(call.call, True)))
+        else: steps.append((call, False, bindingFor(call, False)))
+    return steps
+
+# --------------------------------------------------------------------
         
 class Processing:
     '''
     Container for processor's, provides chains for their execution.
-    !!! Attention, never ever use a processing in multiple threads, only one thread is allowed to execute 
-    a processing at one time.
+    !!! Attention, a processing can be used by multiple threads only if each chain created from it is executed entirely
+    by one thread, a chain that is paused (for instance while waiting for the request content) needs to be resumed on
+    the same thread since the processors are allowed to bind resources (like database sessions) to the executing thread.
     '''
-    __slots__ = ('ctx', '_calls')
+    __slots__ = ('ctx', '_calls', '_steps')
 
     class Ctx:
         '''
@@ -52,6 +212,7 @@ class Processing:
         self._calls = list(calls)
         if __debug__:
             for call in self._calls: assert callable(call), 'Invalid call %s' % call
+        self._steps = stepsFor(self._calls)
                 
         self.ctx = Processing.Ctx()
         if contexts:
@@ -70,6 +231,10 @@ class Processing:
     @rtype: Iterable(call)
     The iterable containing the calls of this processing.
     ''')
+    steps = property(lambda self: self._steps, doc='''
+    @rtype: Iterable(tuple(callable, boolean, Binding|None))
+    The iterable containing the compiled calls steps of this processing, @see: stepsFor.
+    ''')
     
     def update(self, **contexts):
         '''
@@ -110,7 +275,7 @@ class Chain:
     A chain that contains a list of processors (callables) that are executed one by one. Each processor will have
     the duty to proceed with the processing if is the case by calling the chain.
     '''
-    __slots__ = ('arg', '_calls', '_callBacks', '_callBacksErrors', '_consumed', '_proceed')
+    __slots__ = ('arg', '_names', '_calls', '_callBacks', '_callBacksErrors', '_consumed', '_proceed')
 
     class Arg:
         '''
@@ -132,12 +297,10 @@ class Chain:
         '''
         if isinstance(processing, Processing):
             assert isinstance(processing, Processing)
-            processing = processing.calls
-        assert isinstance(processing, Iterable), 'Invalid processing %s' % processing
-        self._calls = deque(processing)
-        if __debug__:
-            for call in self._calls: assert callable(call), 'Invalid processor call %s' % call
+            self._calls = deque(processing.steps)
+        else: self._calls = deque(stepsFor(processing))
         self.arg = Chain.Arg()
+        self._names = None
         self._callBacks = deque()
         self._callBacksErrors = deque()
         self._consumed = False
@@ -168,6 +331,7 @@ class Chain:
         assert not self._consumed, 'Chain is consumed cannot process'
         self.arg.__dict__.clear()
         for key, value in keyargs.items(): setattr(self.arg, key, value)
+        self._names = None
         self._proceed = True
         return self
     
@@ -183,6 +347,7 @@ class Chain:
         '''
         assert not self._consumed, 'Chain is consumed cannot update'
         for key, value in keyargs.items(): setattr(self.arg, key, value)
+        self._names = None
         self._proceed = True
         return self
         
@@ -197,12 +362,11 @@ class Chain:
         @return: this chain
             This chain for chaining purposes.
         '''
+        self._calls.clear()
         if isinstance(processing, Processing):
             assert isinstance(processing, Processing)
-            processing = processing.calls
-        assert isinstance(processing, Iterable), 'Invalid processing %s' % processing
-        self._calls.clear()
-        self._calls.extend(processing)
+            self._calls.extend(processing.steps)
+        else: self._calls.extend(stepsFor(processing))
         self._proceed = True
         return self
     
@@ -248,10 +412,17 @@ class Chain:
         assert self._calls, 'Nothing to execute'
         assert self._proceed, 'Cannot proceed if no process is called'
         
-        call = self._calls.popleft()
+        call, direct, binding = self._calls.popleft()
         assert log.debug('Processing %s', call) or True
         self._proceed = False
-        try: call(self, **self.arg.__dict__)
+        try:
+            if binding is not None:
+                names = self._names
+                if names is None: self._names = names = tuple(self.arg.__dict__)
+                binding.invokerFor(names)(call, self, self.arg)
+            elif direct: call(**self.arg.__dict__)
+            else: call(self, **self.arg.__dict__)
+            if direct: self._proceed = True
         except:
             if self._callBacksErrors:
                 self._proceed = False
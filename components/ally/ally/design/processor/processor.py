@@ -11,7 +11,7 @@ Module containing processors.
 
 from .assembly import Assembly, Container
 from .context import create, createDefinition
-from .execution import Chain, Processing
+from .execution import Processing, ProceedingCall
 from .spec import AssemblyError, IProcessor, ContextMetaClass, ProcessorError, \
     Resolvers, IReport, ResolverError
 from ally.support.util_sys import locationStack
@@ -163,12 +163,7 @@ class Contextual(Processor):
         @return: callable
             The wrapped call.
         '''
-        if self.proceed:
-            def wrapper(chain, **keyargs):
-                assert isinstance(chain, Chain), 'Invalid processors chain %s' % chain
-                call(**keyargs)
-                chain.proceed()
-            return wrapper
+        if self.proceed: return ProceedingCall(call)
         return call
     
     # ----------------------------------------------------------------
@@ -18,6 +18,7 @@ from os.path import isfile, normpath, join, dirname
 from shutil import copy, move
 from zipfile import ZipFile, ZipInfo
 import abc
+import errno
 import os
 from tempfile import TemporaryDirectory
 from stat import S_IEXEC
@@ -345,3 +346,85 @@ class KeepOpen:
 
     def __getattr__(self, name): return getattr(self._fileObj, name)
 
+
+class FileRegion:
+    '''
+    Provides the reading of a region from a file, the servers that are capable can send the region directly from the
+    file descriptor (zero copy) using the region offset and length. The offset and length are updated with each read.
+    '''
+    __slots__ = ['_fileObj', 'offset', 'length']
+
+    def __init__(self, fileObj, offset, length):
+        '''
+        Construct the file region.
+
+        @param fileObj: file
+            The opened binary file object, the file object needs to provide a file descriptor and seek.
+        @param offset: integer
+            The offset in the file where the region starts.
+        @param length: integer
+            The length of the region.
+        '''
+        assert fileObj, 'A file object is required %s' % fileObj
+        assert isinstance(fileObj, IInputStream), 'Invalid file object %s does not have a read method' % fileObj
+        assert isinstance(offset, int) and offset >= 0, 'Invalid offset %s' % offset
+        assert isinstance(length, int) and length >= 0, 'Invalid length %s' % length
+        self._fileObj = fileObj
+        self.offset = offset
+        self.length = length
+
+    def fileno(self):
+        '''
+        Provides the file descriptor of the region file.
+        '''
+        return self._fileObj.fileno()
+
+    def read(self, count=None):
+        '''
+        Perform the region read.
+        '''
+        if self.length <= 0: return b''
+        if count is None or count < 0 or count > self.length: count = self.length
+        self._fileObj.seek(self.offset)
+        data = self._fileObj.read(count)
+        self.offset += len(data)
+        self.length -= len(data)
+        return data
+
+    def close(self):
+        '''
+        Closes the region file.
+        '''
+        self._fileObj.close()
+
+    def __enter__(self): return self
+
+    def __exit__(self, *args): self.close()
+
+# --------------------------------------------------------------------
+
+def sendFileRegion(sock, region):
+    '''
+    Sends the file region on the socket using the operating system sendfile (zero copy), the region offset and length
+    are updated with the sent bytes.
+
+    @param sock: socket
+        The socket to send the region on.
+    @param region: FileRegion
+        The file region to send.
+    @return: integer|None
+        The number of bytes sent, 0 if the non blocking socket is not ready, None if the sendfile is not available for
+        the socket or region, in which case the region needs to be read and written.
+    '''
+    assert isinstance(region, FileRegion), 'Invalid region %s' % region
+    if not hasattr(os, 'sendfile'): return
+    if region.length <= 0: return 0
+    try: sent = os.sendfile(sock.fileno(), region.fileno(), region.offset, region.length)
+    except OSError as e:
+        if e.errno in (errno.EAGAIN, errno.EWOULDBLOCK): return 0
+        if e.errno in (errno.EINVAL, errno.ENOSYS, errno.ENOTSOCK, errno.EOPNOTSUPP): return
+        raise
+    if sent == 0: raise IOError('Unexpected end of file for region at offset %s' % region.offset)
+    region.offset += sent
+    region.length -= sent
+    return sent
@@ -11,7 +11,8 @@ Provides the configurations for delivering files from the local file system.
 
 from ..ally_http.processor import contentLengthEncode, allowEncode, \
     internalError, contentTypeResponseEncode
-from __setup__.ally_http.processor import headerEncodeResponse
+from __setup__.ally_http.processor import headerEncodeResponse, \
+    headerDecodeRequest
 from ally.container import ioc
 from ally.core.cdm.processor.content_delivery import ContentDeliveryHandler
 from ally.design.processor.assembly import Assembly
@@ -25,6 +26,25 @@ def repository_path():
     ''' The repository absolute or relative (to the distribution folder) path from where to serve the files '''
     return path.join('workspace', 'shared', 'cdm')
 
+@ioc.config
+def content_cache_size():
+    ''' The maximum number of content paths for which the resolved file metadata is kept in memory '''
+    return 10000
+
+@ioc.config
+def content_zip_pool_size():
+    ''' The maximum number of ZIP archives, from which the content is delivered, that are kept opened '''
+    return 50
+
+@ioc.config
+def content_cache_control():
+    '''
+    The cache control max age in seconds for the delivered content based on the content path prefix, the longest
+    matching prefix is used, use the empty prefix for all the content. The content is always delivered with the
+    validators so the browsers can check if the content changed once the max age expires.
+    '''
+    return {'lib/': 600}
+
 # --------------------------------------------------------------------
 # Creating the processors used in handling the request
 
@@ -32,6 +52,9 @@ def repository_path():
 def contentDelivery() -> Handler:
     b = ContentDeliveryHandler()
     b.repositoryPath = repository_path()
+    b.cacheSize = content_cache_size()
+    b.zipPoolSize = content_zip_pool_size()
+    b.cacheControl = content_cache_control()
     return b
 
 # --------------------------------------------------------------------
@@ -47,6 +70,6 @@ def assemblyContent() -> Assembly:
 
 @ioc.before(assemblyContent)
 def updateAssemblyContent():
-    assemblyContent().add(internalError(), headerEncodeResponse(), contentDelivery(), allowEncode(), contentTypeResponseEncode(),
-                          contentLengthEncode())
+    assemblyContent().add(internalError(), headerDecodeRequest(), headerEncodeResponse(), contentDelivery(), allowEncode(),
+                          contentTypeResponseEncode(), contentLengthEncode())
     
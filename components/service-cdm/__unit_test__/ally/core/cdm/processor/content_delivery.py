@@ -0,0 +1,473 @@
+'''
+Created on Oct 18, 2026
+
+@package: service cdm
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides testing for the content delivery byte ranges.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from ally.cdm.impl.local_filesystem import HTTPDelivery, LocalFileSystemCDM
+from ally.container import ioc
+from ally.core.cdm.processor.content_delivery import ContentDeliveryHandler
+from ally.design.processor.attribute import defines
+from ally.design.processor.context import Context, create
+from ally.design.processor.spec import Resolvers
+from ally.http.impl.processor.header import DecoderHeader, EncoderHeader, \
+    HeaderConfigurations
+from ally.http.spec.server import IDecoderHeader, IEncoderHeader, HTTP_GET
+from ally.support.util_io import IInputStream
+from collections import Iterable
+from email.utils import formatdate
+from io import BytesIO
+from os.path import join
+from tempfile import TemporaryDirectory
+from zipfile import ZipFile, ZIP_DEFLATED
+import gzip
+import json
+import os
+import time
+import unittest
+
+# --------------------------------------------------------------------
+
+class Request(Context):
+    scheme = defines(str)
+    uri = defines(str)
+    method = defines(str)
+    decoderHeader = defines(IDecoderHeader)
+
+class Response(Context):
+    encoderHeader = defines(IEncoderHeader)
+    headers = defines(dict)
+    code = defines(str)
+    status = defines(int)
+    isSuccess = defines(bool)
+    allows = defines(list)
+
+class ResponseContent(Context):
+    source = defines(IInputStream, Iterable)
+    length = defines(int)
+    type = defines(str)
+
+ctx = create(Resolvers(contexts=dict(Request=Request, Response=Response, ResponseContent=ResponseContent)))
+Request, Response, ResponseContent = ctx['Request'], ctx['Response'], ctx['ResponseContent']
+
+# --------------------------------------------------------------------
+
+class TestContentDeliveryRanges(unittest.TestCase):
+
+    def setUp(self):
+        self.repository = TemporaryDirectory()
+        self.content = bytes(range(256)) * 40
+
+        with open(join(self.repository.name, 'plain.bin'), 'wb') as f: f.write(self.content)
+        zipPath = join(self.repository.name, 'archive.zip')
+        with ZipFile(zipPath, 'w', ZIP_DEFLATED) as zipFile: zipFile.writestr('member.bin', self.content)
+        with open(join(self.repository.name, 'zipped.link'), 'w') as f: json.dump([['ZIP', zipPath, '']], f)
+
+        self.handler = ContentDeliveryHandler()
+        self.handler.repositoryPath = self.repository.name
+        ioc.initialize(self.handler)
+
+    def tearDown(self):
+        self.handler.closeZipFile(join(self.repository.name, 'archive.zip'))
+        self.repository.cleanup()
+
+    def process(self, uri, headers, encoded=None):
+        configuration = HeaderConfigurations()
+        request, response, responseCnt = Request(), Response(), ResponseContent()
+        request.scheme, request.uri, request.method = 'http', uri, HTTP_GET
+        request.decoderHeader = DecoderHeader(configuration, headers)
+        response.encoderHeader = EncoderHeader(configuration)
+        response.headers = response.encoderHeader.headers
+        if encoded: response.headers.update(encoded)
+
+        self.handler.process(request, response, responseCnt)
+
+        if responseCnt.source is None: data = None
+        elif isinstance(responseCnt.source, IInputStream):
+            data = responseCnt.source.read()
+            responseCnt.source.close()
+        else: data = b''.join(responseCnt.source)
+        if data is not None: self.assertEqual(len(data), responseCnt.length)
+        return response.status, response.encoderHeader.headers, data
+
+    def testSingle(self):
+        for uri in ('plain.bin', 'zipped/member.bin'):
+            status, headers, data = self.process(uri, {'Range': 'bytes=10-19'})
+            self.assertEqual(206, status)
+            self.assertEqual('bytes 10-19/10240', headers.get('Content-Range'))
+            self.assertEqual(self.content[10:20], data)
+
+            status, headers, data = self.process(uri, {'Range': 'bytes=10230-'})
+            self.assertEqual(206, status)
+            self.assertEqual('bytes 10230-10239/10240', headers.get('Content-Range'))
+            self.assertEqual(self.content[10230:], data)
+
+    def testSuffix(self):
+        for uri in ('plain.bin', 'zipped/member.bin'):
+            status, headers, data = self.process(uri, {'Range': 'bytes=-5'})
+            self.assertEqual(206, status)
+            self.assertEqual('bytes 10235-10239/10240', headers.get('Content-Range'))
+            self.assertEqual(self.content[-5:], data)
+
+            status, headers, data = self.process(uri, {'Range': 'bytes=-20000'})
+            self.assertEqual(206, status)
+            self.assertEqual(self.content, data)
+
+    def testMultiple(self):
+        for uri in ('plain.bin', 'zipped/member.bin'):
+            status, headers, data = self.process(uri, {'Range': 'bytes=1000-1003,5000-5001'})
+            self.assertEqual(206, status)
+            self.assertNotIn('Content-Range', headers)
+            self.assertIn(b'Content-Range: bytes 1000-1003/10240\r\n\r\n' + self.content[1000:1004], data)
+            self.assertIn(b'Content-Range: bytes 5000-5001/10240\r\n\r\n' + self.content[5000:5002], data)
+
+            # The overlapping ranges are coalesced.
+            status, headers, data = self.process(uri, {'Range': 'bytes=0-5,3-9'})
+            self.assertEqual(206, status)
+            self.assertEqual('bytes 0-9/10240', headers.get('Content-Range'))
+            self.assertEqual(self.content[:10], data)
+
+    def testUnsatisfiable(self):
+        for uri in ('plain.bin', 'zipped/member.bin'):
+            for value in ('bytes=10240-', 'bytes=-0', 'bytes=20000-20010, 30000-'):
+                status, headers, data = self.process(uri, {'Range': value})
+                self.assertEqual(416, status)
+                self.assertEqual('bytes */10240', headers.get('Content-Range'))
+                self.assertIsNone(data)
+
+    def testIgnored(self):
+        for uri in ('plain.bin', 'zipped/member.bin'):
+            for value in ('bytes=', 'bytes=,', 'bytes= , ', 'bytes=5-1', 'bytes=a-b', 'items=0-3'):
+                status, headers, data = self.process(uri, {'Range': value})
+                self.assertEqual(200, status)
+                self.assertNotIn('Content-Range', headers)
+                self.assertEqual(self.content, data)
+
+    def testIfRange(self):
+        for uri in ('plain.bin', 'zipped/member.bin'):
+            _status, headers, _data = self.process(uri, {})
+            eTag, lastModified = headers['ETag'], headers['Last-Modified']
+
+            for validator in (eTag, lastModified):
+                status, _headers, data = self.process(uri, {'Range': 'bytes=0-1', 'If-Range': validator})
+                self.assertEqual(206, status)
+                self.assertEqual(self.content[:2], data)
+
+            for validator in ('"other"', formatdate(0, usegmt=True)):
+                status, _headers, data = self.process(uri, {'Range': 'bytes=0-1', 'If-Range': validator})
+                self.assertEqual(200, status)
+                self.assertEqual(self.content, data)
+
+class TestContentDeliveryCache(unittest.TestCase):
+
+    setUp, tearDown, process = TestContentDeliveryRanges.setUp, TestContentDeliveryRanges.tearDown, \
+    TestContentDeliveryRanges.process
+
+    def cdmFor(self):
+        delivery = HTTPDelivery()
+        delivery.serverURI, delivery.repositoryPath = 'http://localhost/content/', self.repository.name
+        cdm = LocalFileSystemCDM()
+        cdm.delivery, cdm.listeners = delivery, [self.handler.invalidate]
+        ioc.initialize(cdm)
+        return cdm
+
+    def countResolve(self):
+        resolved, resolveContent = [], self.handler.resolveContent
+        def resolve(entryPath):
+            if not entryPath.endswith('.gz'): resolved.append(entryPath)  # The compressed siblings are not counted
+            return resolveContent(entryPath)
+        self.handler.resolveContent = resolve
+        return resolved
+
+    def testMetadataCache(self):
+        resolved = self.countResolve()
+        for uri in ('plain.bin', 'zipped/member.bin'):
+            for _k in range(3):
+                status, _headers, data = self.process(uri, {})
+                self.assertEqual(200, status)
+                self.assertEqual(self.content, data)
+        self.assertEqual(2, len(resolved))
+
+        # The cached metadata is not changed by the requests, the size is taken from the opened file.
+        content = self.handler._contents[join(self.repository.name, 'plain.bin')]
+        self.assertIsNone(content.size)
+        self.assertIsNone(content.modified)
+        with open(join(self.repository.name, 'plain.bin'), 'wb') as f: f.write(b'changed')
+        status, _headers, data = self.process('plain.bin', {})
+        self.assertEqual(b'changed', data)
+        self.assertEqual(2, len(resolved))
+
+        # The removed content is resolved again.
+        os.remove(join(self.repository.name, 'plain.bin'))
+        status, _headers, data = self.process('plain.bin', {})
+        self.assertEqual(404, status)
+        self.assertEqual(3, len(resolved))
+
+    def testInvalidate(self):
+        cdm = self.cdmFor()
+        self.handler.missingTimeOut = 60
+        status, _headers, _data = self.process('dir/a.txt', {})
+        self.assertEqual(404, status)
+
+        # The publishing invalidates the remembered missing path.
+        cdm.publishContent('dir/a.txt', BytesIO(b'one'))
+        status, _headers, data = self.process('dir/a.txt', {})
+        self.assertEqual(200, status)
+        self.assertEqual(b'one', data)
+
+        cdm.publishContent('dir/b.txt', BytesIO(b'two'))
+        self.process('dir/b.txt', {})
+        self.assertIn(join(self.repository.name, 'dir', 'b.txt'), self.handler._contents)
+        cdm.publishContent('dir/b.txt', BytesIO(b'three'))
+        self.assertNotIn(join(self.repository.name, 'dir', 'b.txt'), self.handler._contents)
+        self.assertIn(join(self.repository.name, 'dir', 'a.txt'), self.handler._contents)
+        self.assertEqual(b'three', self.process('dir/b.txt', {})[2])
+
+        # The removal of a directory invalidates the content under it.
+        cdm.remove('dir')
+        self.assertEqual({}, {key: value for key, value in self.handler._contents.items() if 'dir' + os.sep in key})
+        self.assertEqual(404, self.process('dir/a.txt', {})[0])
+
+    def testMissingTimeOut(self):
+        self.handler.missingTimeOut = 0.2
+        self.assertEqual(404, self.process('new.txt', {})[0])
+
+        # The content published without the CDM is found only after the missing path expires.
+        with open(join(self.repository.name, 'new.txt'), 'wb') as f: f.write(b'new')
+        self.assertEqual(404, self.process('new.txt', {})[0])
+        time.sleep(0.3)
+        self.assertEqual((200, b'new'), self.process('new.txt', {})[::2])
+        self.assertNotIn(join(self.repository.name, 'new.txt'), self.handler._missing)
+
+        self.handler.missingTimeOut = 0
+        self.assertEqual(404, self.process('other.txt', {})[0])
+        self.assertNotIn(join(self.repository.name, 'other.txt'), self.handler._missing)
+        with open(join(self.repository.name, 'other.txt'), 'wb') as f: f.write(b'other')
+        self.assertEqual(200, self.process('other.txt', {})[0])
+
+class TestContentDeliveryZipPool(unittest.TestCase):
+
+    setUp, process = TestContentDeliveryRanges.setUp, TestContentDeliveryRanges.process
+
+    def tearDown(self):
+        with self.handler._zipLock:
+            for zipFile in self.handler._zipFiles.values(): zipFile.close()
+            self.handler._zipFiles.clear()
+        self.repository.cleanup()
+
+    def archive(self, name, data):
+        zipPath = join(self.repository.name, '%s.zip' % name)
+        with ZipFile(zipPath, 'w', ZIP_DEFLATED) as zipFile: zipFile.writestr('member.bin', data)
+        with open(join(self.repository.name, '%s.link' % name), 'w') as f: json.dump([['ZIP', zipPath, '']], f)
+        return zipPath
+
+    def pooled(self):
+        return [path for path, _modified in self.handler._zipFiles]
+
+    def testEviction(self):
+        self.handler.zipPoolSize = 2
+        paths = [self.archive(name, name.encode()) for name in ('a', 'b', 'c')]
+
+        self.assertEqual(b'a', self.process('a/member.bin', {})[2])
+        self.assertEqual(b'b', self.process('b/member.bin', {})[2])
+        self.assertEqual(paths[:2], self.pooled())
+
+        # The most recently used archive is kept and the least recently used archive is closed.
+        self.process('a/member.bin', {})
+        self.assertEqual([paths[1], paths[0]], self.pooled())
+        zipFile = self.handler._zipFiles[(paths[1], os.stat(paths[1]).st_mtime)]
+        self.assertEqual(b'c', self.process('c/member.bin', {})[2])
+        self.assertEqual([paths[0], paths[2]], self.pooled())
+        self.assertIsNone(zipFile.fp)
+
+        # The evicted archive is opened again when requested.
+        self.assertEqual(b'b', self.process('b/member.bin', {})[2])
+        self.assertEqual([paths[2], paths[1]], self.pooled())
+
+    def testReopen(self):
+        zipPath = join(self.repository.name, 'archive.zip')
+        self.process('zipped/member.bin', {})
+        zipFile, modified = self.handler.zipFileFor(zipPath)
+        self.assertEqual([(zipPath, modified)], list(self.handler._zipFiles))
+
+        # The archive that is changed is opened again and the previously opened archive is closed.
+        self.archive('archive', b'changed')
+        os.utime(zipPath, (modified + 10, modified + 10))
+        status, headers, data = self.process('zipped/member.bin', {})
+        self.assertEqual((200, b'changed'), (status, data))
+        self.assertEqual([(zipPath, modified + 10)], list(self.handler._zipFiles))
+        self.assertIsNone(zipFile.fp)
+        self.assertEqual(formatdate(int(modified + 10), usegmt=True), headers['Last-Modified'])
+
+    def testInvalidate(self):
+        zipPath = join(self.repository.name, 'archive.zip')
+        configuration = HeaderConfigurations()
+        request, response, responseCnt = Request(), Response(), ResponseContent()
+        request.scheme, request.uri, request.method = 'http', 'zipped/member.bin', HTTP_GET
+        request.decoderHeader = DecoderHeader(configuration, {})
+        response.encoderHeader = EncoderHeader(configuration)
+        self.handler.process(request, response, responseCnt)
+        self.assertEqual([zipPath], self.pooled())
+
+        # The archive is closed on invalidation but the already opened member stream can still be read.
+        self.handler.invalidate('zipped')
+        self.assertEqual([], self.pooled())
+        with responseCnt.source as rf: self.assertEqual(self.content, rf.read())
+
+        self.assertEqual(self.content, self.process('zipped/member.bin', {})[2])
+        self.assertEqual([zipPath], self.pooled())
+
+class TestContentDeliveryCompressed(unittest.TestCase):
+
+    setUp, tearDown, process = TestContentDeliveryRanges.setUp, TestContentDeliveryRanges.tearDown, \
+    TestContentDeliveryRanges.process
+
+    def compressed(self, name, data, offset=0):
+        path = join(self.repository.name, name)
+        with open(path, 'wb') as f: f.write(data)
+        with open(path + '.gz', 'wb') as f: f.write(gzip.compress(data))
+        modified = os.stat(path).st_mtime
+        os.utime(path + '.gz', (modified + offset, modified + offset))
+        return gzip.compress(data)
+
+    def testCompressed(self):
+        data = b'body { color: red; }\n' * 100
+        compressed = self.compressed('style.css', data)
+
+        for accepted in ('gzip', 'deflate, gzip;q=0.5', 'GZIP', '*'):
+            status, headers, content = self.process('style.css', {'Accept-Encoding': accepted})
+            self.assertEqual(200, status)
+            self.assertEqual('gzip', headers.get('Content-Encoding'))
+            self.assertEqual('Accept-Encoding', headers.get('Vary'))
+            self.assertEqual(compressed, content)
+            self.assertEqual(data, gzip.decompress(content))
+
+        status, headers, content = self.process('style.css', {'Accept-Encoding': 'gzip', 'Range': 'bytes=0-9'})
+        self.assertEqual(206, status)
+        self.assertEqual('bytes 0-9/%s' % len(compressed), headers.get('Content-Range'))
+        self.assertEqual(compressed[:10], content)
+
+    def testRefused(self):
+        data = b'body { color: red; }\n' * 100
+        self.compressed('style.css', data)
+
+        for headers in ({}, {'Accept-Encoding': 'gzip;q=0'}, {'Accept-Encoding': 'gzip; q=0, *'},
+                        {'Accept-Encoding': '*;q=0'}, {'Accept-Encoding': 'deflate, identity'},
+                        {'Accept-Encoding': 'gzip;q=invalid'}):
+            status, headers, content = self.process('style.css', headers)
+            self.assertEqual(200, status)
+            self.assertNotIn('Content-Encoding', headers)
+            self.assertEqual('Accept-Encoding', headers.get('Vary'))
+            self.assertEqual(data, content)
+
+        # The content without a compressed sibling does not vary on the accepted encoding.
+        status, headers, content = self.process('plain.bin', {'Accept-Encoding': 'gzip'})
+        self.assertNotIn('Content-Encoding', headers)
+        self.assertNotIn('Vary', headers)
+        self.assertEqual(self.content, content)
+
+    def testStale(self):
+        data = b'body { color: red; }\n' * 100
+        self.compressed('style.css', data, -10)
+
+        status, headers, content = self.process('style.css', {'Accept-Encoding': 'gzip'})
+        self.assertEqual(200, status)
+        self.assertNotIn('Content-Encoding', headers)
+        self.assertEqual(data, content)
+
+    def testVary(self):
+        self.compressed('style.css', b'body { color: red; }\n' * 100)
+
+        _status, headers, _content = self.process('style.css', {'Accept-Encoding': 'gzip'}, {'Vary': 'Origin'})
+        self.assertEqual('Origin,Accept-Encoding', headers.get('Vary'))
+        _status, headers, _content = self.process('style.css', {}, {'Vary': 'Origin, accept-encoding'})
+        self.assertEqual('Origin, accept-encoding', headers.get('Vary'))
+
+class TestContentDeliveryValidators(unittest.TestCase):
+
+    setUp, tearDown, process = TestContentDeliveryRanges.setUp, TestContentDeliveryRanges.tearDown, \
+    TestContentDeliveryRanges.process
+    compressed = TestContentDeliveryCompressed.compressed
+
+    def testNotModified(self):
+        for uri in ('plain.bin', 'zipped/member.bin'):
+            status, headers, _data = self.process(uri, {})
+            self.assertEqual(200, status)
+            eTag = headers['ETag']
+
+            for ifNoneMatch in (eTag, 'W/%s' % eTag, '"other", %s' % eTag, '*'):
+                status, headers, data = self.process(uri, {'If-None-Match': ifNoneMatch})
+                self.assertEqual(304, status)
+                self.assertEqual(eTag, headers['ETag'])
+                self.assertIsNone(data)
+
+            status, _headers, data = self.process(uri, {'If-None-Match': '"other"'})
+            self.assertEqual(200, status)
+            self.assertEqual(self.content, data)
+
+    def testIfModifiedSince(self):
+        modified = os.stat(join(self.repository.name, 'plain.bin')).st_mtime
+        status, headers, _data = self.process('plain.bin', {})
+        self.assertEqual(formatdate(int(modified), usegmt=True), headers['Last-Modified'])
+
+        for since in (headers['Last-Modified'], formatdate(modified + 60, usegmt=True)):
+            status, _headers, data = self.process('plain.bin', {'If-Modified-Since': since})
+            self.assertEqual(304, status)
+            self.assertIsNone(data)
+
+        for since in (formatdate(modified - 60, usegmt=True), 'invalid date'):
+            status, _headers, data = self.process('plain.bin', {'If-Modified-Since': since})
+            self.assertEqual(200, status)
+            self.assertEqual(self.content, data)
+
+        # The if none match header takes precedence over the if modified since header.
+        status, _headers, _data = self.process('plain.bin', {'If-None-Match': '"other"',
+                                                             'If-Modified-Since': headers['Last-Modified']})
+        self.assertEqual(200, status)
+
+    def testCacheControl(self):
+        self.handler.cacheControl = {'': 60, 'zipped': 3600, 'zipped/member': 86400, 'plain.bin/': 10}
+        self.assertEqual('max-age=86400', self.process('zipped/member.bin', {})[1].get('Cache-Control'))
+        self.assertEqual('max-age=60', self.process('plain.bin', {})[1].get('Cache-Control'))
+
+        self.handler.cacheControl = {'zipped': 3600, 'zipped/other': 86400}
+        self.assertEqual('max-age=3600', self.process('/zipped/member.bin', {})[1].get('Cache-Control'))
+        self.assertNotIn('Cache-Control', self.process('plain.bin', {})[1])
+        self.assertEqual(3600, self.handler.maxAgeFor('zipped'))
+        self.assertIsNone(self.handler.maxAgeFor('zip'))
+
+        # The not modified responses have the cache control as well.
+        eTag = self.process('zipped/member.bin', {})[1]['ETag']
+        status, headers, _data = self.process('zipped/member.bin', {'If-None-Match': eTag})
+        self.assertEqual(304, status)
+        self.assertEqual('max-age=3600', headers.get('Cache-Control'))
+
+    def testCompressedETag(self):
+        data = b'body { color: red; }\n' * 100
+        self.compressed('style.css', data)
+
+        identity = self.process('style.css', {})[1]['ETag']
+        compressed = self.process('style.css', {'Accept-Encoding': 'gzip'})[1]['ETag']
+        self.assertNotEqual(identity, compressed)
+
+        # The entity tag is validated against the delivered variant.
+        self.assertEqual(304, self.process('style.css', {'Accept-Encoding': 'gzip', 'If-None-Match': compressed})[0])
+        self.assertEqual(200, self.process('style.css', {'Accept-Encoding': 'gzip', 'If-None-Match': identity})[0])
+        self.assertEqual(304, self.process('style.css', {'If-None-Match': identity})[0])
+        self.assertEqual(200, self.process('style.css', {'If-None-Match': compressed})[0])
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__': unittest.main()
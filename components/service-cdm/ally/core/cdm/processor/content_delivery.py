@@ -10,21 +10,27 @@ Provides the content delivery handler.
 '''
 
 from ally.container.ioc import injected
-from ally.design.processor.attribute import requires, defines
+from ally.design.processor.attribute import requires, defines, optional
 from ally.design.processor.context import Context
 from ally.design.processor.handler import HandlerProcessorProceed
 from ally.http.spec.codes import METHOD_NOT_AVAILABLE, PATH_NOT_FOUND, \
-    PATH_FOUND
-from ally.http.spec.server import HTTP_GET
-from ally.support.util_io import IInputStream
+    PATH_FOUND, PARTIAL_CONTENT, RANGE_NOT_SATISFIABLE, NOT_MODIFIED
+from ally.http.impl.processor.headers.content_encoding import ENCODING_GZIP
+from ally.http.spec.server import HTTP_GET, IDecoderHeader, IEncoderHeader
+from ally.support.util_io import IInputStream, FileRegion
 from ally.zip.util_zip import normOSPath, normZipPath
+from collections import OrderedDict, Iterable
+from email.utils import parsedate_tz, mktime_tz, formatdate
 from mimetypes import guess_type
 from os.path import isdir, isfile, join, dirname, normpath, sep
+from threading import RLock
 from urllib.parse import unquote
+from uuid import uuid4
 from zipfile import ZipFile
 import json
 import logging
 import os
+import time
 
 # --------------------------------------------------------------------
 
@@ -40,11 +46,16 @@ class Request(Context):
     scheme = requires(str)
     uri = requires(str)
     method = requires(str)
+    decoderHeader = requires(IDecoderHeader)
 
 class Response(Context):
     '''
     The response context.
     '''
+    # ---------------------------------------------------------------- Required
+    encoderHeader = requires(IEncoderHeader)
+    # ---------------------------------------------------------------- Optional
+    headers = optional(dict)
     # ---------------------------------------------------------------- Defined
     code = defines(str)
     status = defines(int)
@@ -59,9 +70,9 @@ class ResponseContent(Context):
     The response context.
     '''
     # ---------------------------------------------------------------- Defined
-    source = defines(IInputStream, doc='''
-    @rtype: IInputStream
-    The stream that provides the response content in bytes.
+    source = defines(IInputStream, Iterable, doc='''
+    @rtype: IInputStream|Iterable
+    The stream or the chunks that provide the response content in bytes.
     ''')
     length = defines(int, doc='''
     @rtype: integer
@@ -78,22 +89,91 @@ class ResponseContent(Context):
 class ContentDeliveryHandler(HandlerProcessorProceed):
     '''
     Implementation for a processor that delivers the content based on the URL.
+    The resolved content metadata for the request paths is kept in memory, the metadata for a path is invalidated by
+    the CDM whenever the content is published or removed, @see: ContentDeliveryHandler.invalidate. The paths without
+    content are remembered only for a short time since the content can be published by other processes.
+    The ZIP archives are kept opened, with the parsed members index, for the most recently used archives.
+    The byte ranges requests are delivered as partial content, with multiple ranges delivered as multipart byte ranges.
+    The files content is delivered as file regions so the server can send the content directly from the file.
+    The compressed siblings generated by the CDM are delivered for the requests that accept the gzip encoding.
+    The content is delivered with the entity tag and last modified validators and the conditional requests are answered
+    with 304 Not Modified, the cache control max age is provided based on the request path prefix.
     '''
 
     repositoryPath = str
     # The directory where the file repository is
     defaultContentType = 'application/octet-stream'
     # The default mime type to set on the content response if None could be guessed
+    cacheSize = 10000
+    # The maximum number of paths for which the content metadata is kept in memory.
+    missingTimeOut = 2
+    # The number of seconds a path without content is remembered, 0 in order to resolve the missing content each time.
+    zipPoolSize = 50
+    # The maximum number of ZIP archives that are kept opened.
+    nameAcceptRanges = 'Accept-Ranges'
+    # The name for the accept ranges header
+    nameRange = 'Range'
+    # The name for the range header
+    nameIfRange = 'If-Range'
+    # The name for the if range header
+    nameContentRange = 'Content-Range'
+    # The name for the content range header
+    nameAcceptEncoding = 'Accept-Encoding'
+    # The name for the accept encoding header
+    nameContentEncoding = 'Content-Encoding'
+    # The name for the content encoding header
+    nameVary = 'Vary'
+    # The name for the vary header
+    nameETag = 'ETag'
+    # The name for the entity tag header
+    nameLastModified = 'Last-Modified'
+    # The name for the last modified header
+    nameIfNoneMatch = 'If-None-Match'
+    # The name for the if none match header
+    nameIfModifiedSince = 'If-Modified-Since'
+    # The name for the if modified since header
+    nameCacheControl = 'Cache-Control'
+    # The name for the cache control header
+    attrQuality = 'q'
+    # The attribute name for the encoding quality.
+    cacheControl = {}
+    # The cache control max age in seconds for the content paths prefixes, the longest matching prefix is used.
+    maximumRanges = 20
+    # The maximum number of ranges accepted in a request, if more ranges are requested the entire content is delivered.
+    bufferSize = 64 * 1024
+    # The buffer size used for reading the content ranges.
     _linkExt = '.link'
     # Extension to mark the link files in the repository.
     _zipHeader = 'ZIP'
     # Marker used in the link file to indicate that a link is inside a zip file.
     _fsHeader = 'FS'
     # Marker used in the link file to indicate that a link is file system
+    _gzipExt = '.gz'
+    # Extension of the compressed (gzip) siblings of the content.
 
     def __init__(self):
         assert isinstance(self.repositoryPath, str), 'Invalid repository path value %s' % self.repositoryPath
         assert isinstance(self.defaultContentType, str), 'Invalid default content type %s' % self.defaultContentType
+        assert isinstance(self.cacheSize, int), 'Invalid cache size %s' % self.cacheSize
+        assert isinstance(self.missingTimeOut, (int, float)), 'Invalid missing time out %s' % self.missingTimeOut
+        assert isinstance(self.zipPoolSize, int) and self.zipPoolSize > 0, 'Invalid ZIP pool size %s' % self.zipPoolSize
+        assert isinstance(self.nameAcceptRanges, str), 'Invalid accept ranges name %s' % self.nameAcceptRanges
+        assert isinstance(self.nameRange, str), 'Invalid range name %s' % self.nameRange
+        assert isinstance(self.nameIfRange, str), 'Invalid if range name %s' % self.nameIfRange
+        assert isinstance(self.nameContentRange, str), 'Invalid content range name %s' % self.nameContentRange
+        assert isinstance(self.nameAcceptEncoding, str), 'Invalid accept encoding name %s' % self.nameAcceptEncoding
+        assert isinstance(self.nameContentEncoding, str), 'Invalid content encoding name %s' % self.nameContentEncoding
+        assert isinstance(self.nameVary, str), 'Invalid vary name %s' % self.nameVary
+        assert isinstance(self.nameETag, str), 'Invalid entity tag name %s' % self.nameETag
+        assert isinstance(self.nameLastModified, str), 'Invalid last modified name %s' % self.nameLastModified
+        assert isinstance(self.nameIfNoneMatch, str), 'Invalid if none match name %s' % self.nameIfNoneMatch
+        assert isinstance(self.nameIfModifiedSince, str), \
+        'Invalid if modified since name %s' % self.nameIfModifiedSince
+        assert isinstance(self.nameCacheControl, str), 'Invalid cache control name %s' % self.nameCacheControl
+        assert isinstance(self.attrQuality, str), 'Invalid quality attribute name %s' % self.attrQuality
+        assert isinstance(self.cacheControl, dict), 'Invalid cache control %s' % self.cacheControl
+        assert isinstance(self.maximumRanges, int), 'Invalid maximum ranges %s' % self.maximumRanges
+        assert isinstance(self.bufferSize, int) and self.bufferSize > 0, 'Invalid buffer size %s' % self.bufferSize
         self.repositoryPath = normpath(self.repositoryPath)
         if not os.path.exists(self.repositoryPath): os.makedirs(self.repositoryPath)
         assert isdir(self.repositoryPath) and os.access(self.repositoryPath, os.R_OK), \
@@ -101,6 +181,10 @@ class ContentDeliveryHandler(HandlerProcessorProceed):
         super().__init__()
 
         self._linkTypes = {self._fsHeader:self._processLink, self._zipHeader:self._processZiplink}
+        self._contents = {}
+        self._missing = {}
+        self._zipFiles = OrderedDict()
+        self._zipLock = RLock()
 
     def process(self, request:Request, response:Response, responseCnt:ResponseContent, **keyargs):
         '''
@@ -111,58 +195,447 @@ class ContentDeliveryHandler(HandlerProcessorProceed):
         assert isinstance(request, Request), 'Invalid request %s' % request
         assert isinstance(response, Response), 'Invalid response %s' % response
         assert isinstance(responseCnt, ResponseContent), 'Invalid response content %s' % responseCnt
+        assert isinstance(response.encoderHeader, IEncoderHeader), \
+        'Invalid response header encoder %s' % response.encoderHeader
 
         if request.method != HTTP_GET:
             if response.allows is not None: response.allows.append(HTTP_GET)
             else: response.allows = [HTTP_GET]
             response.code, response.status, response.isSuccess = METHOD_NOT_AVAILABLE
+            return
+        
+        # Make sure the given path points inside the repository
+        path = normZipPath(unquote(request.uri))
+        entryPath = normOSPath(join(self.repositoryPath, path))
+        if not entryPath.startswith(self.repositoryPath):
+            response.code, response.status, response.isSuccess = PATH_NOT_FOUND
+            return
+        
+        opened = self.openFor(entryPath)
+        if opened is None:
+            response.code, response.status, response.isSuccess = PATH_NOT_FOUND
+            return
+        content, rf = opened
+        type = content.type
+        
+        compressed = self.compressedFor(request, response, entryPath, content)
+        if compressed is not None:
+            rf.close()
+            content, rf = compressed
+            response.encoderHeader.encode(self.nameContentEncoding, ENCODING_GZIP)
+        
+        response.encoderHeader.encode(self.nameETag, self.eTagFor(content))
+        response.encoderHeader.encode(self.nameLastModified, formatdate(int(content.modified), usegmt=True))
+        maxAge = self.maxAgeFor(path)
+        if maxAge is not None: response.encoderHeader.encode(self.nameCacheControl, 'max-age=%s' % maxAge)
+        if self.isNotModified(request, content):
+            rf.close()
+            response.code, response.status, response.isSuccess = NOT_MODIFIED
+            return
+        
+        response.encoderHeader.encode(self.nameAcceptRanges, 'bytes')
+        ranges = self.rangesFor(request, content)
+        if ranges is None:
+            response.code, response.status, response.isSuccess = PATH_FOUND
+            responseCnt.source = FileRegion(rf, 0, content.size) if content.member is None else rf
+            responseCnt.length = content.size
+            responseCnt.type = type
+            return
+        
+        if not ranges:
+            rf.close()
+            response.code, response.status, response.isSuccess = RANGE_NOT_SATISFIABLE
+            response.encoderHeader.encode(self.nameContentRange, 'bytes */%s' % content.size)
+            return
+        
+        response.code, response.status, response.isSuccess = PARTIAL_CONTENT
+        if len(ranges) == 1:
+            (start, end), = ranges
+            response.encoderHeader.encode(self.nameContentRange, 'bytes %s-%s/%s' % (start, end, content.size))
+            if content.member is None: responseCnt.source = FileRegion(rf, start, end - start + 1)
+            else: responseCnt.source = self.rangesGenerator(content, rf, ((None, start, end),))
+            responseCnt.length = end - start + 1
+            responseCnt.type = type
+            return
+        
+        boundary, parts = uuid4().hex, []
+        for start, end in ranges:
+            header = '--%s\r\nContent-Type: %s\r\n%s: bytes %s-%s/%s\r\n\r\n' % \
+            (boundary, type, self.nameContentRange, start, end, content.size)
+            parts.append((('\r\n' + header if parts else header).encode('ascii'), start, end))
+        closing = ('\r\n--%s--\r\n' % boundary).encode('ascii')
+        
+        responseCnt.source = self.rangesGenerator(content, rf, parts, closing)
+        responseCnt.length = sum(len(header) + end - start + 1 for header, start, end in parts) + len(closing)
+        responseCnt.type = 'multipart/byteranges; boundary=%s' % boundary
+
+    def invalidate(self, path):
+        '''
+        Invalidates the content metadata for the path and for all the paths under it, this method is used as a listener
+        for the CDM.
+        
+        @param path: string
+            The content path as used by the CDM, relative to the repository.
+        '''
+        assert isinstance(path, str), 'Invalid path %s' % path
+        entryPath = normOSPath(join(self.repositoryPath, normZipPath(path)))
+        compressedPath, prefix = entryPath + self._gzipExt, entryPath.rstrip(sep) + sep
+        for key in list(self._contents):
+            if key == entryPath or key == compressedPath or key.startswith(prefix):
+                content = self._contents.pop(key, None)
+                if content and content.member is not None: self.closeZipFile(content.path)
+        for key in list(self._missing):
+            if key == entryPath or key == compressedPath or key.startswith(prefix): self._missing.pop(key, None)
+
+    # ----------------------------------------------------------------
+
+    def openFor(self, entryPath):
+        '''
+        Opens the content for the entry path.
+        
+        @param entryPath: string
+            The normalized full path of the requested entry.
+        @return: tuple(Content, IInputStream)|None
+            The opened content metadata and the opened content stream, None if there is no content for the entry path.
+        '''
+        content = self.contentFor(entryPath)
+        if not content: return
+        try: return self.openContent(content)
+        except (IOError, OSError, KeyError):
+            # The content has been changed without the CDM knowing, we resolve the content again.
+            self._contents.pop(entryPath, None)
+            content = self.contentFor(entryPath)
+            if content: return self.openContent(content)
+
+    def compressedFor(self, request, response, entryPath, content):
+        '''
+        Opens the compressed (gzip) sibling of the content if there is one that is generated for the content and the
+        request accepts the gzip encoding, the CDM sets the content modification time on the compressed sibling.
+        
+        @param request: Request
+            The request to check the accepted encodings for.
+        @param response: Response
+            The response to place the vary header on.
+        @param entryPath: string
+            The normalized full path of the requested entry.
+        @param content: Content
+            The opened content to provide the compressed sibling for.
+        @return: tuple(Content, IInputStream)|None
+            The compressed content metadata and the opened compressed stream, None if the compressed content cannot
+            be used.
+        '''
+        assert isinstance(request, Request), 'Invalid request %s' % request
+        assert isinstance(request.decoderHeader, IDecoderHeader), 'Invalid header decoder %s' % request.decoderHeader
+        assert isinstance(response, Response), 'Invalid response %s' % response
+        assert isinstance(content, Content), 'Invalid content %s' % content
+        
+        if not self.contentFor(entryPath + self._gzipExt): return
+        vary = response.headers.get(self.nameVary) if Response.headers in response and response.headers else None
+        if not vary: response.encoderHeader.encode(self.nameVary, self.nameAcceptEncoding)
+        elif self.nameAcceptEncoding.lower() not in (name.strip().lower() for name in vary.split(',')):
+            # The vary header is already set by another processor so we just add the accept encoding to it.
+            response.encoderHeader.encode(self.nameVary, vary, self.nameAcceptEncoding)
+        
+        accepted = request.decoderHeader.decode(self.nameAcceptEncoding)
+        if not accepted: return
+        qualities = {}
+        for value, attributes in accepted:
+            try: quality = float(attributes.get(self.attrQuality) or 1)
+            except ValueError: quality = 0
+            qualities[value.lower()] = quality
+        if qualities.get(ENCODING_GZIP, qualities.get('*', 0)) <= 0: return
+        
+        compressed = self.openFor(entryPath + self._gzipExt)
+        if compressed is None: return
+        if abs(compressed[0].modified - content.modified) > 0.001:
+            compressed[1].close()  # The compressed sibling is not generated for the current content so it cannot be used.
+            return
+        return compressed
+
+    def isNotModified(self, request, content):
+        '''
+        Checks the conditional request headers against the content validators, the if none match header takes
+        precedence over the if modified since header.
+        
+        @param request: Request
+            The request to check.
+        @param content: Content
+            The opened content to check.
+        @return: boolean
+            True if the content has not been modified.
+        '''
+        assert isinstance(request, Request), 'Invalid request %s' % request
+        assert isinstance(request.decoderHeader, IDecoderHeader), 'Invalid header decoder %s' % request.decoderHeader
+        assert isinstance(content, Content), 'Invalid content %s' % content
+        
+        ifNoneMatch = request.decoderHeader.retrieve(self.nameIfNoneMatch)
+        if ifNoneMatch is not None:
+            eTag = self.eTagFor(content)
+            for tag in ifNoneMatch.split(','):
+                tag = tag.strip()
+                if tag.startswith('W/'): tag = tag[2:]  # The weak comparison is used.
+                if tag == '*' or tag == eTag: return True
+            return False
+        
+        ifModifiedSince = request.decoderHeader.retrieve(self.nameIfModifiedSince)
+        if not ifModifiedSince: return False
+        since = parsedate_tz(ifModifiedSince)
+        return since is not None and int(content.modified) <= mktime_tz(since)
+
+    def maxAgeFor(self, path):
+        '''
+        Provides the cache control max age for the content path based on the longest matching path prefix.
+        
+        @param path: string
+            The requested content path, relative to the repository.
+        @return: integer|None
+            The max age in seconds, None if there is no cache control for the path.
+        '''
+        assert isinstance(path, str), 'Invalid path %s' % path
+        path, matched = path.lstrip('/'), None
+        for prefix in self.cacheControl:
+            if path.startswith(prefix) and (matched is None or len(prefix) > len(matched)): matched = prefix
+        if matched is not None: return self.cacheControl[matched]
+
+    def rangesFor(self, request, content):
+        '''
+        Provides the byte ranges requested for the content, the ranges are sorted and the overlapping ranges are
+        coalesced. The range header is ignored if is invalid, has no range specification or the if range validator does not
+        match the content.
+        
+        @param request: Request
+            The request to provide the ranges for.
+        @param content: Content
+            The opened content to provide the ranges for.
+        @return: list[tuple(integer, integer)]|None
+            The (start, end) inclusive byte ranges, empty if none of the ranges can be satisfied, None if the entire
+            content needs to be delivered.
+        '''
+        assert isinstance(request, Request), 'Invalid request %s' % request
+        assert isinstance(request.decoderHeader, IDecoderHeader), 'Invalid header decoder %s' % request.decoderHeader
+        assert isinstance(content, Content), 'Invalid content %s' % content
+        
+        value = request.decoderHeader.retrieve(self.nameRange)
+        if not value: return
+        unit, _sep, specs = value.partition('=')
+        if unit.strip().lower() != 'bytes': return
+        
+        ifRange = request.decoderHeader.retrieve(self.nameIfRange)
+        if ifRange and not self.isValid(ifRange.strip(), content): return
+        
+        ranges, isParsed = [], False
+        for spec in specs.split(','):
+            spec = spec.strip()
+            if not spec: continue
+            first, sep, last = spec.partition('-')
+            if not sep: return
+            try:
+                if first:
+                    start, end = int(first), int(last) if last else content.size - 1
+                    if start < 0 or (last and end < start): return
+                else:
+                    start, end = content.size - int(last), content.size - 1
+                    isParsed = True
+                    if start == content.size: continue  # An empty suffix range can not be satisfied
+                    start = max(start, 0)
+            except ValueError: return
+            isParsed = True
+            if start < content.size: ranges.append((start, min(end, content.size - 1)))
+        if not isParsed or len(ranges) > self.maximumRanges: return
+        
+        ranges.sort()
+        coalesced = []
+        for start, end in ranges:
+            if coalesced and start <= coalesced[-1][1] + 1:
+                coalesced[-1] = (coalesced[-1][0], max(end, coalesced[-1][1]))
+            else: coalesced.append((start, end))
+        return coalesced
+        
+    def isValid(self, validator, content):
+        '''
+        Checks if the if range validator, either an entity tag or a date, is matching the content.
+        
+        @param validator: string
+            The if range validator.
+        @param content: Content
+            The content to check.
+        @return: boolean
+            True if the validator is matching the current content.
+        '''
+        assert isinstance(validator, str), 'Invalid validator %s' % validator
+        assert isinstance(content, Content), 'Invalid content %s' % content
+        if validator.startswith('"') or validator.startswith('W/'): return validator == self.eTagFor(content)
+        date = parsedate_tz(validator)
+        return date is not None and mktime_tz(date) == int(content.modified)
+
+    def eTagFor(self, content):
+        '''
+        Provides the strong entity tag for the content based on the modification time and size.
+        
+        @param content: Content
+            The opened content to provide the entity tag for.
+        @return: string
+            The entity tag.
+        '''
+        assert isinstance(content, Content), 'Invalid content %s' % content
+        return '"%x-%x"' % (int(content.modified * 1000), content.size)
+
+    def rangesGenerator(self, content, rf, parts, closing=None):
+        '''
+        Provides a generator that reads the content ranges, the content stream is closed when the generator is done.
+        
+        @param content: Content
+            The opened content.
+        @param rf: IInputStream
+            The content stream to read the ranges from.
+        @param parts: Iterable(tuple(bytes|None, integer, integer))
+            The header to be placed before the range, the start and the end of the ranges, in ascending order.
+        @param closing: bytes|None
+            The bytes to be placed after the ranges.
+        @return: Iterator(bytes)
+            The content chunks.
+        '''
+        assert isinstance(content, Content), 'Invalid content %s' % content
+        assert isinstance(rf, IInputStream), 'Invalid content stream %s' % rf
+        with rf:
+            position = 0
+            for header, start, end in parts:
+                if header: yield header
+                if content.member is None: rf.seek(start)
+                else:  # The ZIP members streams can not seek, we just skip the bytes
+                    while position < start:
+                        bytes = rf.read(min(start - position, self.bufferSize))
+                        if not bytes: return
+                        position += len(bytes)
+                position = start
+                while position <= end:
+                    bytes = rf.read(min(end - position + 1, self.bufferSize))
+                    if not bytes: return
+                    position += len(bytes)
+                    yield bytes
+            if closing: yield closing
+
+    def contentFor(self, entryPath):
+        '''
+        Provides the content metadata for the entry path, the metadata is resolved only if is not already in memory.
+        
+        @param entryPath: string
+            The normalized full path of the requested entry.
+        @return: Content|False
+            The content metadata or False if there is no content for the entry path.
+        '''
+        content = self._contents.get(entryPath)
+        if content is not None: return content
+        
+        expires = self._missing.get(entryPath)
+        if expires is not None and expires > time.time(): return False
+        
+        content = self.resolveContent(entryPath)
+        if content is False:
+            if self.missingTimeOut > 0:
+                if len(self._missing) >= self.cacheSize: self._missing.clear()
+                self._missing[entryPath] = time.time() + self.missingTimeOut
+            return content
+        
+        self._missing.pop(entryPath, None)
+        if len(self._contents) >= self.cacheSize: self._contents.clear()
+        self._contents[entryPath] = content
+        return content
+
+    def resolveContent(self, entryPath):
+        '''
+        Resolves the content metadata for the entry path, either a file in the repository or a linked file.
+        
+        @param entryPath: string
+            The normalized full path of the requested entry.
+        @return: Content|False
+            The content metadata or False if there is no content for the entry path.
+        '''
+        content = None
+        if isfile(entryPath): content = Content(entryPath)
         else:
-            # Make sure the given path points inside the repository
-            entryPath = normOSPath(join(self.repositoryPath, normZipPath(unquote(request.uri))))
-            if not entryPath.startswith(self.repositoryPath):
-                response.code, response.status, response.isSuccess = PATH_NOT_FOUND
+            linkPath = entryPath
+            while len(linkPath) > len(self.repositoryPath):
+                if isfile(linkPath + self._linkExt):
+                    with open(linkPath + self._linkExt) as f: links = json.load(f)
+                    subPath = normOSPath(entryPath[len(linkPath):]).lstrip(sep)
+                    for linkType, *data in links:
+                        if linkType in self._linkTypes:
+                            # make sure the subpath is normalized and uses the OS separator
+                            if not self._isPathDeleted(join(linkPath, subPath)):
+                                content = self._linkTypes[linkType](subPath, *data)
+                                if content is not None: break
+                    break
+                subLinkPath = dirname(linkPath)
+                if subLinkPath == linkPath:
+                    break
+                linkPath = subLinkPath
+        
+        if content is None: return False
+        content.type, _encoding = guess_type(entryPath)
+        if not content.type: content.type = self.defaultContentType
+        return content
+
+    def openContent(self, content):
+        '''
+        Opens the content, the size and modification time are taken from the opened file and provided on a copy of the
+        content metadata, since the cached content metadata is shared by the concurrent requests.
+        
+        @param content: Content
+            The content to open.
+        @return: tuple(Content, IInputStream)
+            The opened content metadata and the opened content stream.
+        '''
+        assert isinstance(content, Content), 'Invalid content %s' % content
+        opened = Content(content.path, content.member)
+        opened.type = content.type
+        if content.member is None:
+            rf = open(content.path, 'rb')
+            stat = os.fstat(rf.fileno())
+            opened.size, opened.modified = stat.st_size, stat.st_mtime
+        else:
+            # The member is opened while locked so the ZIP archive is not closed in the meantime.
+            with self._zipLock:
+                zipFile, opened.modified = self.zipFileFor(content.path)
+                rf = zipFile.open(content.member, 'r')
+            opened.size = zipFile.getinfo(content.member).file_size
+        return opened, rf
+
+    def zipFileFor(self, path):
+        '''
+        Provides the opened ZIP archive for the path, the opened archives are kept for the archive path and modification
+        time so an archive that is changed is opened again. The opened archive is shared by the concurrent readers since
+        the archive members are opened as separate streams.
+        
+        @param path: string
+            The ZIP archive path.
+        @return: tuple(ZipFile, float)
+            The opened ZIP archive and the archive modification time.
+        '''
+        modified = os.stat(path).st_mtime
+        key = (path, modified)
+        with self._zipLock:
+            zipFile = self._zipFiles.get(key)
+            if zipFile is not None: self._zipFiles.move_to_end(key)
             else:
-                # Initialize the read file handler with None value
-                # This will be set upon successful file open
-                rf = None
-                if isfile(entryPath):
-                    rf, size = open(entryPath, 'rb'), os.path.getsize(entryPath)
-                else:
-                    linkPath = entryPath
-                    while len(linkPath) > len(self.repositoryPath):
-                        if isfile(linkPath + self._linkExt):
-                            with open(linkPath + self._linkExt) as f: links = json.load(f)
-                            subPath = normOSPath(entryPath[len(linkPath):]).lstrip(sep)
-                            for linkType, *data in links:
-                                if linkType in self._linkTypes:
-                                    # make sure the subpath is normalized and uses the OS separator
-                                    if not self._isPathDeleted(join(linkPath, subPath)):
-                                        entry = self._linkTypes[linkType](subPath, *data)
-                                        if entry is not None:
-                                            rf, size = entry
-                                            break
-                            break
-                        subLinkPath = dirname(linkPath)
-                        if subLinkPath == linkPath:
-                            break
-                        linkPath = subLinkPath
-        
-                if rf is None:
-                    response.code, response.status, response.isSuccess = PATH_NOT_FOUND
-                else:
-                    response.code, response.status, response.isSuccess = PATH_FOUND
-                    responseCnt.source = rf
-                    responseCnt.length = size
-                    responseCnt.type, _encoding = guess_type(entryPath)
-                    if not responseCnt.type: responseCnt.type = self.defaultContentType
-                    return
+                self.closeZipFile(path)
+                zipFile = self._zipFiles[key] = ZipFile(path)
+                while len(self._zipFiles) > self.zipPoolSize: self._zipFiles.popitem(last=False)[1].close()
+        return zipFile, modified
 
-    # ----------------------------------------------------------------
+    def closeZipFile(self, path):
+        '''
+        Closes the opened ZIP archives for the path, the members already opened from the archives are not affected.
+        
+        @param path: string
+            The ZIP archive path.
+        '''
+        with self._zipLock:
+            for key in [key for key in self._zipFiles if key[0] == path]: self._zipFiles.pop(key).close()
 
     def _processLink(self, subPath, linkedFilePath):
         '''
-        Reads a link description file and returns a file handler to
-        the linked file.
+        Resolves the content metadata for the linked file.
         '''
         # make sure the file path uses the OS separator
         linkedFilePath = normOSPath(linkedFilePath)
@@ -172,23 +645,20 @@ class ContentDeliveryHandler(HandlerProcessorProceed):
             resPath = linkedFilePath
         else:
             return None
-        if isfile(resPath):
-            return open(resPath, 'rb'), os.path.getsize(resPath)
+        if isfile(resPath): return Content(resPath)
 
     def _processZiplink(self, subPath, zipFilePath, inFilePath):
         '''
-        Reads a link description file and returns a file handler to
-        the linked file inside the ZIP archive.
+        Resolves the content metadata for the linked file inside the ZIP archive.
         '''
         # make sure the ZIP file path uses the OS separator
         zipFilePath = normOSPath(zipFilePath)
         # convert the internal ZIP path to OS format in order to use standard path functions
         inFilePath = normOSPath(inFilePath)
-        zipFile = ZipFile(zipFilePath)
+        zipFile, _modified = self.zipFileFor(zipFilePath)
         # resource internal ZIP path should be in ZIP format
         resPath = normZipPath(join(inFilePath, subPath))
-        if resPath in zipFile.NameToInfo:
-            return zipFile.open(resPath, 'r'), zipFile.getinfo(resPath).file_size
+        if resPath in zipFile.NameToInfo: return Content(zipFilePath, resPath)
 
     def _isPathDeleted(self, path):
         '''
@@ -202,3 +672,29 @@ class ContentDeliveryHandler(HandlerProcessorProceed):
             if subPath == path: break
             path = subPath
         return False
+
+# --------------------------------------------------------------------
+
+class Content:
+    '''
+    The resolved metadata of a delivered content, the size and modification time are provided only for the opened
+    content.
+    '''
+    __slots__ = ('path', 'member', 'type', 'size', 'modified')
+
+    def __init__(self, path, member=None):
+        '''
+        Construct the content metadata.
+        
+        @param path: string
+            The path of the file that contains the content, either the content file or the ZIP archive.
+        @param member: string|None
+            The ZIP archive member name of the content, None if the content is not in a ZIP archive.
+        '''
+        assert isinstance(path, str), 'Invalid path %s' % path
+        assert member is None or isinstance(member, str), 'Invalid member %s' % member
+        self.path = path
+        self.member = member
+        self.type = None
+        self.size = None
+        self.modified = None
@@ -85,6 +85,27 @@ def cleanup_authorized_interval() -> float:
     '''
     return 60
 
+@ioc.config
+def filter_cache_timeout() -> float:
+    '''
+    The number of seconds the allowed gateway filters results are cached for a filter URI, 0 to disable the caching
+    '''
+    return 10
+
+@ioc.config
+def filter_cache_denied_timeout() -> float:
+    '''
+    The number of seconds the denied gateway filters results are cached for a filter URI, 0 to disable the caching
+    '''
+    return 2
+
+@ioc.config
+def filter_workers() -> int:
+    '''
+    The maximum number of gateway filters called in parallel for a request, 1 in order to call the filters one by one
+    '''
+    return 4
+
 # --------------------------------------------------------------------
 # Creating the processors used in handling the request
 
@@ -111,6 +132,9 @@ def gatewaySelector() -> Handler: return GatewaySelectorHandler()
 def gatewayFilter() -> Handler:
     b = GatewayFilterHandler()
     b.assembly = assemblyRESTRequest()
+    b.cacheTimeOut = filter_cache_timeout()
+    b.cacheTimeOutDenied = filter_cache_denied_timeout()
+    b.workers = filter_workers()
     return b
 
 @ioc.entity
@@ -0,0 +1,202 @@
+'''
+Created on Oct 18, 2026
+
+@package: gateway service
+@copyright: 2011 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides testing for the gateway filter results caching.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from ally.container import ioc
+from ally.container.ioc import injected
+from ally.design.processor.assembly import Assembly
+from ally.design.processor.attribute import defines
+from ally.design.processor.context import Context, create
+from ally.design.processor.execution import Processing
+from ally.design.processor.spec import Resolvers
+from ally.gateway.http.impl.processor.filter import GatewayFilterHandler
+from ally.gateway.http.impl.processor.respository import GatewayRepository, \
+    MatchRepository
+from ally.gateway.http.spec.gateway import IRepository
+from ally.http.spec.codes import FORBIDDEN_ACCESS, BAD_GATEWAY
+from threading import Lock
+import time
+import unittest
+
+# --------------------------------------------------------------------
+
+class Request(Context):
+    method = defines(str)
+    headers = defines(dict)
+    uri = defines(str)
+    repository = defines(IRepository)
+    match = defines(Context)
+
+class Response(Context):
+    code = defines(str)
+    status = defines(int)
+    isSuccess = defines(bool)
+    text = defines(str)
+
+ctx = create(Resolvers(contexts=dict(Gateway=GatewayRepository, Match=MatchRepository, Request=Request,
+                                     Response=Response)))
+Gateway, Match, Request, Response = ctx['Gateway'], ctx['Match'], ctx['Request'], ctx['Response']
+
+@injected
+class GatewayFilterHandlerTest(GatewayFilterHandler):
+    '''
+    Filter handler that provides the filters results from a dictionary instead of calling the filters.
+    '''
+
+    assembly = Assembly('Filter test')
+
+    def obtainFilter(self, processing, uri):
+        with self.callsLock: self.calls.append(uri)
+        if uri in self.delays: time.sleep(self.delays[uri])
+        return self.results[uri]
+
+class RepositoryForbidden(IRepository):
+    '''
+    Repository that provides the forbidden access match.
+    '''
+
+    def __init__(self):
+        self.forbidden = Match()
+
+    def find(self, method=None, headers=None, uri=None, error=None):
+        if error == FORBIDDEN_ACCESS.status: return self.forbidden
+
+    def allowsFor(self, headers=None, uri=None): return set()
+    def obtainCache(self, identifier): return {}
+
+ALLOWED = (True, 200, None)
+DENIED = (False, 200, None)
+FAILED = (None, 500, 'Internal error')
+
+# --------------------------------------------------------------------
+
+class TestFilterCache(unittest.TestCase):
+
+    def setUp(self):
+        self.handler = GatewayFilterHandlerTest()
+        ioc.initialize(self.handler)
+        self.handler.results, self.handler.calls, self.handler.delays = {}, [], {}
+        self.handler.callsLock = Lock()
+        self.handler.results.update({'allowed': ALLOWED, 'denied': DENIED, 'failed': FAILED})
+
+    def testHit(self):
+        for _k in range(3):
+            self.assertEqual(ALLOWED, self.handler.obtainFilterCached(None, 'allowed'))
+            self.assertEqual(DENIED, self.handler.obtainFilterCached(None, 'denied'))
+        self.assertEqual(['allowed', 'denied'], self.handler.calls)
+
+    def testTimeOut(self):
+        self.handler.cacheTimeOut, self.handler.cacheTimeOutDenied = 0.4, 0.1
+        self.handler.obtainFilterCached(None, 'allowed')
+        self.handler.obtainFilterCached(None, 'denied')
+        time.sleep(0.2)
+
+        # The denied result expires before the allowed result.
+        self.handler.obtainFilterCached(None, 'allowed')
+        self.handler.obtainFilterCached(None, 'denied')
+        self.assertEqual(['allowed', 'denied', 'denied'], self.handler.calls)
+        time.sleep(0.3)
+
+        self.handler.obtainFilterCached(None, 'allowed')
+        self.assertEqual(['allowed', 'denied', 'denied', 'allowed'], self.handler.calls)
+
+    def testDisabled(self):
+        self.handler.cacheTimeOut, self.handler.cacheTimeOutDenied = 0, 0
+        for _k in range(2):
+            self.handler.obtainFilterCached(None, 'allowed')
+            self.handler.obtainFilterCached(None, 'denied')
+        self.assertEqual(['allowed', 'denied', 'allowed', 'denied'], self.handler.calls)
+        self.assertEqual({}, self.handler._cache)
+
+    def testFailedNotCached(self):
+        self.assertEqual(FAILED, self.handler.obtainFilterCached(None, 'failed'))
+        self.assertEqual(FAILED, self.handler.obtainFilterCached(None, 'failed'))
+        self.assertEqual(['failed', 'failed'], self.handler.calls)
+        self.assertNotIn('failed', self.handler._cache)
+
+        # Once the filter is fetched the result is cached.
+        self.handler.results['failed'] = ALLOWED
+        self.assertEqual(ALLOWED, self.handler.obtainFilterCached(None, 'failed'))
+        self.assertEqual(ALLOWED, self.handler.obtainFilterCached(None, 'failed'))
+        self.assertEqual(['failed', 'failed', 'failed'], self.handler.calls)
+
+    def testSize(self):
+        self.handler.cacheSize = 2
+        for uri in ('a', 'b', 'c', 'd'):
+            self.handler.results[uri] = ALLOWED
+            self.handler.obtainFilterCached(None, uri)
+            self.assertLessEqual(len(self.handler._cache), 2)
+
+class TestFilterProcess(unittest.TestCase):
+
+    setUp = TestFilterCache.setUp
+
+    def process(self, *filters):
+        gateway = Gateway()
+        gateway.filters = list(filters)
+        match = Match()
+        match.gateway, match.groupsURI = gateway, ('1', '2')
+
+        request, response = Request(), Response()
+        request.method, request.headers, request.uri = 'GET', {}, 'resources/1/2'
+        request.repository, request.match = RepositoryForbidden(), match
+        self.handler.process(Processing(()), request, response, Gateway, Match)
+        return request, response
+
+    def testOrder(self):
+        for workers in (1, 4):
+            self.setUp()
+            self.handler.workers = workers
+            self.handler.results.update({'/a/1': ALLOWED, '/b/2': DENIED, '/c': FAILED})
+            self.handler.delays['/a/1'] = 0.1
+
+            # The failed filter is called in parallel but the denied filter is first in order.
+            request, response = self.process('/a/{1}', '/b/{2}', '/c')
+            self.assertEqual(FORBIDDEN_ACCESS.status, response.status)
+            self.assertIs(request.repository.forbidden, request.match)
+            self.assertEqual({'/a/1', '/b/2', '/c'} if workers > 1 else {'/a/1', '/b/2'}, set(self.handler.calls))
+
+            self.handler.calls = []
+            request, response = self.process('/a/{1}', '/c', '/b/{2}')
+            self.assertEqual(BAD_GATEWAY.status, response.status)
+            self.assertEqual('Internal error', response.text)
+
+            self.handler.calls = []
+            request, response = self.process('/a/{1}', '/a/{1}')
+            self.assertEqual([], self.handler.calls)
+            self.assertFalse(Response.status in response)
+
+    def testParallel(self):
+        self.handler.workers = 4
+        for uri in ('/a', '/b', '/c', '/d'):
+            self.handler.results[uri] = ALLOWED
+            self.handler.delays[uri] = 0.2
+
+        start = time.time()
+        request, response = self.process('/a', '/b', '/c', '/d')
+        self.assertLess(time.time() - start, 0.6)
+        self.assertFalse(Response.status in response)
+        self.assertEqual({'/a', '/b', '/c', '/d'}, set(self.handler.calls))
+
+    def testInvalidGroups(self):
+        request, response = self.process('/a/{3}')
+        self.assertEqual(BAD_GATEWAY.status, response.status)
+        self.assertEqual([], self.handler.calls)
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__': unittest.main()
@@ -0,0 +1,280 @@
+'''
+Created on Oct 18, 2026
+
+@package: gateway service
+@copyright: 2011 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides testing for the gateway repository index.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from ally.container import ioc
+from ally.container.ioc import injected
+from ally.design.processor.assembly import Assembly
+from ally.design.processor.attribute import defines
+from ally.design.processor.context import Context, create
+from ally.design.processor.execution import Processing
+from ally.design.processor.spec import Resolvers
+from ally.gateway.http.impl.processor.respository import GatewayRepository, \
+    MatchRepository, Identifier, Repository, literalPrefix, \
+    GatewayRepositoryHandler
+from ally.gateway.http.spec.gateway import IRepository
+from ally.http.spec.codes import BAD_GATEWAY
+import random
+import re
+import unittest
+
+# --------------------------------------------------------------------
+
+class Request(Context):
+    repository = defines(IRepository)
+
+class Response(Context):
+    code = defines(str)
+    status = defines(int)
+    isSuccess = defines(bool)
+    text = defines(str)
+
+ctx = create(Resolvers(contexts=dict(Gateway=GatewayRepository, Match=MatchRepository, Request=Request,
+                                     Response=Response)))
+Gateway, Match, Request, Response = ctx['Gateway'], ctx['Match'], ctx['Request'], ctx['Response']
+
+SEGMENTS = ('resources', 'Resources', 'my', 'a.b', 'x', '12', '')
+# The URI segments used in generating the patterns and the URIs.
+PIECES = ('(.*)', '([^/]+)', '\\d+', 'a?', 'b*', '(?:my|x)', '\\.', '$', '[a-z]+', '\\/')
+# The regex pieces used in generating the patterns.
+METHODS = ('GET', 'POST', 'DELETE', 'OPTIONS')
+
+# --------------------------------------------------------------------
+
+def randomPattern(rnd):
+    '''
+    Provides a random pattern made of literal segments and regex pieces.
+    '''
+    parts = []
+    if rnd.random() < 0.5: parts.append('^')
+    if rnd.random() < 0.05: parts.append('(?i)')
+    for _k in range(rnd.randint(0, 4)):
+        if rnd.random() < 0.6: parts.append(re.escape(rnd.choice(SEGMENTS)) + rnd.choice(('/', '\\/', '')))
+        else: parts.append(rnd.choice(PIECES))
+    if rnd.random() < 0.05: parts.append('|%s' % rnd.choice(SEGMENTS))
+    return ''.join(parts)
+
+def randomURI(rnd):
+    '''
+    Provides a random URI made of the segments.
+    '''
+    return '/'.join(rnd.choice(SEGMENTS + ('aab', 'bb', '7', 'my.x', 'A.B')) for _k in range(rnd.randint(1, 4)))
+
+def randomIdentifier(rnd):
+    '''
+    Provides a random identifier.
+    '''
+    identifier = Identifier(Gateway())
+    if rnd.random() < 0.9:
+        pattern = randomPattern(rnd)
+        try: identifier.pattern = re.compile(pattern, re.IGNORECASE if rnd.random() < 0.05 else 0)
+        except re.error: pass
+    if rnd.random() < 0.5: identifier.methods.update(rnd.sample(METHODS, rnd.randint(1, 3)))
+    if rnd.random() < 0.1: identifier.headers.append(re.compile('X-Filter:.*'))
+    if rnd.random() < 0.1: identifier.errors.add(rnd.choice((401, 404)))
+    return identifier
+
+def gatewaysFor(*patterns):
+    '''
+    Provides the gateway objects representation for the patterns.
+    '''
+    return dict(GatewayList=[dict(Pattern=pattern) for pattern in patterns])
+
+@injected
+class GatewayRepositoryHandlerTest(GatewayRepositoryHandler):
+    '''
+    Repository handler that provides the gateways from a list of results instead of fetching them, the cleanup is
+    performed only when called by the test.
+    '''
+
+    uri = 'resources/Gateway'
+    cleanupInterval = 60
+    assembly = Assembly('Repository test')
+
+    def startCleanupThread(self, name): pass
+
+    def obtainGateways(self, processing, uri):
+        self.calls.append((processing, uri))
+        return self.results.pop(0)
+
+def linearFind(repository, method=None, headers=None, uri=None, error=None):
+    '''
+    The linear identifiers lookup, as it was done before the repository index.
+    '''
+    for identifier in repository._identifiers:
+        groupsURI = repository._macth(identifier, method, headers, uri, error)
+        if groupsURI is not None: return identifier.gateway, groupsURI
+
+def linearAllowsFor(repository, headers=None, uri=None):
+    '''
+    The linear allowed methods lookup, as it was done before the repository index.
+    '''
+    allowed = set()
+    for identifier in repository._identifiers:
+        if repository._macth(identifier, None, headers, uri, None) is not None: allowed.update(identifier.methods)
+    allowed.discard('OPTIONS')
+    return allowed
+
+# --------------------------------------------------------------------
+
+class TestRepositoryIndex(unittest.TestCase):
+
+    def assertSameFind(self, repository, method=None, headers=None, uri=None, error=None):
+        match = repository.find(method, headers, uri, error)
+        if match is not None: match = match.gateway, match.groupsURI
+        self.assertEqual(linearFind(repository, method, headers, uri, error), match,
+                         'For method %s, headers %s, URI %r and error %s' % (method, headers, uri, error))
+
+    def testRandom(self):
+        rnd = random.Random(17)
+        for _k in range(200):
+            repository = Repository([randomIdentifier(rnd) for _k in range(rnd.randint(0, 25))], Match)
+            for _k in range(50):
+                uri = randomURI(rnd) if rnd.random() < 0.95 else None
+                method = rnd.choice(METHODS + ('get', 'PUT', None))
+                headers = {'X-Filter': 'yes'} if rnd.random() < 0.2 else None
+                error = rnd.choice((None, None, None, 401, 404))
+                self.assertSameFind(repository, method, headers, uri, error)
+                self.assertEqual(linearAllowsFor(repository, headers, uri), repository.allowsFor(headers, uri))
+
+    def testOrder(self):
+        identifiers = []
+        for pattern, methods in (('^resources\\/my\\/(.*)', ('GET',)), ('(.*)', ()), ('^resources/(.*)', ()),
+                                 ('^resources\\/my\\/(.*)', ())):
+            identifier = Identifier(Gateway())
+            identifier.pattern = re.compile(pattern)
+            identifier.methods.update(methods)
+            identifiers.append(identifier)
+        repository = Repository(identifiers, Match)
+
+        # The first identifier in order wins even if it is not indexed by segment.
+        self.assertIs(identifiers[0].gateway, repository.find('GET', None, 'resources/my/1').gateway)
+        self.assertIs(identifiers[1].gateway, repository.find('POST', None, 'resources/my/1').gateway)
+        self.assertIs(identifiers[1].gateway, repository.find(None, None, 'other').gateway)
+        self.assertEqual({'GET'}, repository.allowsFor(None, 'resources/my/1'))
+
+        del identifiers[1]
+        repository = Repository(identifiers, Match)
+        self.assertIs(identifiers[1].gateway, repository.find('POST', None, 'resources/my/1').gateway)
+        self.assertIsNone(repository.find('POST', None, 'other'))
+
+class TestRepositoryRefresh(unittest.TestCase):
+
+    def setUp(self):
+        self.handler = GatewayRepositoryHandlerTest()
+        ioc.initialize(self.handler)
+        self.handler.results, self.handler.calls = [], []
+
+    def process(self, processing):
+        request, response = Request(), Response()
+        self.handler.process(processing, request, response, Gateway, Match)
+        return request, response
+
+    def patterns(self, repository):
+        return [identifier.pattern.pattern for identifier in repository._identifiers]
+
+    def testFetch(self):
+        self.handler.results.append((None, 500, 'Internal error'))
+        request, response = self.process(Processing(()))
+        self.assertEqual(BAD_GATEWAY.status, response.status)
+        self.assertEqual('Internal error', response.text)
+        self.assertIsNone(request.repository)
+        self.assertIsNone(self.handler._refresh)
+
+        processing = Processing(())
+        self.handler.results.append((gatewaysFor('^resources/(.*)'), 200, None))
+        request, response = self.process(processing)
+        self.assertEqual(['^resources/(.*)'], self.patterns(request.repository))
+
+        # The repository is fetched only once.
+        request, response = self.process(Processing(()))
+        self.assertIs(self.handler._repository, request.repository)
+        self.assertEqual(2, len(self.handler.calls))
+
+    def testRefresh(self):
+        self.handler.performCleanup()  # Nothing to refresh before the first fetch
+        self.assertEqual([], self.handler.calls)
+
+        processing = Processing(())
+        self.handler.results.append((gatewaysFor('^resources/(.*)'), 200, None))
+        self.process(processing)
+
+        # The refresh uses the processing of the request that fetched the repository.
+        self.handler.results.append((gatewaysFor('^resources/(.*)', '^other/(.*)'), 200, None))
+        self.handler.performCleanup()
+        self.assertEqual([(processing, 'resources/Gateway')] * 2, self.handler.calls)
+        request, _response = self.process(Processing(()))
+        self.assertEqual(['^resources/(.*)', '^other/(.*)'], self.patterns(request.repository))
+
+        # The failed refresh keeps the current repository.
+        repository = self.handler._repository
+        self.handler.results.append((None, 500, 'Internal error'))
+        self.handler.performCleanup()
+        request, _response = self.process(Processing(()))
+        self.assertIs(repository, request.repository)
+        self.assertEqual(3, len(self.handler.calls))
+
+class TestLiteralPrefix(unittest.TestCase):
+
+    def assertPrefix(self, prefix, pattern, flags=0):
+        self.assertEqual(prefix, literalPrefix(re.compile(pattern, flags)), 'For pattern %r' % pattern)
+
+    def testLiteral(self):
+        self.assertPrefix('resources/my/', '^resources/my/(.*)')
+        self.assertPrefix('resources/', 'resources/(.*)')
+        self.assertPrefix('resources', '^resources')
+        self.assertPrefix('', '')
+        self.assertPrefix('', '(.*)')
+
+    def testEscapes(self):
+        self.assertPrefix('resources/my', '^resources\\/my')
+        self.assertPrefix('a.b/', 'a\\.b/(.*)')
+        self.assertPrefix('a\\b', 'a\\\\b')
+        self.assertPrefix('a', 'a\\d+')
+        self.assertPrefix('a', 'a\\w/')
+        self.assertPrefix('/x', '\\/x')
+
+    def testQuantified(self):
+        self.assertPrefix('ab', 'abc?/d')
+        self.assertPrefix('ab', 'abc*/d')
+        self.assertPrefix('abc', 'abc+/d')
+        self.assertPrefix('ab', 'abc{0,2}/d')
+        self.assertPrefix('ab', 'ab\\.?x')
+        self.assertPrefix('', 'a?/x')
+        self.assertPrefix('', '\\.*x')
+
+    def testAnchors(self):
+        self.assertPrefix('ab', '^ab^c')
+        self.assertPrefix('', '^^ab')
+        self.assertPrefix('ab', 'ab$')
+        self.assertPrefix('ab', '^ab(c)')
+        self.assertPrefix('ab', '^ab[c]')
+        self.assertPrefix('ab', '^ab.')
+
+    def testAlternation(self):
+        self.assertPrefix('', 'resources/|other/')
+        self.assertPrefix('', '^resources/(my|x)/')
+        self.assertPrefix('', '^resources/(?:my|x)')
+
+    def testIgnoreCase(self):
+        self.assertPrefix('', 'resources/', re.IGNORECASE)
+        self.assertPrefix('', '(?i)resources/')
+        self.assertPrefix('', 'resources /', re.VERBOSE)
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__': unittest.main()
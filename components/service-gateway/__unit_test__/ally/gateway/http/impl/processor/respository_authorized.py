@@ -0,0 +1,215 @@
+'''
+Created on Oct 18, 2026
+
+@package: gateway service
+@copyright: 2011 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides testing for the authorized gateway repositories fetching and refreshing.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from ally.container import ioc
+from ally.container.ioc import injected
+from ally.design.processor.assembly import Assembly
+from ally.design.processor.attribute import defines
+from ally.design.processor.context import Context, create
+from ally.design.processor.execution import Processing
+from ally.design.processor.spec import Resolvers
+from ally.gateway.http.impl.processor.respository import GatewayRepository, \
+    MatchRepository
+from ally.gateway.http.impl.processor.respository_authorized import \
+    GatewayAuthorizedRepositoryHandler
+from ally.gateway.http.spec.gateway import IRepository
+from ally.http.spec.codes import BAD_REQUEST, BAD_GATEWAY, \
+    INVALID_AUTHORIZATION
+from ally.http.spec.server import IDecoderHeader
+from datetime import datetime, timedelta
+from threading import Thread, Lock
+import time
+import unittest
+
+# --------------------------------------------------------------------
+
+class Request(Context):
+    repository = defines(IRepository)
+    match = defines(Context)
+    method = defines(str)
+    headers = defines(dict)
+    uri = defines(str)
+    decoderHeader = defines(IDecoderHeader)
+
+class Response(Context):
+    code = defines(str)
+    status = defines(int)
+    isSuccess = defines(bool)
+    text = defines(str)
+
+ctx = create(Resolvers(contexts=dict(Gateway=GatewayRepository, Match=MatchRepository, Request=Request,
+                                     Response=Response)))
+Gateway, Match, Request, Response = ctx['Gateway'], ctx['Match'], ctx['Request'], ctx['Response']
+
+def gatewaysFor(*patterns):
+    '''
+    Provides the gateway objects representation for the patterns.
+    '''
+    return dict(GatewayList=[dict(Pattern=pattern) for pattern in patterns])
+
+class DecoderHeader(IDecoderHeader):
+    '''
+    Decoder header that provides the headers from a dictionary.
+    '''
+
+    def __init__(self, headers):
+        self.headers = headers
+
+    def retrieve(self, name): return self.headers.get(name)
+    def decode(self, name): return None
+
+class RepositoryInvalid(IRepository):
+    '''
+    Repository that provides the invalid authorization match.
+    '''
+
+    def __init__(self):
+        self.invalid = Match()
+
+    def find(self, method=None, headers=None, uri=None, error=None):
+        if error == INVALID_AUTHORIZATION.status: return self.invalid
+
+    def allowsFor(self, headers=None, uri=None): return set()
+    def obtainCache(self, identifier): return {}
+
+@injected
+class GatewayAuthorizedRepositoryHandlerTest(GatewayAuthorizedRepositoryHandler):
+    '''
+    Authorized repository handler that provides the gateways from a dictionary of results indexed by URI instead of
+    fetching them, the cleanup is performed only when called by the test.
+    '''
+
+    uri = 'resources/Gateway/%s'
+    cleanupInterval = 60
+    assembly = Assembly('Authorized repository test')
+
+    def startCleanupThread(self, name): pass
+
+    def obtainGateways(self, processing, uri):
+        with self.callsLock: self.calls.append((processing, uri))
+        time.sleep(self.delay)
+        return self.results[uri]
+
+# --------------------------------------------------------------------
+
+class TestAuthorizedRepository(unittest.TestCase):
+
+    def setUp(self):
+        self.handler = GatewayAuthorizedRepositoryHandlerTest()
+        ioc.initialize(self.handler)
+        self.handler.results, self.handler.calls, self.handler.delay = {}, [], 0
+        self.handler.callsLock = Lock()
+        self.handler.results.update({
+            'resources/Gateway/a': (gatewaysFor('^a/(.*)'), 200, None),
+            'resources/Gateway/b': (gatewaysFor('^b/(.*)'), 200, None),
+            'resources/Gateway/invalid': (None, BAD_REQUEST.status, 'Invalid'),
+            'resources/Gateway/failed': (None, 500, 'Internal error'),
+            })
+
+    def process(self, authorization, processing=None, repository=None):
+        request, response = Request(), Response()
+        request.method, request.headers, request.uri = 'GET', {}, 'resources/1'
+        request.decoderHeader = DecoderHeader({'Authorization': authorization} if authorization else {})
+        request.repository = repository
+        self.handler.process(processing or Processing(()), request, response, Gateway, Match)
+        return request, response
+
+    def pattern(self, authorization):
+        return self.handler._repositories[authorization]._identifiers[0].pattern.pattern
+
+    def testFetch(self):
+        request, response = self.process(None)
+        self.assertIsNone(request.repository)
+        self.assertEqual([], self.handler.calls)
+
+        request, response = self.process('a')
+        self.assertIs(self.handler._repositories['a'], request.repository)
+        self.assertFalse(Response.status in response)
+        self.process('a')
+        self.process('b')
+        self.assertEqual(['resources/Gateway/a', 'resources/Gateway/b'], [uri for _p, uri in self.handler.calls])
+        self.assertEqual('^b/(.*)', self.pattern('b'))
+
+    def testLockPerAuthorization(self):
+        self.handler.delay = 0.2
+        threads = [Thread(target=self.process, args=(authorization,)) for authorization in ('a', 'a', 'a', 'b', 'b')]
+        start = time.time()
+        for thread in threads: thread.start()
+        for thread in threads: thread.join()
+
+        # The requests for the same authorization wait for a single fetch, the authorizations are fetched in parallel.
+        self.assertEqual(['resources/Gateway/a', 'resources/Gateway/b'], sorted(uri for _p, uri in self.handler.calls))
+        self.assertLess(time.time() - start, 0.4)
+        self.assertEqual({'a', 'b'}, set(self.handler._locks))
+
+    def testInvalid(self):
+        repository = RepositoryInvalid()
+        request, response = self.process('invalid', repository=repository)
+        self.assertEqual(INVALID_AUTHORIZATION.status, response.status)
+        self.assertIs(repository.invalid, request.match)
+
+        request, response = self.process('failed')
+        self.assertEqual(BAD_GATEWAY.status, response.status)
+        self.assertEqual('Internal error', response.text)
+
+        # The failed authorizations do not keep the fetch locks or repositories.
+        self.assertEqual({}, self.handler._locks)
+        self.assertEqual({}, self.handler._repositories)
+        self.process('invalid')
+        self.assertEqual(3, len(self.handler.calls))
+
+    def testRefresh(self):
+        self.handler.performCleanup()  # Nothing to refresh before the first fetch
+        self.assertEqual([], self.handler.calls)
+
+        self.process('a')
+        processing = Processing(())
+        self.process('b', processing)
+        self.handler.calls = []
+
+        # The refresh uses the processing of the request that last fetched a repository.
+        self.handler.results['resources/Gateway/a'] = (gatewaysFor('^x/(.*)'), 200, None)
+        self.handler.performCleanup()
+        self.assertEqual([(processing, 'resources/Gateway/a'), (processing, 'resources/Gateway/b')],
+                         sorted(self.handler.calls, key=lambda call: call[1]))
+        self.assertEqual('^x/(.*)', self.pattern('a'))
+
+        # The authorization that is not valid anymore is evicted, the failed refresh keeps the current repository.
+        self.handler.results['resources/Gateway/a'] = (None, BAD_REQUEST.status, 'Invalid')
+        self.handler.results['resources/Gateway/b'] = (None, 500, 'Internal error')
+        self.handler.performCleanup()
+        self.assertNotIn('a', self.handler._repositories)
+        self.assertEqual('^b/(.*)', self.pattern('b'))
+
+        request, response = self.process('a', repository=RepositoryInvalid())
+        self.assertEqual(INVALID_AUTHORIZATION.status, response.status)
+
+    def testExpired(self):
+        self.process('a')
+        self.process('b')
+        self.handler._lastAccess['a'] = datetime.now() - timedelta(seconds=self.handler.cleanupInterval + 1)
+        self.handler.calls = []
+
+        self.handler.performCleanup()
+        self.assertEqual({'b'}, set(self.handler._repositories))
+        self.assertEqual({'b'}, set(self.handler._locks))
+        self.assertEqual(['resources/Gateway/b'], [uri for _p, uri in self.handler.calls])
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__': unittest.main()
@@ -22,10 +22,13 @@ from ally.http.spec.server import HTTP, RequestHTTP, ResponseContentHTTP, \
     ResponseHTTP, HTTP_GET
 from ally.support.util_io import IInputStream
 from babel.compat import BytesIO
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
 from urllib.parse import urlparse, parse_qsl
 import codecs
 import json
 import logging
+import time
 
 # --------------------------------------------------------------------
 
@@ -82,7 +85,9 @@ class RequestFilter(RequestHTTP):
 @injected
 class GatewayFilterHandler(HandlerBranchingProceed):
     '''
-    Implementation for a handler that provides the gateway filter.
+    Implementation for a handler that provides the gateway filter. The filters results are cached for each filter URI,
+    the filter requests are made without the request headers so the result depends only on the filter URI. The filters
+    of a gateway are called in parallel and the results are checked in the filters order.
     '''
 
     scheme = HTTP
@@ -93,14 +98,31 @@ class GatewayFilterHandler(HandlerBranchingProceed):
     # The json encoding to be sent for the gateway requests.
     assembly = Assembly
     # The assembly to be used in processing the request for the filters.
+    cacheTimeOut = 10
+    # The number of seconds the allowed filters results are cached, 0 to disable the caching.
+    cacheTimeOutDenied = 2
+    # The number of seconds the denied filters results are cached, 0 to disable the caching.
+    cacheSize = 10000
+    # The maximum number of filters results cached.
+    workers = 4
+    # The maximum number of filters called in parallel, 1 in order to call the filters one by one.
 
     def __init__(self):
         assert isinstance(self.scheme, str), 'Invalid scheme %s' % self.scheme
         assert isinstance(self.mimeTypeJson, str), 'Invalid json mime type %s' % self.mimeTypeJson
         assert isinstance(self.encodingJson, str), 'Invalid json encoding %s' % self.encodingJson
         assert isinstance(self.assembly, Assembly), 'Invalid assembly %s' % self.assembly
+        assert isinstance(self.cacheTimeOut, (int, float)), 'Invalid cache time out %s' % self.cacheTimeOut
+        assert isinstance(self.cacheTimeOutDenied, (int, float)), \
+        'Invalid cache time out for denied %s' % self.cacheTimeOutDenied
+        assert isinstance(self.cacheSize, int), 'Invalid cache size %s' % self.cacheSize
+        assert isinstance(self.workers, int) and self.workers > 0, 'Invalid workers %s' % self.workers
         super().__init__(Using(self.assembly, request=RequestFilter).sources('requestCnt', 'response', 'responseCnt'))
 
+        self._cache = {}
+        self._executor = None
+        self._lock = Lock()
+
     # TODO: Gabriel: Move Gateway, Match in __init__ after refactoring.
     def process(self, processing, request:Request, response:Response, Gateway:Gateway, Match:Match, **keyargs):
         '''
@@ -117,15 +139,16 @@ class GatewayFilterHandler(HandlerBranchingProceed):
         assert isinstance(match.gateway, Gateway), 'Invalid gateway %s' % match.gateway
 
         if match.gateway.filters:
+            filterURIs = []
             for filterURI in match.gateway.filters:
                 assert isinstance(filterURI, str), 'Invalid filter %s' % filterURI
-                try: filterURI = filterURI.format(None, *match.groupsURI)
+                try: filterURIs.append(filterURI.format(None, *match.groupsURI))
                 except IndexError:
                     response.code, response.status, response.isSuccess = BAD_GATEWAY
                     response.text = 'Invalid filter URI \'%s\' for groups %s' % (filterURI, match.groupsURI)
                     return
 
-                isAllowed, status, text = self.obtainFilter(processing, filterURI)
+            for isAllowed, status, text in self.obtainFilters(processing, filterURIs):
                 if isAllowed is None:
                     log.info('Cannot fetch the filter from URI \'%s\', with response %s %s', request.uri, status, text)
                     response.code, response.status, response.isSuccess = BAD_GATEWAY
@@ -139,6 +162,51 @@ class GatewayFilterHandler(HandlerBranchingProceed):
 
     # ----------------------------------------------------------------
 
+    def obtainFilters(self, processing, uris):
+        '''
+        Checks the filters URIs, the filters are called in parallel.
+
+        @param processing: Processing
+            The processing used for delivering the requests.
+        @param uris: list[string]
+            The URIs to call, parameters are allowed.
+        @return: Iterable(tuple(boolean|None, integer, string))
+            The filters results in the URIs order, @see: obtainFilter.
+        '''
+        assert isinstance(uris, list), 'Invalid URIs %s' % uris
+
+        if len(uris) > 1 and self.workers > 1:
+            with self._lock:
+                if self._executor is None: self._executor = ThreadPoolExecutor(self.workers)
+            return self._executor.map(lambda uri: self.obtainFilterCached(processing, uri), uris)
+        return (self.obtainFilterCached(processing, uri) for uri in uris)
+
+    def obtainFilterCached(self, processing, uri):
+        '''
+        Checks the filter URI, the cached result is used if available.
+        @see: obtainFilter
+        '''
+        assert isinstance(uri, str), 'Invalid URI %s' % uri
+
+        with self._lock: cached = self._cache.get(uri)
+        if cached is not None and cached[1] > time.time(): return cached[0]
+
+        result = self.obtainFilter(processing, uri)
+        isAllowed = result[0]
+        if isAllowed is None: return result  # The failed filters are not cached
+        timeOut = self.cacheTimeOut if isAllowed else self.cacheTimeOutDenied
+        if timeOut <= 0: return result
+
+        with self._lock:
+            now = time.time()
+            if len(self._cache) >= self.cacheSize:
+                for key, (_result, expires) in list(self._cache.items()):
+                    if expires <= now: self._cache.pop(key, None)
+                if len(self._cache) >= self.cacheSize: self._cache.clear()
+            self._cache[uri] = (result, now + timeOut)
+
+        return result
+
     def obtainFilter(self, processing, uri):
         '''
         Checks the filter URI.
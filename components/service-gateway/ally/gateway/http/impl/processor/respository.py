@@ -24,7 +24,8 @@ from ally.support.util import immut
 from ally.support.util_io import IInputStream
 from io import BytesIO
 from sched import scheduler
-from threading import Thread
+from heapq import merge
+from threading import Thread, Lock
 from urllib.parse import urlparse, parse_qsl
 import codecs
 import json
@@ -121,6 +122,8 @@ class GatewayRepositoryHandler(HandlerBranchingProceed):
     '''
     Implementation for a handler that provides the gateway repository by using REST data received from either internal or
     external server. The Gateway structure is defined as in the @see: gateway-http plugin.
+    The repository is refreshed in the background every cleanup interval, until the refreshed repository is available the
+    current repository is used.
     '''
     
     scheme = HTTP
@@ -132,7 +135,7 @@ class GatewayRepositoryHandler(HandlerBranchingProceed):
     uri = str
     # The URI used in fetching the gateways.
     cleanupInterval = float
-    # The number of seconds to perform clean up for cached gateways.
+    # The number of seconds to perform clean up and refresh for cached gateways.
     assembly = Assembly
     # The assembly to be used in processing the request for the gateways.
     
@@ -159,20 +162,43 @@ class GatewayRepositoryHandler(HandlerBranchingProceed):
         assert issubclass(Match, MatchRepository), 'Invalid match class %s' % Match
         
         if not self._repository:
-            robj, status, text = self.obtainGateways(processing, self.uri)
-            if robj is None or not isSuccess(status):
-                log.info('Cannot fetch the gateways from URI \'%s\', with response %s %s', self.uri, status, text)
-                response.code, response.status, response.isSuccess = BAD_GATEWAY
-                response.text = text
-                return
-            assert 'GatewayList' in robj, 'Invalid objects %s, not GatewayList' % robj
-            self._repository = Repository([self.populate(Identifier(Gateway()), obj) for obj in robj['GatewayList']], Match)
+            with self._lock:  # Only one request fetches the repository, the others wait for it
+                if not self._repository:
+                    repository, status, text = self.obtainRepository(processing, self.uri, Gateway, Match)
+                    if repository is None:
+                        log.info('Cannot fetch the gateways from URI \'%s\', with response %s %s', self.uri, status, text)
+                        response.code, response.status, response.isSuccess = BAD_GATEWAY
+                        response.text = text
+                        return
+                    self._repository = repository
+                    self._refresh = (processing, Gateway, Match)
             
         if request.repository: request.repository = RepositoryJoined(request.repository, self._repository)
         else: request.repository = self._repository
         
     # ----------------------------------------------------------------
    
+    def obtainRepository(self, processing, uri, Gateway, Match):
+        '''
+        Get the gateways repository.
+        
+        @param processing: Processing
+            The processing used for delivering the request.
+        @param uri: string
+            The URI to call, parameters are allowed.
+        @param Gateway: class
+            The gateway context class.
+        @param Match: class
+            The match context class.
+        @return: tuple(Repository|None, integer, string)
+            A tuple containing as the first position the repository, None if the gateways cannot be fetched, on the second
+            position the response status and on the last position the response text.
+        '''
+        robj, status, text = self.obtainGateways(processing, uri)
+        if robj is None or not isSuccess(status): return None, status, text
+        assert 'GatewayList' in robj, 'Invalid objects %s, not GatewayList' % robj
+        return Repository([self.populate(Identifier(Gateway()), obj) for obj in robj['GatewayList']], Match), status, text
+   
     def obtainGateways(self, processing, uri):
         '''
         Get the gateway objects representation.
@@ -228,6 +254,8 @@ class GatewayRepositoryHandler(HandlerBranchingProceed):
         Initialize the repository.
         '''
         self._repository = None
+        self._lock = Lock()
+        self._refresh = None
         self.startCleanupThread('Cleanup gateways thread')
    
     def startCleanupThread(self, name):
@@ -239,7 +267,8 @@ class GatewayRepositoryHandler(HandlerBranchingProceed):
         '''
         schedule = scheduler(time.time, time.sleep)
         def executeCleanup():
-            self.performCleanup()
+            try: self.performCleanup()
+            except: log.exception('A problem occurred while performing the gateways clean up')
             schedule.enter(self.cleanupInterval, 1, executeCleanup, ())
         schedule.enter(self.cleanupInterval, 1, executeCleanup, ())
         scheduleRunner = Thread(name=name, target=schedule.run)
@@ -248,9 +277,15 @@ class GatewayRepositoryHandler(HandlerBranchingProceed):
 
     def performCleanup(self):
         '''
-        Performs the cleanup for gateways.
+        Performs the cleanup for gateways, the repository is refreshed and the current repository is kept until the
+        refreshed one is available.
         '''
-        self._repository = None
+        if self._refresh is None: return
+        processing, Gateway, Match = self._refresh
+        repository, status, text = self.obtainRepository(processing, self.uri, Gateway, Match)
+        if repository is None:
+            log.info('Cannot refresh the gateways from URI \'%s\', with response %s %s', self.uri, status, text)
+        else: self._repository = repository
     
     # ----------------------------------------------------------------
     
@@ -348,9 +383,10 @@ class Identifier:
 
 class Repository(IRepository):
     '''
-    The gateways repository.
+    The gateways repository. The identifiers are indexed by method and by the first URI segment that is literal in the
+    identifier pattern, this way only the identifiers that can match a request are checked.
     '''
-    __slots__ = ('_identifiers', '_cache', '_Match')
+    __slots__ = ('_identifiers', '_cache', '_Match', '_indexes')
     
     def __init__(self, identifiers, Match):
         '''
@@ -365,12 +401,13 @@ class Repository(IRepository):
         self._identifiers = identifiers
         self._Match = Match
         self._cache = {}
+        self._indexes = self._index()
         
     def find(self, method=None, headers=None, uri=None, error=None):
         '''
         @see: IRepository.find
         '''
-        for identifier in self._identifiers:
+        for _k, identifier in self._candidates(method, uri):
             assert isinstance(identifier, Identifier), 'Invalid identifier %s' % identifier
             groupsURI = self._macth(identifier, method, headers, uri, error)
             if groupsURI is not None: return self._Match(gateway=identifier.gateway, groupsURI=groupsURI)
@@ -380,7 +417,7 @@ class Repository(IRepository):
         @see: IRepository.allowsFor
         '''
         allowed = set()
-        for identifier in self._identifiers:
+        for _k, identifier in self._candidates(None, uri):
             assert isinstance(identifier, Identifier), 'Invalid identifier %s' % identifier
             groupsURI = self._macth(identifier, None, headers, uri, None)
             if groupsURI is not None: allowed.update(identifier.methods)
@@ -398,6 +435,55 @@ class Repository(IRepository):
 
     # ----------------------------------------------------------------
     
+    def _index(self):
+        '''
+        Indexes the identifiers.
+        
+        @return: dictionary{string|None: tuple(dictionary{string: list[tuple(integer, Identifier)]}, list[tuple(integer, Identifier)])}
+            The indexes by method (None for all methods), each index contains the identifiers indexed by the first URI
+            segment and the identifiers that cannot be indexed by segment, both in the identifiers order.
+        '''
+        methods = set()
+        for identifier in self._identifiers:
+            assert isinstance(identifier, Identifier), 'Invalid identifier %s' % identifier
+            methods.update(identifier.methods)
+        
+        indexes = {method: ({}, []) for method in methods}
+        indexes[None] = ({}, [])
+        for k, identifier in enumerate(self._identifiers):
+            segment = None
+            if identifier.pattern:
+                prefix = literalPrefix(identifier.pattern)
+                if '/' in prefix: segment = prefix[:prefix.index('/')]
+            
+            if identifier.methods: keys = list(identifier.methods)
+            else: keys = list(methods)  # The identifier matches any method
+            keys.append(None)
+            for key in keys:
+                bySegment, unindexed = indexes[key]
+                if segment is None: unindexed.append((k, identifier))
+                else: bySegment.setdefault(segment, []).append((k, identifier))
+        return indexes
+    
+    def _candidates(self, method, uri):
+        '''
+        Provides the identifiers that can match the method and URI, in the identifiers order.
+        
+        @return: Iterable(tuple(integer, Identifier))
+            The candidate identifiers with their order index.
+        '''
+        if method is not None:
+            index = self._indexes.get(method.upper())
+            if index is None: index = self._indexes[None]  # Only the identifiers without methods can match
+        else: index = self._indexes[None]
+        bySegment, unindexed = index
+        
+        if uri is None: return unindexed  # Only the identifiers without pattern can match
+        indexed = bySegment.get(uri.split('/', 1)[0])
+        if not indexed: return unindexed
+        if not unindexed: return indexed
+        return merge(indexed, unindexed)
+    
     def _macth(self, identifier, method, headers, uri, error):
         '''
         Checks the match for the provided identifier and parameters.
@@ -443,3 +529,34 @@ class Repository(IRepository):
         elif identifier.errors: return
             
         return groupsURI
+
+# --------------------------------------------------------------------
+
+def literalPrefix(pattern):
+    '''
+    Provides the literal prefix of the regex pattern, the prefix that any string matched by the pattern starts with.
+    
+    @param pattern: regex
+        The compiled pattern to provide the prefix for.
+    @return: string
+        The literal prefix, empty string if the pattern has no literal prefix.
+    '''
+    if pattern.flags & (re.IGNORECASE | re.VERBOSE): return ''
+    pattern = pattern.pattern
+    if '|' in pattern: return ''  # The alternations are not analyzed.
+    
+    prefix, k = [], 1 if pattern.startswith('^') else 0
+    while k < len(pattern):
+        ch = pattern[k]
+        if ch == '\\':
+            if k + 1 < len(pattern) and not pattern[k + 1].isalnum():
+                prefix.append(pattern[k + 1])
+                k += 2
+                continue
+            break
+        if ch in '.^$*+?{}[]()': break
+        prefix.append(ch)
+        k += 1
+    # If the last literal character is followed by a quantifier it is optional.
+    if prefix and k < len(pattern) and pattern[k] in '*?{': prefix.pop()
+    return ''.join(prefix)
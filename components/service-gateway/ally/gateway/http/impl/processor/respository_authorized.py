@@ -10,17 +10,16 @@ Provides the gateway repository processor.
 '''
 
 from . import respository
-from .respository import GatewayRepositoryHandler, Repository, Identifier, \
-    Response
+from .respository import GatewayRepositoryHandler, Response
 from ally.container.ioc import injected
 from ally.design.processor.attribute import requires, defines
 from ally.design.processor.context import Context
 from ally.design.processor.execution import Processing
 from ally.gateway.http.spec.gateway import IRepository, RepositoryJoined
-from ally.http.spec.codes import BAD_REQUEST, BAD_GATEWAY, INVALID_AUTHORIZATION, \
-    isSuccess
+from ally.http.spec.codes import BAD_REQUEST, BAD_GATEWAY, INVALID_AUTHORIZATION
 from ally.http.spec.server import IDecoderHeader
 from datetime import datetime, timedelta
+from threading import Lock
 import logging
 
 # --------------------------------------------------------------------
@@ -49,7 +48,8 @@ class Request(respository.Request):
 @injected
 class GatewayAuthorizedRepositoryHandler(GatewayRepositoryHandler):
     '''
-    Extension for @see: GatewayRepositoryHandler that provides the service for authorized gateways.
+    Extension for @see: GatewayRepositoryHandler that provides the service for authorized gateways. The repositories of the
+    active authorizations are refreshed in the background.
     '''
     
     nameAuthorization = 'Authorization'
@@ -77,22 +77,30 @@ class GatewayAuthorizedRepositoryHandler(GatewayRepositoryHandler):
         
         repository = self._repositories.get(authentication)
         if repository is None:
-            robj, status, text = self.obtainGateways(processing, self.uri % authentication)
-            if robj is None or not isSuccess(status):
-                if status == BAD_REQUEST.status:
-                    response.code, response.status, response.isSuccess = INVALID_AUTHORIZATION
-                    if request.repository:
-                        assert isinstance(request.repository, IRepository), 'Invalid repository %s' % request.repository
-                        request.match = request.repository.find(request.method, request.headers, request.uri,
-                                                                INVALID_AUTHORIZATION.status)
-                else:
-                    log.info('Cannot fetch the authorized gateways from URI \'%s\', with response %s %s', self.uri, status, text)
-                    response.code, response.status, response.isSuccess = BAD_GATEWAY
-                    response.text = text
-                return
-            assert 'GatewayList' in robj, 'Invalid objects %s, not GatewayList' % robj
-            repository = Repository([self.populate(Identifier(Gateway()), obj) for obj in robj['GatewayList']], Match)
-            self._repositories[authentication] = repository
+            with self._lock:
+                lock = self._locks.get(authentication)
+                if lock is None: lock = self._locks[authentication] = Lock()
+            with lock:  # Only one request fetches the repository for an authorization, the others wait for it
+                repository = self._repositories.get(authentication)
+                if repository is None:
+                    repository, status, text = self.obtainRepository(processing, self.uri % authentication, Gateway, Match)
+                    if repository is None:
+                        with self._lock: self._locks.pop(authentication, None)
+                        if status == BAD_REQUEST.status:
+                            response.code, response.status, response.isSuccess = INVALID_AUTHORIZATION
+                            if request.repository:
+                                assert isinstance(request.repository, IRepository), \
+                                'Invalid repository %s' % request.repository
+                                request.match = request.repository.find(request.method, request.headers, request.uri,
+                                                                        INVALID_AUTHORIZATION.status)
+                        else:
+                            log.info('Cannot fetch the authorized gateways from URI \'%s\', with response %s %s',
+                                     self.uri, status, text)
+                            response.code, response.status, response.isSuccess = BAD_GATEWAY
+                            response.text = text
+                        return
+                    self._repositories[authentication] = repository
+                    self._refresh = (processing, Gateway, Match)
         self._lastAccess[authentication] = datetime.now()
         
         if request.repository: request.repository = RepositoryJoined(repository, request.repository)
@@ -106,6 +114,9 @@ class GatewayAuthorizedRepositoryHandler(GatewayRepositoryHandler):
         '''
         self._repositories = {}
         self._lastAccess = {}
+        self._locks = {}
+        self._lock = Lock()
+        self._refresh = None
         self.startCleanupThread('Cleanup authorized gateways thread')
 
     def performCleanup(self):
@@ -113,10 +124,23 @@ class GatewayAuthorizedRepositoryHandler(GatewayRepositoryHandler):
         @see: GatewayRepositoryHandler.performCleanup
         '''
         current, expired = datetime.now() - self._timeOut, []
-        for authentication, lastAccess in self._lastAccess.items():
+        for authentication, lastAccess in list(self._lastAccess.items()):
             if current > lastAccess: expired.append(authentication)
         
         assert log.debug('Clearing %s sessions at %s' % (len(expired), datetime.now())) or True
         for authentication in expired:
             self._repositories.pop(authentication, None)
             self._lastAccess.pop(authentication, None)
+            with self._lock: self._locks.pop(authentication, None)
+        
+        if self._refresh is None: return
+        processing, Gateway, Match = self._refresh
+        for authentication in list(self._repositories):
+            repository, status, text = self.obtainRepository(processing, self.uri % authentication, Gateway, Match)
+            if repository is not None: self._repositories[authentication] = repository
+            elif status == BAD_REQUEST.status:
+                # The authorization is not valid anymore, the next request will get the invalid authorization.
+                self._repositories.pop(authentication, None)
+            else:
+                log.info('Cannot refresh the authorized gateways from URI \'%s\', with response %s %s',
+                         self.uri, status, text)
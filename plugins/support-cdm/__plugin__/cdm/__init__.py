@@ -39,6 +39,14 @@ def use_linked_cdm():
     ''' Set to true when the files should not be copied into cdm'''
     return True
 
+@ioc.config
+def publish_compressed():
+    '''
+    Set to true in order to generate compressed (gzip) siblings for the published content that is compressible, the
+    compressed siblings are delivered to the clients that accept the gzip encoding
+    '''
+    return False
+
 # --------------------------------------------------------------------
 # Creating the content delivery managers
 
@@ -53,5 +61,6 @@ def delivery() -> IDelivery:
 def contentDeliveryManager() -> ICDM:
     cdm = LocalFileSystemLinkCDM() if use_linked_cdm() else LocalFileSystemCDM()
     cdm.delivery = delivery()
+    cdm.compress = publish_compressed()
     return cdm
 
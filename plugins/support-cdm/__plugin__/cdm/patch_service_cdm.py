@@ -0,0 +1,34 @@
+'''
+Created on Oct 18, 2026
+
+@package: support cdm
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides the content delivery service patch for the cdm.
+'''
+
+from ..cdm import contentDeliveryManager
+from ally.cdm.impl.local_filesystem import LocalFileSystemCDM
+from ally.container import ioc
+import logging
+
+# --------------------------------------------------------------------
+
+log = logging.getLogger(__name__)
+
+# --------------------------------------------------------------------
+
+try: from __setup__ import ally_cdm
+except ImportError: log.info('No content delivery service available, thus no need to invalidate the delivered content')
+else:
+    ally_cdm = ally_cdm  # Just to avoid the import warning
+    # ----------------------------------------------------------------
+
+    from __setup__.ally_cdm.processor import contentDelivery
+
+    @ioc.after(contentDeliveryManager)
+    def updateContentDeliveryManagerListeners():
+        cdm = contentDeliveryManager()
+        if isinstance(cdm, LocalFileSystemCDM): cdm.listeners.append(contentDelivery().invalidate)
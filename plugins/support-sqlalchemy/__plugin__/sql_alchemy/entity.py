@@ -0,0 +1,43 @@
+'''
+Created on Oct 18, 2026
+
+@package: support sqlalchemy
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides the configurations for the sql alchemy entity services.
+'''
+
+from ally.api.extension import TOTAL_EXACT, TOTAL_CACHED, TOTAL_NONE
+from ally.container import ioc, support
+from sql_alchemy.impl.entity import EntitySupportAlchemy
+
+# --------------------------------------------------------------------
+
+@ioc.config
+def entity_total_mode() -> str:
+    '''
+    The mode used in providing the total count for the detailed entity collections, one of:
+    "exact" - the total is counted for each collection part,
+    "cached" - the total is counted and then reused for the same query for a short time, so it might be approximate,
+    "none" - no total is counted, instead the collection part indicates if more entities follow
+    '''
+    return TOTAL_EXACT
+
+@ioc.config
+def entity_total_timeout() -> int:
+    '''The number of seconds a total count is reused for the same query if the "cached" total mode is used'''
+    return 10
+
+# --------------------------------------------------------------------
+
+def configureTotal(service):
+    '''
+    Used for listening to all sql alchemy entity services that are created in order to set the total count mode.
+    '''
+    assert entity_total_mode() in (TOTAL_EXACT, TOTAL_CACHED, TOTAL_NONE), 'Invalid total mode %s' % entity_total_mode()
+    service.totalMode = entity_total_mode()
+    service.totalTimeout = entity_total_timeout()
+
+support.listenToEntities(EntitySupportAlchemy, listeners=configureTotal, all=True)
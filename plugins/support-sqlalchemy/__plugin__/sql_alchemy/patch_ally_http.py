@@ -0,0 +1,37 @@
+'''
+Created on Oct 18, 2026
+
+@package: support sqlalchemy
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides the ally http setup patch.
+'''
+
+from ally.container import support
+from sqlalchemy.engine.base import Engine
+import logging
+
+# --------------------------------------------------------------------
+
+log = logging.getLogger(__name__)
+
+# --------------------------------------------------------------------
+
+try: from __setup__ import ally_http
+except ImportError: log.info('No ally http service available, thus no need to dispose the database pools for the workers')
+else:
+    ally_http = ally_http  # Just to avoid the import warning
+    # ----------------------------------------------------------------
+    
+    from __setup__.ally_http.server import server_type, serverPrefork, SERVER_PREFORK
+    
+    def disposeInWorkers(engine):
+        '''
+        Used for listening to all sql alchemy engines that are created in order to dispose the connections pool that the
+        prefork server workers inherit from the master process.
+        '''
+        if server_type() == SERVER_PREFORK: serverPrefork().forkListeners.append(engine.dispose)
+    
+    support.listenToEntities(Engine, listeners=disposeInWorkers, all=True)
@@ -0,0 +1,198 @@
+'''
+Created on Oct 18, 2026
+
+@package: support sqlalchemy
+@copyright: 2012 Sourcefabric o.p.s.
+@license: http://www.gnu.org/licenses/gpl-3.0.txt
+@author: Gabriel Nistor
+
+Provides unit testing for the generic entity services paging and total counts.
+'''
+
+# Required in order to register the package extender whenever the unit test is run.
+if True:
+    import package_extender
+    package_extender.PACKAGE_EXTENDER.setForUnitTest(True)
+
+# --------------------------------------------------------------------
+
+from ally.api.config import model, query
+from ally.api.criteria import AsLikeOrdered
+from ally.api.extension import IterPart, TOTAL_CACHED, TOTAL_NONE, TOTAL_EXACT
+from ally.exception import InputError
+from ally.support.api.entity import Entity, QEntity
+from ally.support.sqlalchemy.mapper import mapperModel
+from ally.support.sqlalchemy.session import beginWith, endCurrent, rollback
+from sql_alchemy.impl.entity import EntityServiceAlchemy
+from sqlalchemy.engine import create_engine
+from sqlalchemy.orm.session import sessionmaker
+from sqlalchemy.schema import Table, Column, MetaData
+from sqlalchemy.types import String, Integer
+import unittest
+
+# --------------------------------------------------------------------
+
+meta = MetaData()
+
+@model
+class Item(Entity):
+    '''
+    Provides the item model.
+    '''
+    Name = str
+
+@query(Item)
+class QItem(QEntity):
+    '''
+    Provides the item query.
+    '''
+    name = AsLikeOrdered
+
+table = Table('entity_item', meta,
+              Column('id', Integer, primary_key=True, key='Id'),
+              Column('name', String(255), nullable=False, key='Name'))
+
+Item = mapperModel(Item, table)
+
+# --------------------------------------------------------------------
+
+class TestEntityPaging(unittest.TestCase):
+
+    def setUp(self):
+        engine = create_engine('sqlite:///:memory:')
+        meta.create_all(engine)
+        beginWith(sessionmaker(bind=engine))
+
+        self.service = EntityServiceAlchemy(Item, QItem)
+        for k in range(1, 11):
+            item = Item()
+            item.Name = 'Item %02d' % (11 - k)
+            self.service.insert(item)
+
+    def tearDown(self):
+        endCurrent(rollback)
+
+    def testAfter(self):
+        self.assertEqual([4, 5, 6], [item.Id for item in self.service.getAll(None, 3, after=3)])
+        self.assertEqual([6, 7, 8], [item.Id for item in self.service.getAll(2, 3, after=3)])
+
+        q = QItem(name='Item 0%')
+        self.assertEqual([4, 5, 6], [item.Id for item in self.service.getAll(None, 3, q=q, after=3)])
+
+    def testAfterOrdered(self):
+        q = QItem()
+        q.name.orderAsc()
+        self.assertEqual([10, 9, 8], [item.Id for item in self.service.getAll(None, 3, q=q)])
+        self.assertRaises(InputError, self.service.getAll, None, 3, q=q, after=3)
+        self.assertRaises(InputError, self.service.getAll, None, 3, True, q, 3)
+
+    def testNextAfter(self):
+        part = self.service.getAll(None, 4, True, after=0)
+        self.assertIsInstance(part, IterPart)
+        self.assertEqual([1, 2, 3, 4], [item.Id for item in part])
+        self.assertEqual(10, part.total)
+        self.assertEqual(0, part.after)
+        self.assertEqual(4, part.nextAfter)
+
+        # Walking the parts with the next after id provides all the entities.
+        ids, after = [], 0
+        while after is not None:
+            part = self.service.getAll(1, 2, True, after=after)
+            ids.extend(item.Id for item in part)
+            after = part.nextAfter
+        self.assertEqual([2, 3, 5, 6, 8, 9], ids)
+
+        part = self.service.getAll(None, 4, True)
+        self.assertIsNone(part.nextAfter)
+
+class TestEntityTotal(unittest.TestCase):
+
+    setUp, tearDown = TestEntityPaging.setUp, TestEntityPaging.tearDown
+
+    def addDirect(self, name):
+        # Adds the item without the service, so the cached totals are not invalidated.
+        item = Item()
+        item.Name = name
+        self.service.session().add(item)
+        self.service.session().flush((item,))
+        return item
+
+    def testCachedHit(self):
+        self.service.totalMode = TOTAL_CACHED
+        part = self.service.getAll(None, 3, True)
+        self.assertEqual(10, part.total)
+        self.assertEqual(TOTAL_CACHED, part.totalMode)
+
+        self.addDirect('Direct')
+        self.assertEqual(10, self.service.getAll(None, 3, True).total)
+        self.assertEqual(10, self.service.getAll(3, 3, True).total)  # The limits are not part of the cached count
+        self.assertEqual(11, self.service.getAll(None, 3, True, QItem(name='%')).total)  # A different query is counted
+
+        self.service.totalMode = TOTAL_EXACT
+        self.assertEqual(11, self.service.getAll(None, 3, True).total)  # The exact mode always counts
+
+    def testCachedExpiry(self):
+        self.service.totalMode = TOTAL_CACHED
+        self.service.totalTimeout = 0
+        self.assertEqual(10, self.service.getAll(None, 3, True).total)
+
+        self.addDirect('Direct')
+        self.assertEqual(11, self.service.getAll(None, 3, True).total)
+
+    def testCachedInvalidation(self):
+        self.service.totalMode = TOTAL_CACHED
+        q = QItem(name='Item 0%')
+        self.assertEqual(9, self.service.getAll(None, 3, True, q).total)
+
+        item = Item()
+        item.Name = 'Item 00'
+        self.service.insert(item)
+        self.assertEqual(10, self.service.getAll(None, 3, True, q).total)
+
+        item = self.service.getById(1)
+        self.assertEqual('Item 10', item.Name)
+        item.Name = 'Item 0A'
+        self.service.update(item)
+        self.assertEqual(11, self.service.getAll(None, 3, True, q).total)
+
+        self.assertTrue(self.service.delete(2))
+        self.assertEqual(10, self.service.getAll(None, 3, True, q).total)
+
+    def testCachedSize(self):
+        self.service.totalMode = TOTAL_CACHED
+        self.service.totalCacheSize = 2
+        for name in ('Item 0%', 'Item 1%', 'Item%'):
+            self.service.getAll(None, 3, True, QItem(name=name))
+            self.assertLessEqual(len(self.service._totals), 2)
+
+    def testNone(self):
+        self.service.totalMode = TOTAL_NONE
+        part = self.service.getAll(None, 4, True)
+        self.assertEqual([1, 2, 3, 4], [item.Id for item in part])
+        self.assertIsNone(part.total)
+        self.assertEqual(TOTAL_NONE, part.totalMode)
+        self.assertTrue(part.hasMore)
+
+        part = self.service.getAll(6, 4, True)
+        self.assertEqual([7, 8, 9, 10], [item.Id for item in part])
+        self.assertFalse(part.hasMore)
+
+        part = self.service.getAll(8, 4, True)
+        self.assertEqual([9, 10], [item.Id for item in part])
+        self.assertFalse(part.hasMore)
+
+        part = self.service.getAll(None, None, True)
+        self.assertEqual(10, len(list(part)))
+        self.assertFalse(part.hasMore)
+
+        part = self.service.getAll(None, 4, True, after=4)
+        self.assertEqual([5, 6, 7, 8], [item.Id for item in part])
+        self.assertTrue(part.hasMore)
+        self.assertEqual(8, part.nextAfter)
+        part = self.service.getAll(None, 4, True, after=8)
+        self.assertFalse(part.hasMore)
+        self.assertIsNone(part.nextAfter)
+
+# --------------------------------------------------------------------
+
+if __name__ == '__main__': unittest.main()
@@ -16,12 +16,14 @@ from ally.internationalization import _
 from ally.support.api import entity as api
 from ally.support.api.util_service import copy
 from ally.support.sqlalchemy.session import SessionSupport
-from ally.support.sqlalchemy.util_service import buildQuery, buildLimits, handle
+from ally.support.sqlalchemy.util_service import buildQuery, buildLimits, handle, \
+    isOrdered
 from inspect import isclass
 from sqlalchemy.exc import SQLAlchemyError, OperationalError, IntegrityError
 import logging
 from ally.support.sqlalchemy.mapper import MappedSupport
-from ally.api.extension import IterPart
+from ally.api.extension import IterPart, TOTAL_EXACT, TOTAL_CACHED, TOTAL_NONE
+import time
 
 # --------------------------------------------------------------------
 
@@ -34,6 +36,13 @@ class EntitySupportAlchemy(SessionSupport):
     Provides support generic entity handling.
     '''
 
+    totalMode = TOTAL_EXACT
+    # The mode used in providing the total count for the detailed collections, one of the IterPart TOTAL_* constants.
+    totalTimeout = 10
+    # The number of seconds a total count is reused for the same query if the total mode is cached.
+    totalCacheSize = 1000
+    # The maximum number of total counts cached.
+
     def __init__(self, Entity, QEntity=None):
         '''
         Construct the entity support for the provided model class and query class.
@@ -62,7 +71,9 @@ class EntitySupportAlchemy(SessionSupport):
             self.query = self.queryType = None
         self.QEntity = QEntity
 
-    def _getAll(self, filter=None, query=None, offset=None, limit=None, sql=None):
+        self._totals = {}
+
+    def _getAll(self, filter=None, query=None, offset=None, limit=None, sql=None, after=None):
         '''
         Provides all the entities for the provided filter, with offset and limit. Also if query is known to the
         service then also a query can be provided.
@@ -77,6 +88,9 @@ class EntitySupportAlchemy(SessionSupport):
             The limit of elements to get.
         @param sql: SQL alchemy|None
             The sql alchemy query to use.
+        @param after: integer|None
+            The last seen entity id to fetch the entities after, if provided the entities are ordered by id and the query
+            cannot provide an ordering.
         @return: list
             The list of all filtered and limited elements.
         '''
@@ -86,11 +100,13 @@ class EntitySupportAlchemy(SessionSupport):
         if query:
             assert self.QEntity, 'No query provided for the entity service'
             assert self.queryType.isValid(query), 'Invalid query %s, expected %s' % (query, self.QEntity)
+            if after is not None and isOrdered(query):
+                raise InputError(Ref(_('Cannot order the entities when fetching after an id'), ref=self.Entity.Id))
             sql = buildQuery(sql, query, self.Entity)
-        sql = buildLimits(sql, offset, limit)
+        sql = buildLimits(sql, offset, limit, after, self.Entity.Id)
         return sql.all()
 
-    def _getAllWithCount(self, filter=None, query=None, offset=None, limit=None, sql=None):
+    def _getAllWithCount(self, filter=None, query=None, offset=None, limit=None, sql=None, after=None, cached=False):
         '''
         Provides all the entities for the provided filter, with offset and limit and the total count. Also if query is 
         known to the service then also a query can be provided.
@@ -105,6 +121,11 @@ class EntitySupportAlchemy(SessionSupport):
             The limit of elements to get.
         @param sql: SQL alchemy|None
             The sql alchemy query to use.
+        @param after: integer|None
+            The last seen entity id to fetch the entities after, if provided the entities are ordered by id and the query
+            cannot provide an ordering.
+        @param cached: boolean
+            Flag indicating that a total count cached for the same query can be used.
         @return: tuple(list, integer)
             The list of all filtered and limited elements and the count of the total elements.
         '''
@@ -113,10 +134,73 @@ class EntitySupportAlchemy(SessionSupport):
         if query:
             assert self.QEntity, 'No query provided for the entity service'
             assert self.queryType.isValid(query), 'Invalid query %s, expected %s' % (query, self.QEntity)
+            if after is not None and isOrdered(query):
+                raise InputError(Ref(_('Cannot order the entities when fetching after an id'), ref=self.Entity.Id))
             sql = buildQuery(sql, query, self.Entity)
-        sqlLimit = buildLimits(sql, offset, limit)
-        if limit == 0: return (), sql.count()
-        return sqlLimit.all(), sql.count()
+        sqlLimit = buildLimits(sql, offset, limit, after, self.Entity.Id)
+        if limit == 0: return (), self._count(sql, cached)
+        return sqlLimit.all(), self._count(sql, cached)
+
+    def _getAllPart(self, filter=None, query=None, offset=None, limit=None, sql=None, after=None, totalMode=None):
+        '''
+        Provides the part of entities for the provided filter, with offset and limit and the total count provided based
+        on the total mode. Also if query is known to the service then also a query can be provided.
+        @see: _getAllWithCount
+        
+        @param totalMode: string|None
+            The total mode to use, one of the IterPart TOTAL_* constants, if None the service total mode is used. For
+            the none mode instead of counting an extra entity is fetched in order to know if more entities follow.
+        @return: IterPart
+            The part of filtered and limited elements, if fetched after an id the part also provides the last id as the
+            after id for the next part.
+        '''
+        totalMode = totalMode or self.totalMode
+        if totalMode == TOTAL_NONE:
+            entities = self._getAll(filter, query, offset, None if limit is None else limit + 1, sql, after)
+            hasMore = limit is not None and len(entities) > limit
+            if hasMore: entities = entities[:limit]
+            nextAfter = entities[-1].Id if after is not None and hasMore else None
+            return IterPart(entities, None, offset, limit, after, totalMode, hasMore, nextAfter)
+
+        if totalMode == TOTAL_CACHED:
+            entities, total = self._getAllWithCount(filter, query, offset, limit, sql, after, True)
+        else:
+            assert totalMode == TOTAL_EXACT, 'Invalid total mode %s' % totalMode
+            entities, total = self._getAllWithCount(filter, query, offset, limit, sql, after)
+            totalMode = None
+        nextAfter = entities[-1].Id if after is not None and entities else None
+        return IterPart(entities, total, offset, limit, after, totalMode, nextAfter=nextAfter)
+
+    def _count(self, sql, cached=False):
+        '''
+        Provides the count for the provided sql alchemy query.
+        
+        @param sql: SQL alchemy
+            The sql alchemy query to count.
+        @param cached: boolean
+            Flag indicating that a count cached for the same query statement and parameters can be used.
+        @return: integer
+            The count.
+        '''
+        if not cached: return sql.count()
+
+        compiled = sql.statement.compile()
+        try:
+            key = (str(compiled), tuple(sorted(compiled.params.items())))
+            hash(key)
+        except TypeError: return sql.count()  # The query parameters cannot be used as a key.
+
+        now = time.time()
+        pack = self._totals.get(key)
+        if pack is not None and pack[1] > now: return pack[0]
+
+        total = sql.count()
+        if len(self._totals) >= self.totalCacheSize:
+            for k, (_total, expires) in list(self._totals.items()):
+                if expires <= now: self._totals.pop(k, None)
+            if len(self._totals) >= self.totalCacheSize: self._totals.clear()
+        self._totals[key] = (total, now + self.totalTimeout)
+        return total
 
 # --------------------------------------------------------------------
 
@@ -138,28 +222,26 @@ class EntityFindServiceAlchemy(EntitySupportAlchemy):
     Generic implementation for @see: IEntityFindService
     '''
 
-    def getAll(self, offset=None, limit=None, detailed=False):
+    def getAll(self, offset=None, limit=None, detailed=False, after=None):
         '''
-        @see: IEntityQueryService.getAll
+        @see: IEntityFindService.getAll
         '''
         if detailed:
-            entities, total = self._getAllWithCount(None, None, offset, limit)
-            return IterPart(entities, total, offset, limit)
-        return self._getAll(None, None, offset, limit)
+            return self._getAllPart(None, None, offset, limit, after=after)
+        return self._getAll(None, None, offset, limit, after=after)
 
 class EntityQueryServiceAlchemy(EntitySupportAlchemy):
     '''
     Generic implementation for @see: IEntityQueryService
     '''
 
-    def getAll(self, offset=None, limit=None, detailed=False, q=None):
+    def getAll(self, offset=None, limit=None, detailed=False, q=None, after=None):
         '''
         @see: IEntityQueryService.getAll
         '''
         if detailed:
-            entities, total = self._getAllWithCount(None, q, offset, limit)
-            return IterPart(entities, total, offset, limit)
-        return self._getAll(None, q, offset, limit)
+            return self._getAllPart(None, q, offset, limit, after=after)
+        return self._getAll(None, q, offset, limit, after=after)
 
 class EntityCRUDServiceAlchemy(EntitySupportAlchemy):
     '''
@@ -177,6 +259,7 @@ class EntityCRUDServiceAlchemy(EntitySupportAlchemy):
             self.session().flush((entityDb,))
         except SQLAlchemyError as e: handle(e, entityDb)
         entity.Id = entityDb.Id
+        self._totals.clear()
         return entityDb.Id
 
     def update(self, entity):
@@ -189,13 +272,16 @@ class EntityCRUDServiceAlchemy(EntitySupportAlchemy):
         if not entityDb: raise InputError(Ref(_('Unknown id'), ref=self.Entity.Id))
         try: self.session().flush((copy(entity, entityDb),))
         except SQLAlchemyError as e: handle(e, self.Entity)
+        self._totals.clear()
 
     def delete(self, id):
         '''
         @see: IEntityCRUDService.delete
         '''
         try:
-            return self.session().query(self.Entity).filter(self.Entity.Id == id).delete() > 0
+            deleted = self.session().query(self.Entity).filter(self.Entity.Id == id).delete() > 0
+            if deleted: self._totals.clear()
+            return deleted
         except (OperationalError, IntegrityError):
             assert log.debug('Could not delete entity %s with id \'%s\'', self.Entity, id, exc_info=True) or True
             raise InputError(Ref(_('Cannot delete because is in use'), model=self.model))